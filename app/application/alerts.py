@@ -0,0 +1,262 @@
+"""
+Оповещения о бюджетах: категория перешла 80% или 100% месячного лимита.
+
+Движок держит в памяти факт с начала месяца по каждой категории с бюджетом.
+Один раз в месяц он засевается из базы, а дальше каждая записанная операция
+меняет суммы её бюджетных предков за O(глубина дерева), без запросов.
+Изменения собираются в after_flush сессии и применяются только после
+коммита. Откат их просто выбрасывает.
+
+Пакетные операции (UPDATE/DELETE/INSERT мимо ORM) и правки бюджетов или
+категорий в объекты не превращаются. После их коммита движок пересчитывает
+суммы из базы заново.
+"""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Callable
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.domain.enums import CategoryKind, TransactionType
+from app.infrastructure.db.models import Budget, Category, CategoryClosure, Transaction
+from app.infrastructure.repositories.budgets import BudgetsRepo
+from app.infrastructure.repositories.categories import CategoriesRepo
+from app.infrastructure.repositories.reports import ReportsRepo
+
+# пороги в процентах от лимита
+BUDGET_ALERT_THRESHOLDS = (80, 100)
+
+# какой тип операций расходует бюджет категории данного вида (как в category_actuals)
+_COUNTED_TYPE = {
+    CategoryKind.EXPENSE.value: TransactionType.EXPENSE.value,
+    CategoryKind.SAVINGS.value: TransactionType.TRANSFER.value,
+}
+_TX_FIELDS = ("type", "category_id", "occurred_at", "amount_cents")
+# таблицы, пакетная запись в которые требует пересчёта из базы
+_RESEED_TABLES = {"transactions", "budgets", "categories", "category_closure"}
+_INFO_KEY = "budget_alerts"
+
+
+@dataclass(frozen=True)
+class BudgetAlert:
+    category_id: int
+    month: date
+    threshold: int  # процент лимита
+    spent_cents: int
+    limit_cents: int
+
+
+def _month_start(d: date) -> date:
+    return date(d.year, d.month, 1)
+
+
+def _month_end(d: date) -> date:
+    return _month_start(_month_start(d) + timedelta(days=32)) - timedelta(days=1)
+
+
+def _as_date(value) -> date | None:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _tx_values(tx: Transaction, old: bool) -> tuple | None:
+    """
+    Поля операции, важные для бюджета: текущие или бывшие до flush (old).
+    None — значение не загружено, точную разницу не посчитать.
+    """
+    state = inspect(tx)
+    values = []
+    for name in _TX_FIELDS:
+        if name not in state.dict:
+            return None
+        value = state.dict[name]
+        if old:
+            hist = state.attrs[name].history
+            if hist.deleted:
+                value = hist.deleted[0]
+            elif hist.added:
+                # значения до изменения не было в памяти
+                return None
+        values.append(value)
+    tx_type, category_id, occurred_at, amount = values
+    return tx_type, category_id, _as_date(occurred_at), amount
+
+
+class BudgetAlertEngine:
+    """
+    Текущие суммы по бюджетам месяца и проверка порогов при каждой записи.
+    on_alert вызывается в потоке, закоммитившем изменения.
+    session_factory — сессии для засева и пересчёта сумм из базы (только
+    чтение). Это обычные сессии файла, не сессии отчётов: пересчёт идёт сразу
+    после коммита, и зеркало аналитики пересобиралось бы на каждой записи.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        on_alert: Callable[[BudgetAlert], None] | None = None,
+        thresholds: tuple[int, ...] = BUDGET_ALERT_THRESHOLDS,
+        today: Callable[[], date] = date.today,
+    ):
+        self.session_factory = session_factory
+        self.on_alert = on_alert
+        self.thresholds = thresholds
+        self.today = today
+        self._lock = threading.Lock()
+        self._month: date | None = None
+        self._limits: dict[int, int] = {}
+        self._totals: dict[int, int] = {}
+        # категория операции -> [(бюджетный предок, тип операций, который он считает)]
+        self._targets: dict[int, list[tuple[int, str]]] = {}
+
+    # ----- подключение к сессиям -----
+
+    def install(self, target) -> None:
+        """Подписывает движок на события сессий (sessionmaker или класс Session)."""
+        event.listen(target, "before_flush", self._before_flush)
+        event.listen(target, "after_flush", self._after_flush)
+        event.listen(target, "do_orm_execute", self._on_execute)
+        event.listen(target, "after_commit", self._after_commit)
+        event.listen(target, "after_transaction_end", self._after_transaction_end)
+
+    def month_to_date(self) -> dict[int, int]:
+        """Факт с начала месяца по категориям с бюджетом (копия)."""
+        with self._lock:
+            return dict(self._totals)
+
+    def seed(self, session: Session | None = None) -> None:
+        """Засевает суммы текущего месяца из базы (обычно раз в месяц)."""
+        if session is not None:
+            self._load(session)
+            return
+        with self.session_factory() as own:
+            self._load(own)
+
+    # ----- состояние -----
+
+    def _load(self, session: Session) -> list[BudgetAlert]:
+        month = _month_start(self.today())
+        limits = {b.category_id: b.limit_cents for b in BudgetsRepo(session).list_by_month(month)}
+        targets: dict[int, list[tuple[int, str]]] = {}
+        for descendant, ancestor, kind in CategoriesRepo(session).ancestor_links(list(limits)):
+            if kind in _COUNTED_TYPE:
+                targets.setdefault(descendant, []).append((ancestor, _COUNTED_TYPE[kind]))
+        totals = ReportsRepo(session).category_actuals(month, _month_end(month), list(limits))
+        totals = {cat_id: totals.get(cat_id, 0) for cat_id in limits}
+
+        with self._lock:
+            # переход порога при пересчёте — только внутри того же месяца
+            alerts = []
+            if self._month == month:
+                alerts = [
+                    alert
+                    for cat_id, spent in totals.items()
+                    for alert in self._crossings(
+                        cat_id, month, self._totals.get(cat_id, 0), self._limits.get(cat_id), spent, limits[cat_id]
+                    )
+                ]
+            self._month, self._limits, self._totals, self._targets = month, limits, totals, targets
+        return alerts
+
+    def _crossings(
+        self, cat_id: int, month: date, old_spent: int, old_limit: int | None, spent: int, limit: int
+    ) -> list[BudgetAlert]:
+        if limit <= 0:
+            return []
+        return [
+            BudgetAlert(cat_id, month, t, spent, limit)
+            for t in self.thresholds
+            if spent * 100 >= t * limit and (not old_limit or old_spent * 100 < t * old_limit)
+        ]
+
+    def _apply(self, deltas: list[tuple[int, tuple]]) -> list[BudgetAlert]:
+        alerts: list[BudgetAlert] = []
+        with self._lock:
+            before: dict[int, int] = {}
+            for sign, (tx_type, category_id, day, amount) in deltas:
+                if day is None or _month_start(day) != self._month:
+                    continue
+                for cat_id, counted_type in self._targets.get(category_id, ()):
+                    if tx_type != counted_type:
+                        continue
+                    before.setdefault(cat_id, self._totals[cat_id])
+                    self._totals[cat_id] += sign * amount
+            for cat_id, old_spent in before.items():
+                limit = self._limits[cat_id]
+                alerts.extend(self._crossings(cat_id, self._month, old_spent, limit, self._totals[cat_id], limit))
+        return alerts
+
+    # ----- события сессии -----
+
+    @staticmethod
+    def _pending(session: Session) -> dict:
+        return session.info.setdefault(_INFO_KEY, {"deltas": [], "reseed": False, "seeded": False})
+
+    def _before_flush(self, session: Session, _flush_context, _instances) -> None:
+        if not any(isinstance(o, Transaction) for o in (*session.new, *session.dirty, *session.deleted)):
+            return
+        if self._month == _month_start(self.today()):
+            return
+        # сумма на момент до этого flush — изменения flush лягут поверх
+        self._load(session)
+        self._pending(session)["seeded"] = True
+
+    def _after_flush(self, session: Session, _flush_context) -> None:
+        pending = None
+        for obj in session.new:
+            if isinstance(obj, Transaction):
+                pending = pending or self._pending(session)
+                pending["deltas"].append((1, _tx_values(obj, old=False)))
+            elif isinstance(obj, (Budget, Category, CategoryClosure)):
+                (pending := pending or self._pending(session))["reseed"] = True
+        for obj in session.deleted:
+            if isinstance(obj, Transaction):
+                pending = pending or self._pending(session)
+                pending["deltas"].append((-1, _tx_values(obj, old=True)))
+            elif isinstance(obj, (Budget, Category, CategoryClosure)):
+                (pending := pending or self._pending(session))["reseed"] = True
+        for obj in session.dirty:
+            if not session.is_modified(obj):
+                continue
+            if isinstance(obj, Transaction):
+                pending = pending or self._pending(session)
+                pending["deltas"].append((-1, _tx_values(obj, old=True)))
+                pending["deltas"].append((1, _tx_values(obj, old=False)))
+            elif isinstance(obj, (Budget, Category)):
+                (pending := pending or self._pending(session))["reseed"] = True
+        if pending is not None and any(values is None for _sign, values in pending["deltas"]):
+            pending["reseed"] = True
+
+    def _on_execute(self, state) -> None:
+        if not (state.is_insert or state.is_update or state.is_delete):
+            return
+        table = getattr(state.statement, "table", None)
+        if getattr(table, "name", None) in _RESEED_TABLES:
+            self._pending(state.session)["reseed"] = True
+
+    def _after_commit(self, session: Session) -> None:
+        pending = session.info.pop(_INFO_KEY, None)
+        if not pending:
+            return
+        if pending["reseed"] or self._month != _month_start(self.today()):
+            # сессия уже закоммичена — пересчитываем в своей
+            with self.session_factory() as own:
+                alerts = self._load(own)
+        else:
+            alerts = self._apply(pending["deltas"])
+        if self.on_alert is not None:
+            for alert in alerts:
+                self.on_alert(alert)
+
+    def _after_transaction_end(self, session: Session, transaction) -> None:
+        if transaction.parent is not None:
+            return
+        # после коммита здесь уже пусто; остаток — от отката или закрытия без коммита
+        pending = session.info.pop(_INFO_KEY, None)
+        if pending and pending["seeded"]:
+            # засевали внутри этой транзакции — суммы могли включать её запись
+            with self._lock:
+                self._month = None
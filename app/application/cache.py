@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+from sqlalchemy.orm import Session
+
+from app.infrastructure.db.generation import current_generation
+
+
+class GenerationCache:
+    """
+    Кэш результатов отчётов, привязанный к поколению записи базы.
+    Пока поколение не изменилось, значение по ключу (например, месяцу)
+    отдаётся без запроса; любая запись в данные сбрасывает весь кэш.
+    Размер ограничен: вытесняются давно не использованные ключи.
+    """
+
+    def __init__(self, maxsize: int = 64):
+        self.maxsize = maxsize
+        self._generation: int | None = None
+        self._items: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, generation: int, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            if generation != self._generation:
+                self._items.clear()
+                self._generation = generation
+            elif key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+
+        value = compute()
+
+        with self._lock:
+            # пока считали, поколение могло смениться — такое значение не сохраняем
+            if generation == self._generation:
+                self._items[key] = value
+                self._items.move_to_end(key)
+                while len(self._items) > self.maxsize:
+                    self._items.popitem(last=False)
+        return value
+
+    def cached(self, session: Session, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """То же, но поколение читается из переданной сессии."""
+        return self.get_or_compute(current_generation(session), key, compute)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._generation = None
@@ -0,0 +1,184 @@
+"""
+Автокатегоризация операций по правилам (см. CategoryRule).
+
+Все правила компилируются в один матчер:
+- ключевые слова — в автомат Ахо–Корасик: один проход по заметке
+  находит все слова сразу, сколько бы правил ни было;
+- регулярные выражения — в одно выражение-альтернативу (a)|(b)|…: один
+  search() отвечает, совпало ли хоть что-то (обычно нет), и только тогда
+  выражения правил проверяются по отдельности — альтернатива находит
+  одно совпадение, а нужны все.
+Кандидаты по заметке кэшируются: в выписках одни и те же заметки
+(«PYATEROCHKA 1234») повторяются тысячами.
+"""
+from __future__ import annotations
+
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Iterable
+
+from app.domain.enums import CategoryKind, RuleKind, TransactionType
+
+# сколько разных заметок помним в кэше кандидатов
+NOTE_CACHE_SIZE = 100_000
+
+# глобальные флаги в начале выражения правила: (?i), (?x) и т.п.
+_GLOBAL_FLAGS_RE = re.compile(r"\(\?([aiLmsux]+)\)")
+
+# какой тип категории подходит операции данного типа
+_KIND_FOR_TYPE = {
+    TransactionType.EXPENSE.value: CategoryKind.EXPENSE.value,
+    TransactionType.INCOME.value: CategoryKind.INCOME.value,
+}
+
+
+@dataclass(frozen=True)
+class RuleSpec:
+    id: int
+    category_id: int
+    category_kind: str
+    kind: str
+    pattern: str | None
+    min_cents: int | None = None
+    max_cents: int | None = None
+    account_id: int | None = None
+    priority: int = 100
+
+
+def _scoped_pattern(pattern: str) -> str:
+    """
+    Выражение правила как часть общей альтернативы. Глобальные флаги
+    допустимы только в самом начале всего выражения, поэтому ведущие (?ix)
+    переносятся в группу (?ix:…), действующую лишь на это правило.
+    """
+    flags: dict[str, None] = {}
+    pos = 0
+    while m := _GLOBAL_FLAGS_RE.match(pattern, pos):
+        flags.update(dict.fromkeys(m.group(1)))
+        pos = m.end()
+        if "x" in flags:
+            # в режиме x пробелы между группами флагов ничего не значат
+            while pos < len(pattern) and pattern[pos].isspace():
+                pos += 1
+    body = pattern[pos:]
+    if "x" in flags:
+        # перевод строки закрывает возможный комментарий «# …» перед скобкой
+        body += "\n"
+    return f"(?{''.join(flags)}:{body})"
+
+
+class AhoCorasick:
+    """Поиск всех вхождений набора слов за один проход по тексту."""
+
+    def __init__(self, words: dict[str, list[int]]):
+        # words: слово → метки, которые возвращаются при его вхождении
+        self._goto: list[dict[str, int]] = [{}]
+        out_sets: list[set[int]] = [set()]
+        for word, labels in words.items():
+            state = 0
+            for ch in word:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    out_sets.append(set())
+                state = nxt
+            out_sets[state].update(labels)
+
+        # ссылки неудач обходом в ширину; выходы наследуются по ним
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                out_sets[nxt] |= out_sets[self._fail[nxt]]
+        self._out = [frozenset(s) for s in out_sets]
+
+    def find_all(self, text: str) -> set[int]:
+        goto, fail, out = self._goto, self._fail, self._out
+        found: set[int] = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found |= out[state]
+        return found
+
+
+class Categorizer:
+    """
+    Собранный набор правил. categorize() — пакетный вызов для импорта
+    и перекатегоризации; возвращает category_id или None для каждой операции.
+    """
+
+    def __init__(self, rules: Iterable[RuleSpec]):
+        # ранг = позиция в порядке (priority, id): меньший ранг побеждает
+        self.rules = sorted(rules, key=lambda r: (r.priority, r.id))
+        keywords: dict[str, list[int]] = {}
+        regexes: list[tuple[int, re.Pattern]] = []
+        always: list[int] = []
+        for rank, rule in enumerate(self.rules):
+            pattern = (rule.pattern or "").strip()
+            if not pattern:
+                always.append(rank)
+            elif rule.kind == RuleKind.REGEX.value:
+                regexes.append((rank, re.compile(pattern, re.IGNORECASE)))
+            else:
+                keywords.setdefault(pattern.lower(), []).append(rank)
+
+        self._always = frozenset(always)
+        self._automaton = AhoCorasick(keywords) if keywords else None
+        self._regexes = regexes
+        self._any_regex = (
+            re.compile("|".join(_scoped_pattern(r.pattern) for _rank, r in regexes), re.IGNORECASE)
+            if regexes
+            else None
+        )
+        self._cache: dict[str, tuple[int, ...]] = {}
+
+    def _candidates(self, note: str) -> tuple[int, ...]:
+        """Ранги правил, чьё условие по заметке выполнено, по возрастанию."""
+        cached = self._cache.get(note)
+        if cached is not None:
+            return cached
+        ranks = set(self._always)
+        if self._automaton is not None:
+            ranks |= self._automaton.find_all(note.lower())
+        if self._any_regex is not None and self._any_regex.search(note):
+            ranks.update(rank for rank, rx in self._regexes if rx.search(note))
+        result = tuple(sorted(ranks))
+        if len(self._cache) >= NOTE_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[note] = result
+        return result
+
+    def categorize_one(self, tx_type: str, account_id: int | None, amount_cents: int, note: str | None) -> int | None:
+        want_kind = _KIND_FOR_TYPE.get(tx_type)
+        if want_kind is None:
+            return None
+        for rank in self._candidates(note or ""):
+            rule = self.rules[rank]
+            if rule.category_kind != want_kind:
+                continue
+            if rule.account_id is not None and rule.account_id != account_id:
+                continue
+            if rule.min_cents is not None and amount_cents < rule.min_cents:
+                continue
+            if rule.max_cents is not None and amount_cents > rule.max_cents:
+                continue
+            return rule.category_id
+        return None
+
+    def categorize(self, items: Iterable[tuple[str, int | None, int, str | None]]) -> list[int | None]:
+        """items — (тип, счёт, сумма в копейках по модулю, заметка)."""
+        one = self.categorize_one
+        return [one(t, a, amount, note) for t, a, amount, note in items]
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from app.infrastructure.db import archive
+from app.infrastructure.db.session import engine, get_database_path
+
+
+def archive_closed_years(before_year: int, vacuum: bool = True) -> dict[int, int]:
+    """
+    Переносит операции до 01.01.before_year в годовые архивные файлы.
+    Возвращает {год: перенесено строк}.
+    """
+    db_path = get_database_path()
+    if db_path is None:
+        raise ValueError("Архивирование доступно только для файловой SQLite базы")
+
+    with engine.connect() as conn:
+        moved = archive.move_closed_years(conn, db_path, before_year)
+
+    if moved and vacuum:
+        # возвращаем освободившиеся страницы, чтобы "горячий" файл реально уменьшился
+        with engine.connect() as conn:
+            conn.exec_driver_sql("VACUUM main")
+
+    # новые соединения должны подключить и свежие архивы
+    archive.discover_years(db_path)
+    engine.dispose()
+    return moved
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import gzip
+import os
+import shutil
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable
+
+from app.infrastructure.db import archive
+
+
+@dataclass(frozen=True)
+class BackupConfig:
+    backup_dir: Path
+    keep: int = 7                  # сколько последних копий хранить
+    compress: bool = True          # gzip готовой копии
+    pages_per_step: int = 64       # страниц за шаг backup API
+    step_sleep: float = 0.005      # пауза между шагами, чтобы не держать блокировку
+    interval_hours: int = 24       # период автоматического бэкапа
+
+
+def backup_config_from_env(db_path: Path) -> BackupConfig:
+    """
+    Настройки через переменные окружения:
+    BUDGET_BACKUP_DIR, BUDGET_BACKUP_KEEP, BUDGET_BACKUP_COMPRESS (0/1), BUDGET_BACKUP_INTERVAL_HOURS.
+    """
+    return BackupConfig(
+        backup_dir=Path(os.getenv("BUDGET_BACKUP_DIR", str(db_path.parent / "backups"))),
+        keep=int(os.getenv("BUDGET_BACKUP_KEEP", "7")),
+        compress=os.getenv("BUDGET_BACKUP_COMPRESS", "1") != "0",
+        interval_hours=int(os.getenv("BUDGET_BACKUP_INTERVAL_HOURS", "24")),
+    )
+
+
+def list_backups(config: BackupConfig, db_path: Path) -> list[Path]:
+    """Копии базы, от новых к старым (имя содержит метку времени)."""
+    if not config.backup_dir.is_dir():
+        return []
+    items = [
+        p for p in config.backup_dir.glob(f"{db_path.stem}-*")
+        if p.name.endswith(".sqlite3") or p.name.endswith(".sqlite3.gz")
+    ]
+    return sorted(items, key=lambda p: p.name, reverse=True)
+
+
+def archive_copies_dir(backup: Path) -> Path:
+    """Каталог с копиями архивов закрытых лет, сделанными вместе с копией базы backup."""
+    name = backup.name.removesuffix(".gz").removesuffix(".sqlite3")
+    return backup.with_name(name + ".archive")
+
+
+def backup_due(config: BackupConfig, db_path: Path, now: datetime | None = None) -> bool:
+    items = list_backups(config, db_path)
+    if not items:
+        return True
+    now = now or datetime.now()
+    last = datetime.fromtimestamp(items[0].stat().st_mtime)
+    return now - last >= timedelta(hours=config.interval_hours)
+
+
+def rotate_backups(config: BackupConfig, db_path: Path) -> list[Path]:
+    removed = list_backups(config, db_path)[config.keep:]
+    for p in removed:
+        p.unlink(missing_ok=True)
+        shutil.rmtree(archive_copies_dir(p), ignore_errors=True)
+    return removed
+
+
+def _copy_database(
+    source: Path,
+    target: Path,
+    config: BackupConfig,
+    on_step: Callable[[int, int, int], None],
+) -> Path:
+    """
+    Копия одного файла SQLite через промежуточный .part (и gzip, если включён).
+    Недописанные файлы удаляются и при ошибке. Возвращает путь готовой копии.
+    """
+    part = target.with_name(target.name + ".part")
+    done = target.with_name(target.name + ".gz") if config.compress else target
+    try:
+        src = sqlite3.connect(source)
+        dst = sqlite3.connect(part)
+        try:
+            src.backup(dst, pages=config.pages_per_step, progress=on_step)
+        finally:
+            dst.close()
+            src.close()
+
+        if config.compress:
+            with open(part, "rb") as f_in, gzip.open(done, "wb", compresslevel=6) as f_out:
+                shutil.copyfileobj(f_in, f_out)
+        else:
+            part.replace(done)
+    except BaseException:
+        done.unlink(missing_ok=True)
+        raise
+    finally:
+        part.unlink(missing_ok=True)
+    return done
+
+
+def run_backup(
+    db_path: Path,
+    config: BackupConfig,
+    progress: Callable[[int, int], None] | None = None,
+) -> Path:
+    """
+    Онлайн-копия через sqlite3.Connection.backup небольшими порциями страниц.
+    Между шагами соединение отпускает блокировку, так что GUI и запись
+    не ждут всю копию целиком. progress(done_pages, total_pages) — по всем
+    копируемым файлам вместе.
+
+    Архивы закрытых лет копируются в каталог рядом с копией базы
+    (см. archive_copies_dir). Если хоть один файл не скопировался,
+    вся копия удаляется: без архивов она неполна.
+    """
+    config.backup_dir.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    target = config.backup_dir / f"{db_path.stem}-{stamp}.sqlite3"
+    archives_dir = archive_copies_dir(target)
+    sources = [(db_path, target)] + [
+        (path, archives_dir / path.name) for path in archive.archive_files(db_path).values()
+    ]
+
+    # общий прогресс: страницы уже скопированных файлов + текущего
+    finished_pages = 0
+    pending_pages = {src: _page_count(src) for src, _ in sources}
+
+    def _on_step(_status: int, remaining: int, total: int) -> None:
+        if progress is not None:
+            rest = sum(pending_pages.values()) - pending_pages[current]
+            progress(finished_pages + total - remaining, finished_pages + total + rest)
+        if remaining:
+            time.sleep(config.step_sleep)
+
+    copied: Path | None = None
+    try:
+        for current, dest in sources:
+            dest.parent.mkdir(exist_ok=True)
+            result = _copy_database(current, dest, config, _on_step)
+            if copied is None:
+                copied = result
+            finished_pages += pending_pages.pop(current)
+    except BaseException:
+        if copied is not None:
+            copied.unlink(missing_ok=True)
+        shutil.rmtree(archives_dir, ignore_errors=True)
+        raise
+
+    rotate_backups(config, db_path)
+    return copied
+
+
+def _page_count(path: Path) -> int:
+    conn = sqlite3.connect(path)
+    try:
+        return int(conn.execute("PRAGMA page_count").fetchone()[0])
+    finally:
+        conn.close()
@@ -2,22 +2,53 @@ from __future__ import annotations
 
 from datetime import date
 
+from app.application.cache import GenerationCache
 from app.infrastructure.db.models import Budget
 from app.infrastructure.repositories.budgets import BudgetsRepo
+from app.infrastructure.repositories.reports import ReportsRepo, BudgetEnvelopeRow
 
 
-def upsert_budget(repo: BudgetsRepo, month_start: date, category_id: int, limit_cents: int) -> Budget:
+def upsert_budget(
+    repo: BudgetsRepo,
+    month_start: date,
+    category_id: int,
+    limit_cents: int,
+    rollover: bool = False,
+) -> Budget:
     """
     Создаёт или обновляет бюджет на месяц по категории.
     Уникальность: (month_start, category_id)
+    rollover — остаток или перерасход переносится на следующий месяц.
     """
     existing = repo.get_by_month_and_category(month_start, category_id)
     if existing is not None:
         existing.limit_cents = limit_cents
+        existing.rollover = rollover
         repo.commit()
         return existing
 
-    b = Budget(month_start=month_start, category_id=category_id, limit_cents=limit_cents)
+    b = Budget(month_start=month_start, category_id=category_id, limit_cents=limit_cents, rollover=rollover)
     repo.add(b)
     repo.commit()
     return b
+
+
+def get_budget_envelopes(
+    repo: ReportsRepo,
+    since: date,
+    through: date,
+    cache: GenerationCache | None = None,
+) -> list[BudgetEnvelopeRow]:
+    """
+    Конверты бюджетов по месяцам [since, through] с переносом остатков.
+    С cache результат по периоду переиспользуется, пока данные не менялись.
+    """
+    since = date(since.year, since.month, 1)
+    through = date(through.year, through.month, 1)
+    if cache is None:
+        return repo.budget_envelopes(since, through)
+    return cache.cached(
+        repo.session,
+        ("budget_envelopes", since, through),
+        lambda: repo.budget_envelopes(since, through),
+    )
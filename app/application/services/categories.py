@@ -34,8 +34,21 @@ def make_slug(name: str) -> str:
     return s or "category"
 
 
-def create_category(repo: CategoriesRepo, kind: str, name: str, slug: str | None = None) -> Category:
+def create_category(
+    repo: CategoriesRepo,
+    kind: str,
+    name: str,
+    slug: str | None = None,
+    parent_id: int | None = None,
+) -> Category:
     kind = kind or CategoryKind.EXPENSE.value
+
+    if parent_id is not None:
+        parent = repo.get_by_id(parent_id)
+        if parent is None:
+            raise ValueError("Родительская категория не найдена")
+        if parent.kind != kind:
+            raise ValueError("Подкатегория должна быть того же типа, что и родитель")
     base_slug = slug or make_slug(name)
 
     # делаем slug уникальным (если такой уже есть — добавим -2, -3, ...)
@@ -45,7 +58,33 @@ def create_category(repo: CategoriesRepo, kind: str, name: str, slug: str | None
         candidate = f"{base_slug}-{i}"
         i += 1
 
-    cat = Category(kind=kind, name=name, slug=candidate)
+    cat = Category(kind=kind, name=name, slug=candidate, parent_id=parent_id)
     repo.add(cat)
+    repo.link_closure(cat)
+    repo.session.commit()
+    return cat
+
+
+def move_category(repo: CategoriesRepo, category_id: int, new_parent_id: int | None) -> Category:
+    """
+    Переносит категорию (вместе с подкатегориями) под другого родителя
+    или в корень (new_parent_id=None).
+    """
+    cat = repo.get_by_id(category_id)
+    if cat is None:
+        raise ValueError("Категория не найдена")
+    if cat.parent_id == new_parent_id:
+        return cat
+
+    if new_parent_id is not None:
+        parent = repo.get_by_id(new_parent_id)
+        if parent is None:
+            raise ValueError("Родительская категория не найдена")
+        if parent.kind != cat.kind:
+            raise ValueError("Родитель должен быть того же типа, что и категория")
+        if new_parent_id in repo.subtree_ids(category_id):
+            raise ValueError("Нельзя перенести категорию внутрь её же подкатегории")
+
+    repo.move_subtree(category_id, new_parent_id)
     repo.session.commit()
     return cat
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import re
+
+from app.application.cache import GenerationCache
+from app.application.categorizer import Categorizer, RuleSpec
+from app.domain.enums import CategoryKind, RuleKind
+from app.infrastructure.db.models import CategoryRule
+from app.infrastructure.repositories.categories import CategoriesRepo
+from app.infrastructure.repositories.category_rules import CategoryRulesRepo
+from app.infrastructure.repositories.transactions import TransactionsRepo
+
+# обратные ссылки \1.. и условия (?(1)…) в общем выражении указывали бы на чужие группы
+_BACKREF_RE = re.compile(r"\\[1-9]|\(\?\(")
+
+
+def validate_pattern(kind: str, pattern: str | None) -> str | None:
+    pattern = (pattern or "").strip() or None
+    if pattern is None or kind != RuleKind.REGEX.value:
+        return pattern
+    try:
+        compiled = re.compile(pattern)
+        # и в составе общего выражения — так, как его соберёт Categorizer
+        Categorizer([RuleSpec(0, 0, CategoryKind.EXPENSE.value, kind, pattern)])
+    except re.error as e:
+        raise ValueError(f"Некорректное регулярное выражение: {e}") from None
+    if compiled.groupindex or _BACKREF_RE.search(pattern):
+        raise ValueError("Именованные группы, обратные ссылки и условия по группам в правилах не поддерживаются")
+    return pattern
+
+
+def add_rule(
+    repo: CategoryRulesRepo,
+    category_id: int,
+    kind: str,
+    pattern: str | None,
+    min_cents: int | None = None,
+    max_cents: int | None = None,
+    account_id: int | None = None,
+    priority: int = 100,
+) -> CategoryRule:
+    if CategoriesRepo(repo.session).get_by_id(category_id) is None:
+        raise ValueError("Категория не найдена")
+    pattern = validate_pattern(kind, pattern)
+    if min_cents is not None and max_cents is not None and min_cents > max_cents:
+        raise ValueError("Минимальная сумма больше максимальной")
+    if pattern is None and min_cents is None and max_cents is None and account_id is None:
+        raise ValueError("У правила должно быть хотя бы одно условие")
+
+    rule = CategoryRule(
+        category_id=category_id,
+        kind=kind,
+        pattern=pattern,
+        min_cents=min_cents,
+        max_cents=max_cents,
+        account_id=account_id,
+        priority=priority,
+    )
+    repo.add(rule)
+    repo.session.commit()
+    return rule
+
+
+def build_categorizer(repo: CategoryRulesRepo) -> Categorizer:
+    return Categorizer(
+        RuleSpec(
+            id=r.id,
+            category_id=r.category_id,
+            category_kind=kind,
+            kind=r.kind,
+            pattern=r.pattern,
+            min_cents=r.min_cents,
+            max_cents=r.max_cents,
+            account_id=r.account_id,
+            priority=r.priority,
+        )
+        for r, kind in repo.list_active_with_kind()
+    )
+
+
+def load_categorizer(repo: CategoryRulesRepo, cache: GenerationCache | None = None) -> Categorizer:
+    """Матчер собирается заново только после изменений в базе (правила меняют поколение записи)."""
+    if cache is None:
+        return build_categorizer(repo)
+    return cache.cached(repo.session, ("categorizer",), lambda: build_categorizer(repo))
+
+
+def recategorize(tx_repo: TransactionsRepo, categorizer: Categorizer, tx_ids: list[int]) -> int:
+    """
+    Применяет правила к операциям tx_ids. Операции, к которым не подошло
+    ни одно правило, не меняются. Возвращает число изменённых.
+    """
+    facts = tx_repo.categorization_facts(tx_ids)
+    new_ids = categorizer.categorize((t, acc, amount, note) for _id, t, acc, amount, note, _cat in facts)
+    changes = {
+        tx_id: new_cat
+        for (tx_id, *_rest, old_cat), new_cat in zip(facts, new_ids)
+        if new_cat is not None and new_cat != old_cat
+    }
+    tx_repo.set_categories(changes)
+    tx_repo.commit()
+    return len(changes)
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from datetime import date, timedelta
+from typing import Callable, ContextManager
+
+from sqlalchemy.orm import Session
+
+from app.application.cache import GenerationCache
+from app.infrastructure.db.generation import current_generation
+from app.application.services.reports import (
+    get_category_comparison,
+    get_daily_totals,
+    get_balance_trend,
+    get_spending_trend,
+)
+from app.infrastructure.repositories.reports import (
+    ReportsRepo,
+    AccountBalanceRow,
+    PeriodSummary,
+    CategoryTotalRow,
+    CategoryComparisonRow,
+)
+
+# сколько запросов дашборда выполняется одновременно (по соединению из пула на каждый)
+DASHBOARD_WORKERS = 4
+
+
+@dataclass(frozen=True)
+class DashboardSnapshot:
+    """Все данные дашборда на один момент; виджеты только читают его."""
+    generation: int  # поколение записи базы на начало сборки
+    today: date
+    month_start: date
+    summary: PeriodSummary
+    balances: tuple[AccountBalanceRow, ...]
+    top_categories: tuple[CategoryTotalRow, ...]
+    comparison: tuple[CategoryComparisonRow, ...]
+    heatmap_year: int
+    daily_totals: tuple[int, ...]
+    trend_days: int  # 0 — вся история
+    balance_trend: tuple[tuple[date, ...], tuple[int, ...]]
+    spending_trend: tuple[tuple[date, ...], tuple[int, ...]]
+    elapsed_ms: float
+
+
+def _trend_start(repo: ReportsRepo, today: date, trend_days: int) -> date:
+    if trend_days:
+        return today - timedelta(days=trend_days)
+    return repo.first_transaction_date() or today
+
+
+def _frozen_series(series: tuple[list, list]) -> tuple[tuple, tuple]:
+    days, values = series
+    return tuple(days), tuple(values)
+
+
+def build_dashboard_snapshot(
+    open_session: Callable[[], ContextManager[Session]],
+    make_repo: Callable[[Session], ReportsRepo],
+    cache: GenerationCache | None = None,
+    heatmap_year: int | None = None,
+    trend_days: int = 365,
+    today: date | None = None,
+    max_workers: int = DASHBOARD_WORKERS,
+) -> DashboardSnapshot:
+    """
+    Собирает данные всех виджетов дашборда. Каждый запрос идёт в своём
+    потоке на своей сессии (своё соединение из пула), поэтому общая задержка —
+    это самый медленный запрос, а не сумма всех. Части, уже посчитанные
+    при текущем поколении записи, берутся из cache.
+
+    trend_days=0 — графики за всю историю.
+    """
+    today = today or date.today()
+    month_start = date(today.year, today.month, 1)
+    heatmap_year = heatmap_year or today.year
+
+    def cached(repo: ReportsRepo, key, compute):
+        if cache is None:
+            return compute()
+        return cache.cached(repo.session, key, compute)
+
+    tasks: dict[str, Callable[[ReportsRepo], object]] = {
+        "summary": lambda r: cached(
+            r, ("period_summary", month_start, today), lambda: r.period_summary(month_start, today)
+        ),
+        "balances": lambda r: cached(r, ("account_balances",), r.account_balances),
+        "top_categories": lambda r: cached(
+            r,
+            ("top_expense_categories", month_start, today),
+            lambda: r.top_expense_categories(month_start, today, limit=10, rollup=True),
+        ),
+        "comparison": lambda r: get_category_comparison(r, month_start, through=today, cache=cache),
+        "daily_totals": lambda r: get_daily_totals(r, heatmap_year, cache=cache),
+        "balance_trend": lambda r: get_balance_trend(r, _trend_start(r, today, trend_days), today, cache=cache),
+        "spending_trend": lambda r: get_spending_trend(r, _trend_start(r, today, trend_days), today, cache=cache),
+    }
+
+    def run(task: Callable[[ReportsRepo], object]):
+        with open_session() as session:
+            return task(make_repo(session))
+
+    t0 = time.perf_counter()
+    # поколение читаем до запросов: если запись случится во время сборки,
+    # снимок окажется «старше» базы и при следующей проверке пересоберётся
+    with open_session() as session:
+        generation = current_generation(session)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="dashboard") as pool:
+        futures = {name: pool.submit(run, task) for name, task in tasks.items()}
+        results = {name: f.result() for name, f in futures.items()}
+
+    return DashboardSnapshot(
+        generation=generation,
+        today=today,
+        month_start=month_start,
+        summary=results["summary"],
+        balances=tuple(results["balances"]),
+        top_categories=tuple(results["top_categories"]),
+        comparison=tuple(results["comparison"]),
+        heatmap_year=heatmap_year,
+        daily_totals=tuple(results["daily_totals"]),
+        trend_days=trend_days,
+        balance_trend=_frozen_series(results["balance_trend"]),
+        spending_trend=_frozen_series(results["spending_trend"]),
+        elapsed_ms=(time.perf_counter() - t0) * 1000,
+    )
+
+
+def snapshot_to_dict(snap: DashboardSnapshot) -> dict:
+    """Снимок в JSON-совместимый dict (даты — ISO-строки)."""
+    data = asdict(snap)
+    data["today"] = snap.today.isoformat()
+    data["month_start"] = snap.month_start.isoformat()
+    for key in ("balance_trend", "spending_trend"):
+        days, values = getattr(snap, key)
+        data[key] = [[d.isoformat() for d in days], list(values)]
+    return data
+
+
+def snapshot_from_dict(data: dict) -> DashboardSnapshot:
+    def series(raw) -> tuple[tuple[date, ...], tuple[int, ...]]:
+        days, values = raw
+        return tuple(date.fromisoformat(d) for d in days), tuple(int(v) for v in values)
+
+    return DashboardSnapshot(
+        generation=int(data["generation"]),
+        today=date.fromisoformat(data["today"]),
+        month_start=date.fromisoformat(data["month_start"]),
+        summary=PeriodSummary(**data["summary"]),
+        balances=tuple(AccountBalanceRow(**r) for r in data["balances"]),
+        top_categories=tuple(CategoryTotalRow(**r) for r in data["top_categories"]),
+        comparison=tuple(CategoryComparisonRow(**r) for r in data["comparison"]),
+        heatmap_year=int(data["heatmap_year"]),
+        daily_totals=tuple(int(v) for v in data["daily_totals"]),
+        trend_days=int(data["trend_days"]),
+        balance_trend=series(data["balance_trend"]),
+        spending_trend=series(data["spending_trend"]),
+        elapsed_ms=float(data["elapsed_ms"]),
+    )
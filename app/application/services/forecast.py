@@ -0,0 +1,267 @@
+"""
+Прогноз денежного потока на 3–12 месяцев вперёд.
+
+История берётся одним GROUP BY: помесячные обороты по (счёт, категория, тип)
+за последние FORECAST_HISTORY_MONTHS закрытых месяцев. Операции повторяющихся
+правил из истории исключаются. Они добавляются к прогнозу по своему
+расписанию, иначе попали бы в него дважды.
+
+Все ряды (категории и счета) лежат в одной матрице «ряд × месяц», и тренд
+с сезонными средними по календарным месяцам подбираются для всех рядов
+сразу одним МНК (см. project_series). Python-циклов по рядам нет.
+
+Баланс счёта на конец месяца = текущий баланс + накопленный прогноз оборотов.
+Остаток текущего месяца учитывается только по повторяющимся операциям.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import numpy as np
+
+from app.application.cache import GenerationCache
+from app.application.services.recurring import occurrences
+from app.domain.enums import TransactionType
+from app.infrastructure.repositories.recurring import RecurringRulesRepo
+from app.infrastructure.repositories.reports import ReportsRepo, MonthlyFlowRow
+
+FORECAST_HISTORY_MONTHS = 24
+FORECAST_MIN_HORIZON = 3
+FORECAST_MAX_HORIZON = 12
+# сезонность по календарным месяцам имеет смысл, когда каждый встретился хотя бы раз
+_SEASONAL_MIN_MONTHS = 12
+_TYPES = (TransactionType.EXPENSE.value, TransactionType.INCOME.value, TransactionType.TRANSFER.value)
+_TYPE_CODE = {t: i for i, t in enumerate(_TYPES)}
+
+
+@dataclass(frozen=True)
+class CategoryForecastRow:
+    category_id: int
+    tx_type: str              # expense / income / transfer (накопления)
+    average_cents: int        # среднее за месяц в истории
+    values_cents: tuple[int, ...]  # по месяцам прогноза
+
+
+@dataclass(frozen=True)
+class AccountForecastRow:
+    account_id: int
+    balance_cents: int             # сейчас
+    balances_cents: tuple[int, ...]  # на конец каждого месяца прогноза
+
+
+@dataclass(frozen=True)
+class CashFlowForecast:
+    today: date
+    months: tuple[date, ...]  # первые числа месяцев прогноза
+    categories: tuple[CategoryForecastRow, ...]
+    accounts: tuple[AccountForecastRow, ...]
+    compute_ms: float  # время векторного расчёта (без запроса истории)
+
+    @property
+    def total_balances_cents(self) -> tuple[int, ...]:
+        """Баланс всех счетов на конец каждого месяца прогноза."""
+        if not self.accounts:
+            return (0,) * len(self.months)
+        return tuple(int(v) for v in np.sum([a.balances_cents for a in self.accounts], axis=0))
+
+
+def _month_index(d: date) -> int:
+    return d.year * 12 + d.month - 1
+
+
+def _month_from_index(i: int) -> date:
+    return date(i // 12, i % 12 + 1, 1)
+
+
+def project_series(history: np.ndarray, first_month: int, horizon: int) -> np.ndarray:
+    """
+    Прогноз для матрицы history (ряды × месяцы, первый месяц — first_month
+    в нумерации год*12+месяц) на horizon месяцев после последнего.
+
+    При истории от года тренд и сезонность подбираются вместе одним МНК
+    для всех рядов сразу: общий наклон плюс свой уровень на каждый
+    календарный месяц, т.е. сезонные средние за вычетом тренда.
+    Короче года — только прямая тренда.
+    """
+    n, t = history.shape
+    if n == 0 or t == 0:
+        return np.zeros((n, horizon))
+    x = np.arange(t, dtype=np.float64)
+    future_x = np.arange(t, t + horizon, dtype=np.float64)
+    if t >= _SEASONAL_MIN_MONTHS:
+        months = np.arange(12)
+        design = np.column_stack([x, (first_month + np.arange(t))[:, None] % 12 == months])
+        future = np.column_stack([future_x, (first_month + t + np.arange(horizon))[:, None] % 12 == months])
+        coef = np.linalg.lstsq(design, history.T, rcond=None)[0]
+        return (future @ coef).T
+    if t >= 2:
+        slope, intercept = np.polyfit(x, history.T, 1)
+    else:
+        slope, intercept = np.zeros(n), history[:, 0].astype(np.float64)
+    return intercept[:, None] + slope[:, None] * future_x
+
+
+def _recurring_items(repo: ReportsRepo, today: date, through: date) -> FlowColumns:
+    """
+    Ещё не проведённые вхождения повторяющихся правил в (today, through]:
+    (индекс месяца, категория, тип, счёт, сумма со знаком для счёта).
+    """
+    items = []
+    for rule in RecurringRulesRepo(repo.session).list_active():
+        after = max(today, rule.materialized_through) if rule.materialized_through else today
+        for day in occurrences(rule, after, through):
+            m = _month_index(day)
+            if rule.type == TransactionType.TRANSFER.value:
+                items.append((m, rule.category_id, rule.type, rule.account_id, -rule.amount_cents))
+                items.append((m, None, rule.type, rule.to_account_id, rule.amount_cents))
+            else:
+                sign = 1 if rule.type == TransactionType.INCOME.value else -1
+                items.append((m, rule.category_id, rule.type, rule.account_id, sign * rule.amount_cents))
+    return FlowColumns.from_rows(items)
+
+
+@dataclass(frozen=True)
+class FlowColumns:
+    """Помесячные обороты колонками NumPy (категория -1 — без категории)."""
+    month: np.ndarray     # год*12 + месяц-1
+    category: np.ndarray
+    type_code: np.ndarray  # индекс в _TYPES
+    account: np.ndarray
+    amount: np.ndarray    # float64, со знаком для счёта
+
+    @classmethod
+    def from_rows(cls, rows: list[tuple[int, int | None, str, int, int]]) -> FlowColumns:
+        """Из кортежей (месяц, категория, тип, счёт, сумма)."""
+        table = np.array(
+            [(m, -1 if cat is None else cat, _TYPE_CODE[tx_type], acc, cents) for m, cat, tx_type, acc, cents in rows],
+            dtype=np.int64,
+        ).reshape(len(rows), 5)
+        month, category, type_code, account, amount = table.T
+        return cls(month, category, type_code, account, amount.astype(np.float64))
+
+    @classmethod
+    def from_flows(cls, flows: list[MonthlyFlowRow]) -> FlowColumns:
+        return cls.from_rows([
+            (_month_index(f.month), f.category_id, f.tx_type, f.account_id, f.amount_cents) for f in flows
+        ])
+
+
+def build_forecast(
+    history: FlowColumns,
+    balances: dict[int, int],
+    recurring: FlowColumns,
+    history_start: date,
+    today: date,
+    horizon: int,
+) -> CashFlowForecast:
+    """Векторный расчёт прогноза по готовой истории (без запросов и циклов по рядам)."""
+    t0 = time.perf_counter()
+    first = _month_index(history_start)
+    current = _month_index(today)
+    t = max(current - first, 0)  # закрытые месяцы истории
+
+    col = history.month - first
+    ok = (col >= 0) & (col < t)
+    col, h_cat, h_typ, h_acc, h_amount = (
+        col[ok], history.category[ok], history.type_code[ok], history.account[ok], history.amount[ok]
+    )
+    r_cat, r_typ, r_acc, r_amount = recurring.category, recurring.type_code, recurring.account, recurring.amount
+    k = recurring.month - current - 1  # -1 — остаток текущего месяца
+
+    transfer = _TYPE_CODE[TransactionType.TRANSFER.value]
+    income = _TYPE_CODE[TransactionType.INCOME.value]
+
+    # ряды категорий — (категория, тип); у перевода только списание (строка с минусом)
+    h_is_cat = (h_cat >= 0) & ~((h_typ == transfer) & (h_amount > 0))
+    r_is_cat = (r_cat >= 0) & ~((r_typ == transfer) & (r_amount > 0)) & (k >= 0)
+    h_key = h_cat * len(_TYPES) + h_typ
+    r_key = r_cat * len(_TYPES) + r_typ
+    cat_keys, cat_row = np.unique(np.concatenate([h_key[h_is_cat], r_key[r_is_cat]]), return_inverse=True)
+    h_cat_row, r_cat_row = cat_row[: h_is_cat.sum()], cat_row[h_is_cat.sum():]
+
+    acc_keys = np.unique(np.concatenate([np.fromiter(balances, dtype=np.int64, count=len(balances)), h_acc, r_acc]))
+    h_acc_row = np.searchsorted(acc_keys, h_acc)
+    r_acc_row = np.searchsorted(acc_keys, r_acc)
+
+    # в рядах категорий суммы положительные: доход как есть, расходы и накопления — без минуса
+    h_sign = np.where(h_typ == income, 1.0, -1.0)
+    r_sign = np.where(r_typ == income, 1.0, -1.0)
+    cat_hist = np.zeros((len(cat_keys), t))
+    np.add.at(cat_hist, (h_cat_row, col[h_is_cat]), (h_sign * h_amount)[h_is_cat])
+    acc_hist = np.zeros((len(acc_keys), t))
+    np.add.at(acc_hist, (h_acc_row, col), h_amount)
+
+    # все ряды — одной матрицей; колонка 0 — текущий месяц, его прогнозом не закрываем
+    projected = project_series(np.vstack([cat_hist, acc_hist]), first, horizon + 1)[:, 1:]
+    cat_fc = np.maximum(projected[: len(cat_keys)], 0.0)  # траты не уходят в минус
+    acc_fc = projected[len(cat_keys):]
+
+    # известные повторяющиеся операции — поверх
+    np.add.at(cat_fc, (r_cat_row, k[r_is_cat]), (r_sign * r_amount)[r_is_cat])
+    ahead = k >= 0
+    np.add.at(acc_fc, (r_acc_row[ahead], k[ahead]), r_amount[ahead])
+    acc_rest = np.zeros(len(acc_keys))
+    np.add.at(acc_rest, r_acc_row[~ahead], r_amount[~ahead])
+
+    start = np.array([balances.get(int(a), 0) for a in acc_keys], dtype=np.float64)
+    acc_balances = (start + acc_rest)[:, None] + np.cumsum(acc_fc, axis=1)
+    averages = cat_hist.mean(axis=1) if t else np.zeros(len(cat_keys))
+
+    cat_out = np.rint(cat_fc).astype(np.int64).tolist()
+    acc_out = np.rint(acc_balances).astype(np.int64).tolist()
+    averages = np.rint(averages).astype(np.int64).tolist()
+    categories = tuple(
+        CategoryForecastRow(int(key) // len(_TYPES), _TYPES[int(key) % len(_TYPES)], averages[i], tuple(cat_out[i]))
+        for i, key in enumerate(cat_keys.tolist())
+    )
+    accounts = tuple(
+        AccountForecastRow(acc_id, balances.get(acc_id, 0), tuple(acc_out[i]))
+        for i, acc_id in enumerate(acc_keys.tolist())
+    )
+    return CashFlowForecast(
+        today=today,
+        months=tuple(_month_from_index(current + 1 + m) for m in range(horizon)),
+        categories=categories,
+        accounts=accounts,
+        compute_ms=(time.perf_counter() - t0) * 1000,
+    )
+
+
+def get_cash_flow_forecast(
+    repo: ReportsRepo,
+    horizon: int = 6,
+    today: date | None = None,
+    cache: GenerationCache | None = None,
+) -> CashFlowForecast:
+    """
+    Прогноз балансов счетов и оборотов категорий на horizon месяцев.
+    С cache и история, и прогноз переиспользуются, пока данные не менялись.
+    """
+    if not FORECAST_MIN_HORIZON <= horizon <= FORECAST_MAX_HORIZON:
+        raise ValueError(f"Горизонт прогноза — от {FORECAST_MIN_HORIZON} до {FORECAST_MAX_HORIZON} месяцев")
+    today = today or date.today()
+    current = _month_index(today)
+
+    def cached(key, compute):
+        return compute() if cache is None else cache.cached(repo.session, key, compute)
+
+    def compute() -> CashFlowForecast:
+        first_tx = repo.first_transaction_date()
+        history_start = _month_from_index(current - FORECAST_HISTORY_MONTHS)
+        if first_tx is not None:
+            history_start = max(history_start, date(first_tx.year, first_tx.month, 1))
+        history_end = date(today.year, today.month, 1) - timedelta(days=1)
+        # история в колонках переживает смену горизонта и даты, пока данные не менялись
+        history = cached(
+            ("monthly_flows", history_start, history_end),
+            lambda: FlowColumns.from_flows(repo.monthly_flows(history_start, history_end, non_recurring=True)),
+        )
+        # тот же ключ, что у дашборда: балансы уже посчитаны для его таблицы
+        balances = {b.account_id: b.balance_cents for b in cached(("account_balances",), repo.account_balances)}
+        horizon_end = _month_from_index(current + horizon + 1) - timedelta(days=1)
+        recurring = _recurring_items(repo, today, horizon_end)
+        return build_forecast(history, balances, recurring, history_start, today, horizon)
+
+    return cached(("cash_flow_forecast", today, horizon), compute)
@@ -0,0 +1,118 @@
+"""
+Цели накоплений: прогресс берётся из saved_cents (ведут триггеры), прогноз
+даты достижения — из темпа взносов за последние GOAL_VELOCITY_DAYS дней.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from app.domain.enums import CategoryKind
+from app.infrastructure.db.models import Goal
+from app.infrastructure.repositories.accounts import AccountsRepo
+from app.infrastructure.repositories.categories import CategoriesRepo
+from app.infrastructure.repositories.goals import GoalsRepo
+
+# по какому окну оценивается темп взносов
+GOAL_VELOCITY_DAYS = 90
+AVG_MONTH_DAYS = 30.4375
+
+
+@dataclass(frozen=True)
+class GoalProgress:
+    goal_id: int
+    name: str
+    target_cents: int
+    saved_cents: int
+    deadline: date | None
+    per_month_cents: int  # средний взнос в месяц за окно темпа
+    projected_date: date | None  # None — цель достигнута или взносов за окно нет
+    needed_per_month_cents: int | None  # сколько откладывать, чтобы успеть к сроку
+
+    @property
+    def remaining_cents(self) -> int:
+        return max(self.target_cents - self.saved_cents, 0)
+
+    @property
+    def percent(self) -> float:
+        return max(0.0, min(100.0, self.saved_cents * 100 / self.target_cents))
+
+    @property
+    def on_track(self) -> bool | None:
+        """Успеваем ли к сроку при нынешнем темпе (None — срок не задан)."""
+        if self.remaining_cents == 0:
+            return True
+        if self.deadline is None:
+            return None
+        return self.projected_date is not None and self.projected_date <= self.deadline
+
+
+def add_goal(
+    repo: GoalsRepo,
+    name: str,
+    target_cents: int,
+    deadline: date | None = None,
+    category_id: int | None = None,
+    account_id: int | None = None,
+) -> Goal:
+    name = (name or "").strip()
+    if not name:
+        raise ValueError("Название цели не может быть пустым")
+    if target_cents is None or target_cents <= 0:
+        raise ValueError("Сумма цели должна быть больше 0")
+    if (category_id is None) == (account_id is None):
+        raise ValueError("Привяжи цель либо к категории накоплений, либо к счёту-копилке")
+    if category_id is not None:
+        category = CategoriesRepo(repo.session).get_by_id(category_id)
+        if category is None or category.kind != CategoryKind.SAVINGS.value:
+            raise ValueError("Нужна категория накоплений")
+    if account_id is not None and AccountsRepo(repo.session).get_by_id(account_id) is None:
+        raise ValueError("Счёт не найден")
+
+    goal = Goal(
+        name=name,
+        target_cents=target_cents,
+        deadline=deadline,
+        category_id=category_id,
+        account_id=account_id,
+        saved_cents=repo.total_contributions(category_id, account_id),
+    )
+    repo.add(goal)
+    repo.commit()
+    return goal
+
+
+def goal_progress(
+    repo: GoalsRepo,
+    today: date | None = None,
+    window_days: int = GOAL_VELOCITY_DAYS,
+) -> list[GoalProgress]:
+    today = today or date.today()
+    recent = repo.contributions_since(today - timedelta(days=window_days - 1))
+
+    out = []
+    for g in repo.list_all():
+        per_day = recent.get(g.id, 0) / window_days
+        remaining = max(g.target_cents - g.saved_cents, 0)
+
+        projected = None
+        if remaining and per_day > 0:
+            projected = today + timedelta(days=math.ceil(remaining / per_day))
+
+        needed = None
+        if g.deadline is not None and remaining:
+            months_left = max((g.deadline - today).days, 0) / AVG_MONTH_DAYS
+            needed = math.ceil(remaining / max(months_left, 1))
+
+        out.append(GoalProgress(
+            goal_id=g.id,
+            name=g.name,
+            target_cents=g.target_cents,
+            saved_cents=g.saved_cents,
+            deadline=g.deadline,
+            per_month_cents=round(per_day * AVG_MONTH_DAYS),
+            projected_date=projected,
+            needed_per_month_cents=needed,
+        ))
+    return out
@@ -0,0 +1,219 @@
+"""
+Импорт банковских выписок (CSV/XLSX) с отсевом уже загруженных операций.
+
+Дубликаты ищутся по отпечатку (см. tx_fingerprint) одним запросом на пачку,
+а не запросом на строку. Банки нередко сдвигают дату проводки на день-два,
+поэтому отпечатки строки считаются и для соседних дат в пределах окна.
+"""
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from app.application.categorizer import Categorizer
+from app.domain.enums import TransactionType
+from app.infrastructure.db.functions import tx_fingerprint
+from app.infrastructure.repositories.transactions import TransactionsRepo
+
+# окно по умолчанию для «почти дубликатов»: та же сумма и заметка, дата ± N дней
+DUPLICATE_DATE_WINDOW_DAYS = 2
+
+_DATE_HEADERS = ("дата", "date")
+_AMOUNT_HEADERS = ("сумма", "amount")
+_NOTE_HEADERS = ("описание", "назначение", "комментарий", "заметка", "description", "note")
+_DATE_FORMATS = ("%d.%m.%Y", "%Y-%m-%d", "%d/%m/%Y", "%d.%m.%y")
+_DELIMITERS = ";,\t"
+
+
+@dataclass(frozen=True)
+class StatementRow:
+    occurred_at: date
+    amount_cents: int  # со знаком: минус — списание
+    note: str | None
+
+
+@dataclass(frozen=True)
+class ImportResult:
+    added: int
+    duplicates: int
+
+
+def _parse_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value).strip().split(" ")[0]
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(value)
+
+
+def _parse_amount(value) -> int:
+    if isinstance(value, (int, float)):
+        return int(round(Decimal(str(value)) * 100))
+    text = (
+        str(value).strip()
+        .replace("−", "-")
+        .replace("\xa0", "")
+        .replace(" ", "")
+        .replace("₽", "")
+        .replace(",", ".")
+    )
+    try:
+        return int((Decimal(text) * 100).to_integral_value())
+    except InvalidOperation:
+        raise ValueError(value) from None
+
+
+def _find_column(header: list[str], aliases: tuple[str, ...]) -> int | None:
+    for i, name in enumerate(header):
+        if any(a in name for a in aliases):
+            return i
+    return None
+
+
+def _read_cells(path: Path) -> list[list]:
+    if path.suffix.lower() == ".xlsx":
+        from openpyxl import load_workbook
+
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            return [list(r) for r in wb.active.iter_rows(values_only=True)]
+        finally:
+            wb.close()
+
+    raw = path.read_bytes()
+    try:
+        text = raw.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        text = raw.decode("cp1251")  # выгрузки российских банков
+    sample = text[:4096]
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=_DELIMITERS)
+    except csv.Error:
+        # шапка выписки над таблицей сбивает Sniffer — берём самый частый разделитель
+        return list(csv.reader(text.splitlines(), delimiter=max(_DELIMITERS, key=sample.count)))
+    return list(csv.reader(text.splitlines(), dialect))
+
+
+def read_statement(path: Path) -> list[StatementRow]:
+    """
+    Строки выписки: первая строка с колонками даты и суммы считается заголовком.
+    Нулевые суммы и строки без даты пропускаются.
+    """
+    cells = _read_cells(Path(path))
+    for header_idx, row in enumerate(cells):
+        header = [str(c or "").strip().lower() for c in row]
+        date_col = _find_column(header, _DATE_HEADERS)
+        amount_col = _find_column(header, _AMOUNT_HEADERS)
+        if date_col is not None and amount_col is not None:
+            break
+    else:
+        raise ValueError("Не найдены колонки «Дата» и «Сумма».")
+    note_col = _find_column(header, _NOTE_HEADERS)
+
+    rows: list[StatementRow] = []
+    for n, row in enumerate(cells[header_idx + 1:], start=header_idx + 2):
+        if date_col >= len(row) or row[date_col] in (None, ""):
+            continue
+        try:
+            occurred_at = _parse_date(row[date_col])
+        except ValueError:
+            raise ValueError(f"Строка {n}: не удалось разобрать дату «{row[date_col]}».") from None
+        try:
+            amount = _parse_amount(row[amount_col])
+        except ValueError:
+            raise ValueError(f"Строка {n}: не удалось разобрать сумму «{row[amount_col]}».") from None
+        if amount == 0:
+            continue
+        note = None
+        if note_col is not None and note_col < len(row) and row[note_col] not in (None, ""):
+            note = str(row[note_col]).strip()[:255]
+        rows.append(StatementRow(occurred_at, amount, note))
+    return rows
+
+
+def _row_fingerprint(account_id: int, row: StatementRow, day: date) -> str:
+    tx_type = TransactionType.EXPENSE.value if row.amount_cents < 0 else TransactionType.INCOME.value
+    return tx_fingerprint(tx_type, account_id, None, day, abs(row.amount_cents), row.note)
+
+
+def find_duplicates(
+    repo: TransactionsRepo,
+    account_id: int,
+    rows: list[StatementRow],
+    date_window_days: int = DUPLICATE_DATE_WINDOW_DAYS,
+) -> list[int | None]:
+    """
+    Для каждой строки — id уже существующей операции, которую она повторяет, или None.
+
+    Каждая существующая операция «гасит» не больше одной строки, так что
+    две одинаковые покупки в выписке при одной в базе дадут один дубликат.
+    Сначала сопоставляются точные даты, потом сдвиг на ±1 день и т.д.
+    """
+    offsets = [0]
+    for d in range(1, date_window_days + 1):
+        offsets += [-d, d]
+    candidates = [
+        [_row_fingerprint(account_id, row, row.occurred_at + timedelta(days=off)) for off in offsets]
+        for row in rows
+    ]
+    if not rows:
+        return []
+    pool = repo.ids_by_fingerprint(
+        (fp for fps in candidates for fp in fps),
+        start=min(row.occurred_at for row in rows) - timedelta(days=date_window_days),
+        end=max(row.occurred_at for row in rows) + timedelta(days=date_window_days),
+    )
+
+    matched: list[int | None] = [None] * len(rows)
+    for k in range(len(offsets)):
+        for i, fps in enumerate(candidates):
+            if matched[i] is None:
+                ids = pool.get(fps[k])
+                if ids:
+                    matched[i] = ids.pop(0)
+    return matched
+
+
+def import_statement(
+    repo: TransactionsRepo,
+    account_id: int,
+    rows: list[StatementRow],
+    expense_category_id: int,
+    income_category_id: int,
+    date_window_days: int = DUPLICATE_DATE_WINDOW_DAYS,
+    categorizer: Categorizer | None = None,
+) -> ImportResult:
+    """
+    Добавляет строки выписки, кроме найденных дубликатов, одной транзакцией.
+    Категорию ставят правила categorizer; не подошло ни одно — категория по умолчанию.
+    """
+    matched = find_duplicates(repo, account_id, rows, date_window_days)
+    new_rows = [
+        {
+            "occurred_at": row.occurred_at,
+            "type": TransactionType.EXPENSE.value if row.amount_cents < 0 else TransactionType.INCOME.value,
+            "account_id": account_id,
+            "category_id": expense_category_id if row.amount_cents < 0 else income_category_id,
+            "amount_cents": abs(row.amount_cents),
+            "note": row.note,
+        }
+        for row, dup in zip(rows, matched)
+        if dup is None
+    ]
+    if categorizer is not None:
+        found = categorizer.categorize((r["type"], account_id, r["amount_cents"], r["note"]) for r in new_rows)
+        for r, category_id in zip(new_rows, found):
+            if category_id is not None:
+                r["category_id"] = category_id
+    repo.bulk_add(new_rows)
+    repo.commit()
+    return ImportResult(added=len(new_rows), duplicates=len(rows) - len(new_rows))
@@ -0,0 +1,135 @@
+"""
+Сверка счёта с банковской выпиской.
+
+Строки выписки сопоставляются с операциями по точной сумме (со знаком)
+и дате в пределах окна. Вместо попарного сравнения всех со всеми обе
+стороны раскладываются по корзинам суммы, а внутри корзины — проход
+двумя указателями по отсортированным датам: O(n log n) на сортировку.
+Для одинаковых окон такой жадный проход даёт наибольшее число пар.
+
+Сверенные операции помечаются reconciled_at; при следующей сверке
+строки выписки, совпавшие с ними, в отчёт не попадают.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Sequence
+
+from app.application.services.imports import StatementRow
+from app.infrastructure.repositories.transactions import TransactionsRepo
+
+# банки проводят операции с задержкой — дата в учёте и в выписке может расходиться
+RECONCILE_DATE_WINDOW_DAYS = 3
+
+
+@dataclass(frozen=True)
+class LedgerItem:
+    id: int
+    occurred_at: date
+    amount_cents: int  # со знаком для сверяемого счёта
+    note: str | None
+
+
+@dataclass(frozen=True)
+class ReconciliationReport:
+    account_id: int
+    start: date
+    end: date
+    matched: tuple[tuple[StatementRow, LedgerItem], ...]
+    missing: tuple[StatementRow, ...]  # есть в выписке, нет в учёте
+    extra: tuple[LedgerItem, ...]  # есть в учёте, нет в выписке
+    already_reconciled: int
+
+    @property
+    def difference_cents(self) -> int:
+        """Насколько выписка расходится с учётом за период (выписка минус учёт)."""
+        return sum(r.amount_cents for r in self.missing) - sum(i.amount_cents for i in self.extra)
+
+
+def match_by_amount(
+    rows: Sequence[StatementRow],
+    items: Sequence[LedgerItem],
+    window_days: int,
+) -> tuple[list[tuple[StatementRow, LedgerItem]], list[StatementRow], list[LedgerItem]]:
+    """Пары (строка, операция), несопоставленные строки и несопоставленные операции."""
+    window = timedelta(days=window_days)
+    row_buckets: dict[int, list[StatementRow]] = defaultdict(list)
+    item_buckets: dict[int, list[LedgerItem]] = defaultdict(list)
+    for r in rows:
+        row_buckets[r.amount_cents].append(r)
+    for it in items:
+        item_buckets[it.amount_cents].append(it)
+
+    pairs: list[tuple[StatementRow, LedgerItem]] = []
+    lone_rows: list[StatementRow] = []
+    lone_items: list[LedgerItem] = []
+    for amount in row_buckets.keys() | item_buckets.keys():
+        rs = sorted(row_buckets.get(amount, ()), key=lambda r: r.occurred_at)
+        its = sorted(item_buckets.get(amount, ()), key=lambda it: (it.occurred_at, it.id))
+        i = j = 0
+        while i < len(rs) and j < len(its):
+            if its[j].occurred_at < rs[i].occurred_at - window:
+                lone_items.append(its[j])
+                j += 1
+            elif its[j].occurred_at > rs[i].occurred_at + window:
+                lone_rows.append(rs[i])
+                i += 1
+            else:
+                pairs.append((rs[i], its[j]))
+                i += 1
+                j += 1
+        lone_rows.extend(rs[i:])
+        lone_items.extend(its[j:])
+    return pairs, lone_rows, lone_items
+
+
+def reconcile(
+    repo: TransactionsRepo,
+    account_id: int,
+    rows: Sequence[StatementRow],
+    start: date | None = None,
+    end: date | None = None,
+    date_window_days: int = RECONCILE_DATE_WINDOW_DAYS,
+) -> ReconciliationReport:
+    """
+    Сверяет строки выписки за [start, end] (по умолчанию — период самой выписки)
+    с операциями счёта. Строки и операции чуть за границами периода (в пределах
+    окна) тоже участвуют в сопоставлении, но в «нет в учёте» / «нет в выписке»
+    не попадают.
+    """
+    if not rows:
+        raise ValueError("Выписка пуста")
+    start = start or min(r.occurred_at for r in rows)
+    end = end or max(r.occurred_at for r in rows)
+    window = timedelta(days=date_window_days)
+    rows = [r for r in rows if start - window <= r.occurred_at <= end + window]
+
+    reconciled: list[LedgerItem] = []
+    open_items: list[LedgerItem] = []
+    for tx_id, day, amount, note, reconciled_at in repo.account_movements(account_id, start - window, end + window):
+        (reconciled if reconciled_at is not None else open_items).append(LedgerItem(tx_id, day, amount, note))
+
+    # сначала убираем строки, уже сверенные в прошлый раз
+    done, rows_left, _ = match_by_amount(rows, reconciled, date_window_days)
+    matched, missing, extra = match_by_amount(rows_left, open_items, date_window_days)
+    missing = [r for r in missing if start <= r.occurred_at <= end]
+    extra = [it for it in extra if start <= it.occurred_at <= end]
+
+    return ReconciliationReport(
+        account_id=account_id,
+        start=start,
+        end=end,
+        matched=tuple(sorted(matched, key=lambda p: (p[0].occurred_at, p[1].id))),
+        missing=tuple(sorted(missing, key=lambda r: r.occurred_at)),
+        extra=tuple(sorted(extra, key=lambda it: (it.occurred_at, it.id))),
+        already_reconciled=len(done),
+    )
+
+
+def mark_reconciled(repo: TransactionsRepo, report: ReconciliationReport, at: datetime | None = None) -> int:
+    """Отмечает совпавшие операции отчёта сверенными."""
+    n = repo.mark_reconciled((item.id for _row, item in report.matched), at or datetime.now())
+    repo.commit()
+    return n
@@ -0,0 +1,135 @@
+"""
+Повторяющиеся операции: правила с расписанием RRULE и их проведение.
+
+Проведение собирает все вхождения каждого правила после materialized_through
+по сегодняшний день и вставляет их одной пачкой (INSERT ... ON CONFLICT DO
+NOTHING) с одним коммитом. Уникальный индекс (правило, дата) делает повторный
+запуск безопасным, даже если отметка materialized_through не успела сохраниться.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+
+from dateutil.rrule import rruleset, rrulestr
+
+from app.domain.enums import TransactionType
+from app.infrastructure.db.models import RecurringRule
+from app.infrastructure.repositories.accounts import AccountsRepo
+from app.infrastructure.repositories.recurring import RecurringRulesRepo
+from app.infrastructure.repositories.transactions import TransactionsRepo
+
+# готовые расписания для формы; любое другое можно ввести строкой RRULE
+RRULE_PRESETS = {
+    "Ежемесячно": "FREQ=MONTHLY",
+    "Еженедельно": "FREQ=WEEKLY",
+    "Раз в две недели": "FREQ=WEEKLY;INTERVAL=2",
+    "Ежеквартально": "FREQ=MONTHLY;INTERVAL=3",
+    "Ежегодно": "FREQ=YEARLY",
+}
+
+
+def parse_rrule(text: str, dtstart: date) -> rruleset:
+    """Расписание от dtstart; многострочный текст (RRULE/EXDATE/...) тоже допустим."""
+    text = (text or "").strip()
+    if not text:
+        raise ValueError("Расписание не задано")
+    try:
+        return rrulestr(text, dtstart=datetime.combine(dtstart, time.min), forceset=True)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Некорректное расписание RRULE: {e}") from None
+
+
+def occurrences(rule: RecurringRule, after: date | None, through: date) -> list[date]:
+    """Даты вхождений правила в (after, through]; after=None — с самого dtstart."""
+    start = max(rule.dtstart, after + timedelta(days=1)) if after else rule.dtstart
+    if start > through:
+        return []
+    schedule = parse_rrule(rule.rrule, rule.dtstart)
+    return [
+        dt.date()
+        for dt in schedule.between(datetime.combine(start, time.min), datetime.combine(through, time.max), inc=True)
+    ]
+
+
+def add_recurring_rule(
+    repo: RecurringRulesRepo,
+    name: str,
+    tx_type: str,
+    account_id: int,
+    amount_cents: int,
+    rrule: str,
+    dtstart: date,
+    category_id: int | None = None,
+    to_account_id: int | None = None,
+    note: str | None = None,
+) -> RecurringRule:
+    name = (name or "").strip()
+    if not name:
+        raise ValueError("Название правила не может быть пустым")
+    if tx_type not in {t.value for t in TransactionType}:
+        raise ValueError(f"Неизвестный тип операции: {tx_type}")
+    if amount_cents is None or amount_cents <= 0:
+        raise ValueError("Сумма должна быть больше 0")
+    if AccountsRepo(repo.session).get_by_id(account_id) is None:
+        raise ValueError("Счёт не найден")
+    if tx_type == TransactionType.TRANSFER.value:
+        if to_account_id is None or to_account_id == account_id:
+            raise ValueError("Для перевода нужен другой счёт зачисления")
+    else:
+        to_account_id = None
+        if category_id is None:
+            raise ValueError("Выбери категорию")
+    rrule = rrule.strip()
+    parse_rrule(rrule, dtstart)
+
+    rule = RecurringRule(
+        name=name,
+        type=tx_type,
+        account_id=account_id,
+        to_account_id=to_account_id,
+        category_id=category_id,
+        amount_cents=amount_cents,
+        note=(note or "").strip() or None,
+        rrule=rrule,
+        dtstart=dtstart,
+    )
+    repo.add(rule)
+    repo.commit()
+    return rule
+
+
+def _occurrence_row(rule: RecurringRule, day: date) -> dict:
+    # набор ключей у всех строк один — вставка идёт одним executemany
+    is_transfer = rule.type == TransactionType.TRANSFER.value
+    return {
+        "occurred_at": day,
+        "type": rule.type,
+        "account_id": None if is_transfer else rule.account_id,
+        "from_account_id": rule.account_id if is_transfer else None,
+        "to_account_id": rule.to_account_id if is_transfer else None,
+        "category_id": rule.category_id,
+        "amount_cents": rule.amount_cents,
+        "note": rule.note or rule.name,
+        "recurring_rule_id": rule.id,
+    }
+
+
+def materialize_due(repo: RecurringRulesRepo, tx_repo: TransactionsRepo, today: date | None = None) -> int:
+    """
+    Проводит все вхождения активных правил по today включительно: одна
+    пакетная вставка и один коммит на весь запуск. Возвращает число новых операций.
+    """
+    today = today or date.today()
+    rows: list[dict] = []
+    through: dict[int, date] = {}
+    for rule in repo.list_active():
+        if rule.materialized_through is not None and rule.materialized_through >= today:
+            continue
+        rows.extend(_occurrence_row(rule, d) for d in occurrences(rule, rule.materialized_through, today))
+        through[rule.id] = today
+    if not through:
+        return 0
+    added = tx_repo.bulk_add(rows, skip_conflicts=True)
+    repo.set_materialized_through(through)
+    repo.commit()
+    return added
@@ -1,8 +1,19 @@
 from __future__ import annotations
 
-from datetime import date
+from datetime import date, timedelta
 
-from app.infrastructure.repositories.reports import ReportsRepo, AccountBalanceRow, PeriodSummary, CategoryTotalRow
+from app.application.cache import GenerationCache
+from app.infrastructure.repositories.reports import (
+    ReportsRepo,
+    AccountBalanceRow,
+    PeriodSummary,
+    CategoryTotalRow,
+    CategoryRollupRow,
+    CategoryComparisonRow,
+    TimeseriesPoint,
+    StatementCursor,
+    StatementPage,
+)
 
 
 def get_account_balances(repo: ReportsRepo) -> list[AccountBalanceRow]:
@@ -13,5 +24,122 @@ def get_period_summary(repo: ReportsRepo, start: date, end: date) -> PeriodSumma
     return repo.period_summary(start, end)
 
 
-def get_top_expense_categories(repo: ReportsRepo, start: date, end: date, limit: int = 10) -> list[CategoryTotalRow]:
-    return repo.top_expense_categories(start, end, limit=limit)
+def get_top_expense_categories(
+    repo: ReportsRepo,
+    start: date,
+    end: date,
+    limit: int = 10,
+    rollup: bool = False,
+) -> list[CategoryTotalRow]:
+    return repo.top_expense_categories(start, end, limit=limit, rollup=rollup)
+
+
+def get_category_rollup(repo: ReportsRepo, start: date, end: date, tx_type: str = "expense") -> list[CategoryRollupRow]:
+    return repo.category_rollup(start, end, tx_type)
+
+
+def get_category_actuals(repo: ReportsRepo, start: date, end: date, category_ids: list[int]) -> dict[int, int]:
+    return repo.category_actuals(start, end, category_ids)
+
+
+def get_category_comparison(
+    repo: ReportsRepo,
+    month: date,
+    through: date | None = None,
+    cache: GenerationCache | None = None,
+) -> list[CategoryComparisonRow]:
+    """
+    Сравнение категорий: месяц к месяцу и год к году.
+    С cache результат по месяцу переиспользуется, пока данные не менялись.
+    """
+    month = date(month.year, month.month, 1)
+    if cache is None:
+        return repo.category_comparison(month, through)
+    return cache.cached(
+        repo.session,
+        ("category_comparison", month, through),
+        lambda: repo.category_comparison(month, through),
+    )
+
+
+def get_daily_totals(
+    repo: ReportsRepo,
+    year: int,
+    tx_type: str = "expense",
+    category_id: int | None = None,
+    cache: GenerationCache | None = None,
+) -> list[int]:
+    """Суммы по дням года; с cache — один запрос на год, пока данные не менялись."""
+    if cache is None:
+        return repo.daily_totals(year, tx_type, category_id)
+    return cache.cached(
+        repo.session,
+        ("daily_totals", year, tx_type, category_id),
+        lambda: repo.daily_totals(year, tx_type, category_id),
+    )
+
+
+def get_balance_trend(
+    repo: ReportsRepo,
+    start: date,
+    end: date,
+    cache: GenerationCache | None = None,
+) -> tuple[list[date], list[int]]:
+    """
+    Суммарный баланс всех счетов на конец каждого дня [start, end]:
+    баланс на канун start плюс накопленный итог дневных доходов/расходов
+    (переводы между своими счетами общий баланс не меняют).
+    """
+    def compute():
+        opening = sum(b.balance_cents for b in repo.balance_as_of(repo.account_ids(), start - timedelta(days=1)))
+        points = repo.timeseries(start, end, "day")
+        days, values, running = [], [], opening
+        for p in points:
+            running += p.net_cents
+            days.append(p.bucket_start)
+            values.append(running)
+        return days, values
+
+    if cache is None:
+        return compute()
+    return cache.cached(repo.session, ("balance_trend", start, end), compute)
+
+
+def get_spending_trend(
+    repo: ReportsRepo,
+    start: date,
+    end: date,
+    cache: GenerationCache | None = None,
+) -> tuple[list[date], list[int]]:
+    """Расходы по дням [start, end] (дни без операций — нули)."""
+    def compute():
+        points = repo.timeseries(start, end, "day")
+        return [p.bucket_start for p in points], [p.expense_cents for p in points]
+
+    if cache is None:
+        return compute()
+    return cache.cached(repo.session, ("spending_trend", start, end), compute)
+
+
+def get_balance_as_of(repo: ReportsRepo, account_ids: list[int], as_of: date) -> list[AccountBalanceRow]:
+    return repo.balance_as_of(account_ids, as_of)
+
+
+def get_timeseries(
+    repo: ReportsRepo,
+    start: date,
+    end: date,
+    granularity: str = "month",
+    group_by: str | None = None,
+    **filters,
+) -> list[TimeseriesPoint]:
+    return repo.timeseries(start, end, granularity, group_by=group_by, **filters)
+
+
+def get_account_statement(
+    repo: ReportsRepo,
+    account_id: int,
+    cursor: StatementCursor | None = None,
+    page_size: int = 100,
+) -> StatementPage:
+    return repo.account_statement(account_id, cursor, page_size)
@@ -0,0 +1,126 @@
+"""
+Кэш для быстрого старта: последний снимок дашборда и справочники счетов
+и категорий в небольшом JSON рядом с базой. При запуске окно сразу
+рисуется из него (помеченным как устаревшее), а свежие данные догружаются
+в фоне, если поколение записи базы изменилось.
+"""
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy.orm import Session
+
+from app.application.services.dashboard import DashboardSnapshot, snapshot_from_dict, snapshot_to_dict
+from app.infrastructure.analytics.columnar import snapshot_dir
+from app.infrastructure.db.generation import current_generation
+from app.infrastructure.repositories.accounts import AccountsRepo
+from app.infrastructure.repositories.categories import CategoriesRepo
+
+# меняется при несовместимом изменении формата — старый файл просто игнорируется
+STARTUP_CACHE_VERSION = 1
+STARTUP_CACHE_SUFFIX = ".startup.json"
+
+
+@dataclass(frozen=True)
+class AccountRef:
+    id: int
+    name: str
+    type: str
+    is_active: bool
+
+
+@dataclass(frozen=True)
+class CategoryRef:
+    id: int
+    kind: str
+    name: str
+    parent_id: int | None
+
+
+@dataclass(frozen=True)
+class ReferenceData:
+    """Справочники для списков и подписей (без ORM-объектов)."""
+    generation: int
+    accounts: tuple[AccountRef, ...]
+    categories: tuple[CategoryRef, ...]
+
+    def active_accounts(self) -> list[AccountRef]:
+        return [a for a in self.accounts if a.is_active]
+
+    def account_names(self) -> dict[int, str]:
+        return {a.id: a.name for a in self.accounts}
+
+    def category_names(self) -> dict[int, str]:
+        return {c.id: c.name for c in self.categories}
+
+
+@dataclass(frozen=True)
+class StartupCache:
+    saved_at: datetime
+    dashboard: DashboardSnapshot | None
+    reference: ReferenceData | None
+
+
+def startup_cache_path(db_path: Path) -> Path:
+    """
+    Файл рядом с каталогом колоночного снимка, но не внутри него:
+    тот целиком заменяется при каждой пересборке снимка.
+    """
+    return snapshot_dir(db_path).with_name(db_path.stem + STARTUP_CACHE_SUFFIX)
+
+
+def load_reference_data(session: Session) -> ReferenceData:
+    generation = current_generation(session)
+    accounts = AccountsRepo(session).list_all()
+    cats = CategoriesRepo(session).list_all()
+    return ReferenceData(
+        generation=generation,
+        accounts=tuple(AccountRef(a.id, a.name, a.type, bool(a.is_active)) for a in accounts),
+        categories=tuple(CategoryRef(c.id, c.kind, c.name, c.parent_id) for c in cats),
+    )
+
+
+def read_startup_cache(path: Path) -> StartupCache | None:
+    """None — файла нет, он повреждён или другой версии."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        if data.get("version") != STARTUP_CACHE_VERSION:
+            return None
+        ref = data.get("reference")
+        reference = None
+        if ref is not None:
+            reference = ReferenceData(
+                generation=int(ref["generation"]),
+                accounts=tuple(AccountRef(**a) for a in ref["accounts"]),
+                categories=tuple(CategoryRef(**c) for c in ref["categories"]),
+            )
+        dash = data.get("dashboard")
+        return StartupCache(
+            saved_at=datetime.fromisoformat(data["saved_at"]),
+            dashboard=snapshot_from_dict(dash) if dash is not None else None,
+            reference=reference,
+        )
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def write_startup_cache(
+    path: Path,
+    dashboard: DashboardSnapshot | None,
+    reference: ReferenceData | None,
+) -> None:
+    """Пишет атомарно (через временный файл), чтобы падение не оставило половину JSON."""
+    data = {
+        "version": STARTUP_CACHE_VERSION,
+        "saved_at": datetime.now().isoformat(timespec="seconds"),
+        "dashboard": snapshot_to_dict(dashboard) if dashboard is not None else None,
+        "reference": asdict(reference) if reference is not None else None,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, path)
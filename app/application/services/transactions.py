@@ -1,8 +1,18 @@
 from datetime import date
+from typing import Iterable
 
 from app.infrastructure.db.models import Transaction
+from app.infrastructure.repositories.accounts import AccountsRepo
+from app.infrastructure.repositories.categories import CategoriesRepo
 from app.infrastructure.repositories.transactions import TransactionsRepo
-from app.domain.enums import TransactionType
+from app.domain.enums import CategoryKind, TransactionType
+
+# каким операциям можно поставить категорию данного вида
+CATEGORY_KIND_TX_TYPE = {
+    CategoryKind.EXPENSE.value: TransactionType.EXPENSE.value,
+    CategoryKind.INCOME.value: TransactionType.INCOME.value,
+    CategoryKind.SAVINGS.value: TransactionType.TRANSFER.value,
+}
 
 
 def add_expense(
@@ -68,3 +78,39 @@ def add_transfer(
     repo.add(tx)
     repo.session.commit()
     return tx
+
+
+# Массовые правки: один UPDATE/DELETE ... WHERE id IN (...) на пачку и один коммит.
+# Чекпоинты балансов сбрасываются заранее одним запросом (см. TransactionsRepo).
+
+def bulk_set_category(repo: TransactionsRepo, tx_ids: Iterable[int], category_id: int) -> int:
+    """Ставит категорию операциям подходящего типа; возвращает число изменённых."""
+    category = CategoriesRepo(repo.session).get_by_id(category_id)
+    if category is None:
+        raise ValueError("Категория не найдена")
+    n = repo.bulk_set_category(tx_ids, category_id, CATEGORY_KIND_TX_TYPE[category.kind])
+    repo.commit()
+    return n
+
+
+def bulk_move_to_account(repo: TransactionsRepo, tx_ids: Iterable[int], account_id: int) -> int:
+    account = AccountsRepo(repo.session).get_by_id(account_id)
+    if account is None or not account.is_active:
+        raise ValueError("Счёт не найден или скрыт")
+    n = repo.bulk_move_to_account(tx_ids, account_id)
+    repo.commit()
+    return n
+
+
+def bulk_shift_dates(repo: TransactionsRepo, tx_ids: Iterable[int], days: int) -> int:
+    if days == 0:
+        raise ValueError("Сдвиг должен быть ненулевым")
+    n = repo.bulk_shift_dates(tx_ids, days)
+    repo.commit()
+    return n
+
+
+def bulk_delete(repo: TransactionsRepo, tx_ids: Iterable[int]) -> int:
+    n = repo.bulk_delete(tx_ids)
+    repo.commit()
+    return n
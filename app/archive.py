@@ -0,0 +1,27 @@
+import argparse
+from datetime import date
+
+from app.application.services.archive import archive_closed_years
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Перенос закрытых лет в архивные SQLite-файлы")
+    parser.add_argument(
+        "--before-year",
+        type=int,
+        default=date.today().year,
+        help="архивировать операции до 1 января этого года (по умолчанию — текущий год)",
+    )
+    parser.add_argument("--no-vacuum", action="store_true", help="не сжимать основной файл после переноса")
+    args = parser.parse_args()
+
+    moved = archive_closed_years(args.before_year, vacuum=not args.no_vacuum)
+    if not moved:
+        print("Нечего архивировать.")
+        return
+    for year, count in sorted(moved.items()):
+        print(f"- {year}: перенесено {count} операций")
+
+
+if __name__ == "__main__":
+    main()
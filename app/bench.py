@@ -0,0 +1,127 @@
+"""
+Замеры задержек отчётных запросов.
+
+    BUDGET_DB_URL=sqlite:///big.sqlite3 python -m app.bench mirror --repeat 20
+    BUDGET_DB_URL=sqlite:///big.sqlite3 python -m app.bench columnar
+    BUDGET_DB_URL=sqlite:///big.sqlite3 python -m app.bench dashboard
+"""
+import argparse
+import statistics
+import time
+from datetime import date
+
+from app.application.services.dashboard import build_dashboard_snapshot
+from app.domain.enums import TransactionType
+from app.infrastructure.analytics.columnar import load_snapshot, rolling_mean, snapshot_dir
+from app.infrastructure.db.generation import current_generation
+from app.infrastructure.db.mirror import AnalyticsMirror
+from app.infrastructure.db.session import SessionLocal, get_database_path
+from app.infrastructure.repositories.reports import ReportsRepo
+
+
+def _timeit(fn, repeat: int) -> float:
+    """Медиана в миллисекундах."""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def _report_queries(rep: ReportsRepo) -> dict:
+    today = date.today()
+    month_start = date(today.year, today.month, 1)
+    year_start = date(today.year, 1, 1)
+    return {
+        "account_balances": rep.account_balances,
+        "period_summary(month)": lambda: rep.period_summary(month_start, today),
+        "period_summary(year)": lambda: rep.period_summary(year_start, today),
+        "top_expense_categories(year)": lambda: rep.top_expense_categories(year_start, today),
+        "category_comparison(month)": lambda: rep.category_comparison(month_start, today),
+    }
+
+
+def bench_mirror(repeat: int) -> None:
+    db_path = get_database_path()
+    if db_path is None:
+        raise SystemExit("Нужна файловая SQLite база (BUDGET_DB_URL)")
+
+    mirror = AnalyticsMirror(db_path)
+    with SessionLocal() as session:
+        generation = current_generation(session)
+
+    t0 = time.perf_counter()
+    mirror.ensure_fresh(generation)
+    print(f"mirror build: {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    print(f"{'query':32} {'disk, ms':>10} {'mirror, ms':>11}")
+    with SessionLocal() as disk, mirror.open_session(generation) as mem:
+        disk_q = _report_queries(ReportsRepo(disk))
+        mem_q = _report_queries(ReportsRepo(mem, read_only=True))
+        for name in disk_q:
+            d = _timeit(disk_q[name], repeat)
+            m = _timeit(mem_q[name], repeat)
+            print(f"{name:32} {d:10.2f} {m:11.2f}")
+    mirror.close()
+
+
+def bench_columnar(repeat: int) -> None:
+    db_path = get_database_path()
+    if db_path is None:
+        raise SystemExit("Нужна файловая SQLite база (BUDGET_DB_URL)")
+    cache_dir = snapshot_dir(db_path)
+
+    with SessionLocal() as session:
+        t0 = time.perf_counter()
+        snap = load_snapshot(session, cache_dir)
+        print(f"snapshot load/build: {(time.perf_counter() - t0) * 1000:.1f} ms, rows={len(snap)}")
+        t0 = time.perf_counter()
+        snap = load_snapshot(session, cache_dir)
+        print(f"snapshot mmap load:  {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    today = date.today()
+    year_start = date(today.year, 1, 1)
+    first = date(today.year - 5, 1, 1)
+    expense = TransactionType.EXPENSE.value
+    cases = {
+        "total(all)": lambda: snap.total(),
+        "sum_by_day(5y, expense)": lambda: snap.sum_by_day(first, today, expense),
+        "sum_by_week(5y, expense)": lambda: snap.sum_by_week(first, today, expense),
+        "sum_by_month(5y, expense)": lambda: snap.sum_by_month(first, today, expense),
+        "sum_by_category(year, expense)": lambda: snap.sum_by_category(year_start, today, expense),
+        "rolling_mean(30d over 5y)": lambda: rolling_mean(snap.sum_by_day(first, today, expense), 30),
+        "percentiles(all, expense)": lambda: snap.percentiles([50, 90, 99], tx_type=expense),
+    }
+    print(f"{'operation':34} {'ms':>8}")
+    for name, fn in cases.items():
+        print(f"{name:34} {_timeit(fn, repeat):8.2f}")
+
+
+def bench_dashboard(repeat: int) -> None:
+    """Снимок дашборда без кэша: последовательно (1 поток) и параллельно."""
+    def build(workers: int):
+        return build_dashboard_snapshot(SessionLocal, ReportsRepo, cache=None, max_workers=workers)
+
+    build(1)  # прогрев page cache
+    print(f"{'mode':24} {'ms':>8}")
+    for workers in (1, 4):
+        print(f"{f'{workers} worker(s)':24} {_timeit(lambda: build(workers), repeat):8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки отчётных запросов")
+    parser.add_argument("suite", choices=["mirror", "columnar", "dashboard"])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.suite == "mirror":
+        bench_mirror(args.repeat)
+    elif args.suite == "columnar":
+        bench_columnar(args.repeat)
+    elif args.suite == "dashboard":
+        bench_dashboard(args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -17,3 +17,16 @@ class TransactionType(StrEnum):
     EXPENSE = "expense"
     INCOME = "income"
     TRANSFER = "transfer"
+
+
+class RuleKind(StrEnum):
+    KEYWORD = "keyword"  # подстрока заметки без учёта регистра
+    REGEX = "regex"
+
+
+class Granularity(StrEnum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+    QUARTER = "quarter"
+    YEAR = "year"
@@ -0,0 +1,301 @@
+"""
+Колоночный снимок операций в NumPy для векторной аналитики (суммы по дням,
+неделям, месяцам, категориям, скользящие средние, перцентили).
+
+Колонки упорядочены по дате:
+- day: int32 — номер дня от 1970-01-01
+- amount: int64 — сумма в копейках
+- type_code: int8 — TYPE_CODES
+- category: int16 — код категории (индекс в category_ids), -1 если нет
+- account: int16 — код счёта (индекс в account_ids; для переводов — счёт списания), -1 если нет
+
+Снимок кэшируется на диске набором .npy (читается через mmap) в каталоге
+своего поколения и пересобирается, когда меняется поколение записи базы.
+"""
+from __future__ import annotations
+
+import contextlib
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import Integer, case, cast, func, select
+from sqlalchemy.orm import Session
+
+from app.domain.enums import TransactionType
+from app.infrastructure.db.archive import transactions_source
+from app.infrastructure.db.generation import current_generation
+
+SNAPSHOT_VERSION = 2
+
+TYPE_CODES = {
+    TransactionType.EXPENSE.value: 0,
+    TransactionType.INCOME.value: 1,
+    TransactionType.TRANSFER.value: 2,
+}
+
+_META = "meta.json"
+_TMP_TTL_SECONDS = 3600
+_COLUMNS = ("day", "amount", "type_code", "category", "account", "category_ids", "account_ids")
+_EPOCH = date(1970, 1, 1)
+
+
+def day_number(d: date) -> int:
+    return (d - _EPOCH).days
+
+
+def day_to_date(n: int) -> date:
+    return date.fromordinal(_EPOCH.toordinal() + int(n))
+
+
+@dataclass(frozen=True)
+class ColumnarSnapshot:
+    generation: int
+    day: np.ndarray
+    amount: np.ndarray
+    type_code: np.ndarray
+    category: np.ndarray
+    account: np.ndarray
+    category_ids: np.ndarray
+    account_ids: np.ndarray
+
+    # префиксные суммы по типу (строятся лениво, O(N) один раз на снимок)
+    _prefix: dict = field(default_factory=dict, repr=False, compare=False)
+
+    def __len__(self) -> int:
+        return len(self.day)
+
+    # ===== выборки =====
+
+    def range_slice(self, start: date | None = None, end: date | None = None) -> slice:
+        """Срез строк с start <= дата <= end (данные отсортированы по дню — двоичный поиск)."""
+        lo = 0 if start is None else int(np.searchsorted(self.day, day_number(start), side="left"))
+        hi = len(self.day) if end is None else int(np.searchsorted(self.day, day_number(end), side="right"))
+        return slice(lo, hi)
+
+    def _mask(self, sl: slice, tx_type: str | None):
+        return None if tx_type is None else self.type_code[sl] == TYPE_CODES[tx_type]
+
+    def _col(self, name: str, sl: slice, mask) -> np.ndarray:
+        col = getattr(self, name)[sl]
+        return col if mask is None else col[mask]
+
+    def prefix_sums(self, tx_type: str | None = None) -> np.ndarray:
+        """cs[i] = сумма amount[:i] (по типу); сумма строк [lo, hi) = cs[hi] - cs[lo]."""
+        key = tx_type or "*"
+        if key not in self._prefix:
+            amounts = self.amount if tx_type is None else np.where(self.type_code == TYPE_CODES[tx_type], self.amount, 0)
+            cs = np.zeros(len(amounts) + 1, dtype=np.int64)
+            np.cumsum(amounts, out=cs[1:])
+            self._prefix[key] = cs
+        return self._prefix[key]
+
+    def total(self, start: date | None = None, end: date | None = None, tx_type: str | None = None) -> int:
+        sl = self.range_slice(start, end)
+        cs = self.prefix_sums(tx_type)
+        return int(cs[sl.stop] - cs[sl.start])
+
+    def amounts(self, start: date | None = None, end: date | None = None, tx_type: str | None = None) -> np.ndarray:
+        sl = self.range_slice(start, end)
+        return self._col("amount", sl, self._mask(sl, tx_type))
+
+    # ===== группировки по времени =====
+
+    def sum_between(self, boundaries: np.ndarray, tx_type: str | None = None) -> np.ndarray:
+        """
+        Суммы по корзинам [boundaries[i], boundaries[i+1]) в номерах дней.
+        Два двоичных поиска по отсортированным дням + разность префиксных сумм:
+        стоимость зависит от числа корзин, а не от числа операций.
+        """
+        idx = np.searchsorted(self.day, boundaries, side="left")
+        cs = self.prefix_sums(tx_type)
+        return cs[idx[1:]] - cs[idx[:-1]]
+
+    def sum_by_day(self, start: date, end: date, tx_type: str | None = None) -> np.ndarray:
+        """Плотный массив сумм по дням [start..end] (нули в пустые дни)."""
+        first = day_number(start)
+        return self.sum_between(np.arange(first, day_number(end) + 2, dtype=np.int64), tx_type)
+
+    def sum_by_week(self, start: date, end: date, tx_type: str | None = None) -> tuple[list[date], np.ndarray]:
+        """Суммы по неделям (понедельник — начало недели); крайние недели обрезаны периодом."""
+        monday = start - timedelta(days=start.weekday())
+        keys = [monday + timedelta(weeks=i) for i in range((end - monday).days // 7 + 1)]
+        bounds = [day_number(start)] + [day_number(k) for k in keys[1:]] + [day_number(end) + 1]
+        return keys, self.sum_between(np.array(bounds, dtype=np.int64), tx_type)
+
+    def sum_by_month(self, start: date, end: date, tx_type: str | None = None) -> tuple[list[date], np.ndarray]:
+        """Суммы по месяцам; крайние месяцы обрезаны периодом."""
+        first = start.year * 12 + start.month - 1
+        last = end.year * 12 + end.month - 1
+        keys = [date(m // 12, m % 12 + 1, 1) for m in range(first, last + 1)]
+        bounds = [day_number(start)] + [day_number(k) for k in keys[1:]] + [day_number(end) + 1]
+        return keys, self.sum_between(np.array(bounds, dtype=np.int64), tx_type)
+
+    # ===== группировки по кодам =====
+
+    def sum_by_category(self, start: date | None = None, end: date | None = None, tx_type: str | None = None) -> dict[int, int]:
+        sl = self.range_slice(start, end)
+        return self._sum_by_code("category", self.category_ids, sl, self._mask(sl, tx_type))
+
+    def sum_by_account(self, start: date | None = None, end: date | None = None, tx_type: str | None = None) -> dict[int, int]:
+        sl = self.range_slice(start, end)
+        return self._sum_by_code("account", self.account_ids, sl, self._mask(sl, tx_type))
+
+    def _sum_by_code(self, col: str, ids: np.ndarray, sl: slice, mask) -> dict[int, int]:
+        codes = self._col(col, sl, mask)
+        amounts = self._col("amount", sl, mask)
+        has = codes >= 0
+        sums = _bincount_sum(codes[has], amounts[has], len(ids))
+        nz = np.nonzero(sums)[0]
+        return {int(ids[i]): int(sums[i]) for i in nz}
+
+    # ===== статистики =====
+
+    def percentiles(self, q, start: date | None = None, end: date | None = None, tx_type: str | None = None) -> np.ndarray:
+        a = self.amounts(start, end, tx_type)
+        if len(a) == 0:
+            return np.zeros(len(np.atleast_1d(q)))
+        return np.percentile(a, q)
+
+
+def rolling_mean(series: np.ndarray, window: int) -> np.ndarray:
+    """Скользящее среднее через кумулятивную сумму; первые window-1 точек — по неполному окну."""
+    c = np.cumsum(series, dtype=np.float64)
+    out = np.empty(len(series), dtype=np.float64)
+    out[:window] = c[:window] / np.arange(1, min(window, len(series)) + 1)
+    out[window:] = (c[window:] - c[:-window]) / window
+    return out
+
+
+def _bincount_sum(idx: np.ndarray, weights: np.ndarray, n: int) -> np.ndarray:
+    """
+    Сумма weights по кодам [0..n). bincount считает в float64 — суммы
+    точны до 2**53 копеек, чего для личного бюджета более чем достаточно.
+    """
+    if n <= 0:
+        return np.zeros(0, dtype=np.int64)
+    sums = np.bincount(idx, weights=weights, minlength=n)[:n]
+    return np.rint(sums).astype(np.int64)
+
+
+# ===== загрузка / кэш на диске =====
+
+def snapshot_dir(db_path: Path) -> Path:
+    return db_path.parent / ".analytics" / db_path.stem
+
+
+def load_snapshot(session: Session, cache_dir: Path) -> ColumnarSnapshot:
+    """
+    Снимок для текущего поколения записи: из кэша на диске (mmap), либо
+    собирается заново одним запросом и сохраняется.
+    """
+    generation = current_generation(session)
+    cached = _read_cache(cache_dir, generation)
+    if cached is not None:
+        return cached
+    snap = build_snapshot(session, generation)
+    _write_cache(cache_dir, snap)
+    return _read_cache(cache_dir, generation) or snap
+
+
+def build_snapshot(session: Session, generation: int) -> ColumnarSnapshot:
+    tx = transactions_source()
+    type_code = case(
+        *[(tx.type == name, code) for name, code in TYPE_CODES.items()],
+        else_=-1,
+    )
+    stmt = (
+        select(
+            cast(func.julianday(tx.occurred_at) - 2440587.5, Integer).label("day"),
+            tx.amount_cents,
+            type_code,
+            func.coalesce(tx.category_id, -1),
+            func.coalesce(tx.account_id, tx.from_account_id, -1),
+        )
+        .order_by(tx.occurred_at, tx.id)
+    )
+    # Core-выполнение без ORM-обёрток; fromiter по плоскому потоку — без поэлементного разбора строк
+    rows = session.connection().execute(stmt).fetchall()
+    data = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int64, count=len(rows) * 5).reshape(-1, 5)
+
+    category_ids, category = _encode(data[:, 3])
+    account_ids, account = _encode(data[:, 4])
+    return ColumnarSnapshot(
+        generation=generation,
+        day=data[:, 0].astype(np.int32),
+        amount=np.ascontiguousarray(data[:, 1]),
+        type_code=data[:, 2].astype(np.int8),
+        category=category,
+        account=account,
+        category_ids=category_ids,
+        account_ids=account_ids,
+    )
+
+
+def _encode(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """id -> плотные коды int16 (-1 для отсутствующих)."""
+    ids = np.unique(values[values >= 0])
+    dtype = np.int16 if len(ids) < np.iinfo(np.int16).max else np.int32
+    codes = np.full(len(values), -1, dtype=dtype)
+    has = values >= 0
+    codes[has] = np.searchsorted(ids, values[has]).astype(dtype)
+    return ids, codes
+
+
+def _read_cache(cache_dir: Path, generation: int) -> ColumnarSnapshot | None:
+    meta_path = cache_dir / _META
+    if not meta_path.exists():
+        return None
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if meta.get("version") != SNAPSHOT_VERSION or meta.get("generation") != generation:
+            return None
+        data_dir = cache_dir / meta["dir"]
+        # np.asarray снимает подкласс memmap (лишние накладные расходы на срезах), данные остаются в mmap
+        cols = {name: np.asarray(np.load(data_dir / f"{name}.npy", mmap_mode="r")) for name in _COLUMNS}
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return ColumnarSnapshot(generation=generation, **cols)
+
+
+def _write_cache(cache_dir: Path, snap: ColumnarSnapshot) -> None:
+    """
+    Каждое поколение пишется в свой каталог, текущий снимок переключается
+    атомарной подменой meta.json (os.replace). Файлы прошлых поколений
+    могут быть ещё открыты через mmap (а в Windows такие не удалить),
+    поэтому старые каталоги удаляются по возможности — не вышло сейчас,
+    удалятся при следующей пересборке.
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # имя уникально: поколение может повториться (база восстановлена из копии),
+    # а недоудалённый каталог с тем же номером — остаться от прошлой сборки
+    tmp = Path(tempfile.mkdtemp(prefix=f"g{snap.generation}-", suffix=".tmp", dir=cache_dir))
+    for col in _COLUMNS:
+        np.save(tmp / f"{col}.npy", getattr(snap, col))
+    name = tmp.name.removesuffix(".tmp")
+    tmp.rename(cache_dir / name)
+
+    fd, meta_tmp = tempfile.mkstemp(prefix=f"{_META}-", suffix=".tmp", dir=cache_dir)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump({"version": SNAPSHOT_VERSION, "generation": snap.generation, "rows": len(snap), "dir": name}, f)
+    os.replace(meta_tmp, cache_dir / _META)
+
+    stale_tmp = time.time() - _TMP_TTL_SECONDS
+    for entry in cache_dir.iterdir():
+        if entry.name in (_META, name):
+            continue
+        # временные файлы соседнего потока могут быть ещё в работе — только брошенные
+        with contextlib.suppress(OSError):
+            if entry.name.endswith(".tmp") and entry.stat().st_mtime > stale_tmp:
+                continue
+            if entry.is_dir():
+                shutil.rmtree(entry, ignore_errors=True)
+            else:
+                entry.unlink()
@@ -0,0 +1,52 @@
+"""
+Прореживание рядов для графиков: Largest-Triangle-Three-Buckets (LTTB).
+
+Из n точек оставляет threshold так, чтобы форма линии сохранилась:
+первая и последняя точки остаются, остальные делятся на threshold-2
+корзины, и из каждой берётся точка, образующая с уже выбранной предыдущей
+и средним следующей корзины треугольник наибольшей площади. Пики и провалы
+при этом не теряются, в отличие от простого шага или усреднения.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    x — возрастающие координаты (например, номера дней), y — значения.
+    Возвращает (x, y) длиной min(n, threshold); при threshold < 3 или
+    коротком ряде возвращает исходные массивы.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    # границы корзин для внутренних точек 1..n-2
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    # средние по корзинам — считаем сразу все через префиксные суммы
+    cx = np.concatenate(([0.0], np.cumsum(x)))
+    cy = np.concatenate(([0.0], np.cumsum(y)))
+    counts = np.maximum(edges[1:] - edges[:-1], 1)
+    avg_x = (cx[edges[1:]] - cx[edges[:-1]]) / counts
+    avg_y = (cy[edges[1:]] - cy[edges[:-1]]) / counts
+    # для последней корзины «следующая» — последняя точка ряда
+    avg_x = np.append(avg_x[1:], x[-1])
+    avg_y = np.append(avg_y[1:], y[-1])
+
+    out = np.empty(threshold, dtype=np.int64)
+    out[0] = 0
+    out[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], max(edges[i + 1], edges[i] + 1)
+        bx = x[lo:hi]
+        by = y[lo:hi]
+        # удвоенная площадь треугольника (a, точка корзины, среднее следующей)
+        area = np.abs((x[a] - avg_x[i]) * (by - y[a]) - (x[a] - bx) * (avg_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+
+    return x[out], y[out]
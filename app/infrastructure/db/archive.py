@@ -0,0 +1,219 @@
+"""
+Архив закрытых лет: операции старше отсечки переносятся в отдельные
+SQLite-файлы (по одному на год), которые подключаются через ATTACH DATABASE
+как схемы arch_<год>. Репозитории объединяют архивы с основной таблицей
+только если запрошенный период их задевает.
+"""
+from __future__ import annotations
+
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import Column, Connection, MetaData, Table, bindparam, delete, func, insert, select, union_all, update
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import aliased
+
+from app.infrastructure.db.models import Goal, Transaction
+
+# SQLite по умолчанию позволяет подключить не более 10 баз (SQLITE_MAX_ATTACHED)
+MAX_ATTACHED = 10
+
+# Годы, найденные при последнем сканировании каталога архива
+_known_years: list[int] = []
+_tables: dict[int, Table] = {}
+
+
+def archive_dir(db_path: Path) -> Path:
+    return db_path.parent / "archive"
+
+
+def archive_file(db_path: Path, year: int) -> Path:
+    return archive_dir(db_path) / f"{db_path.stem}_{year}.sqlite3"
+
+
+def schema_name(year: int) -> str:
+    return f"arch_{year}"
+
+
+def archive_files(db_path: Path | None) -> dict[int, Path]:
+    """Файлы архивов в каталоге архива: {год: путь}, по возрастанию года."""
+    files: dict[int, Path] = {}
+    if db_path is not None and archive_dir(db_path).is_dir():
+        prefix = f"{db_path.stem}_"
+        for f in archive_dir(db_path).glob(f"{prefix}*.sqlite3"):
+            suffix = f.stem[len(prefix):]
+            if suffix.isdigit():
+                files[int(suffix)] = f
+    return dict(sorted(files.items()))
+
+
+def discover_years(db_path: Path | None) -> list[int]:
+    """
+    Сканирует каталог архива и запоминает найденные годы. Если архивов больше,
+    чем SQLite может подключить, — ошибка: без части лет все запросы по полной
+    истории (балансы, выписки) молча давали бы неверный результат.
+    """
+    global _known_years
+    files = archive_files(db_path)
+    if len(files) > MAX_ATTACHED - 1:
+        names = ", ".join(f.name for f in files.values())
+        raise RuntimeError(
+            f"Слишком много архивных лет ({len(files)}): SQLite подключает не более {MAX_ATTACHED} баз. "
+            f"Файлы в {archive_dir(db_path)}: {names}"
+        )
+    _known_years = list(files)
+    return list(_known_years)
+
+
+def archived_years() -> list[int]:
+    return list(_known_years)
+
+
+def archive_table(year: int) -> Table:
+    """Копия таблицы transactions в схеме архива (без FK — справочники живут в основной базе)."""
+    if year not in _tables:
+        cols = [
+            Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable)
+            for c in Transaction.__table__.columns
+        ]
+        _tables[year] = Table("transactions", MetaData(), *cols, schema=schema_name(year))
+    return _tables[year]
+
+
+def attach_archives(dbapi_conn, db_path: Path | None) -> None:
+    """Обработчик connect: подключает все известные архивы к новому соединению."""
+    if db_path is None:
+        return
+    for year in _known_years:
+        _attach(dbapi_conn, db_path, year)
+
+
+def _attach(dbapi_conn, db_path: Path, year: int) -> None:
+    schema = schema_name(year)
+    attached = {row[1] for row in dbapi_conn.execute("PRAGMA database_list").fetchall()}
+    if schema not in attached:
+        dbapi_conn.execute("ATTACH DATABASE ? AS " + schema, (str(archive_file(db_path, year)),))
+    _sync_columns(dbapi_conn, year)
+
+
+def _sync_columns(dbapi_conn, year: int) -> None:
+    """
+    Архив создаётся со схемой на момент переноса; колонки, добавленные
+    более поздними миграциями (все nullable), досоздаём, чтобы UNION сходился.
+    """
+    schema = schema_name(year)
+    existing = {row[1] for row in dbapi_conn.execute(f"PRAGMA {schema}.table_info(transactions)").fetchall()}
+    if not existing:
+        return
+    for col in Transaction.__table__.columns:
+        if col.name not in existing:
+            ddl_type = col.type.compile(dialect=sqlite.dialect())
+            dbapi_conn.execute(f"ALTER TABLE {schema}.transactions ADD COLUMN {col.name} {ddl_type}")
+    _backfill_fingerprints(dbapi_conn, year)
+
+
+def _backfill_fingerprints(dbapi_conn, year: int) -> None:
+    """
+    Индекс по отпечаткам в архиве и отпечатки строк, перенесённых до появления
+    колонки (по индексу проверка пустых отпечатков почти бесплатна).
+    Нужны, чтобы импорт выписки за закрытый год находил дубликаты и в архиве.
+    """
+    schema = schema_name(year)
+    dbapi_conn.execute(
+        f"CREATE INDEX IF NOT EXISTS {schema}.ix_transactions_fingerprint ON transactions (fingerprint)"
+    )
+    if dbapi_conn.execute(f"SELECT 1 FROM {schema}.transactions WHERE fingerprint IS NULL LIMIT 1").fetchone():
+        dbapi_conn.execute(
+            f"UPDATE {schema}.transactions SET fingerprint = "
+            "tx_fingerprint(type, account_id, from_account_id, occurred_at, amount_cents, note) "
+            "WHERE fingerprint IS NULL"
+        )
+        dbapi_conn.commit()
+
+
+def years_overlapping(start: date | None, end: date | None) -> list[int]:
+    return [
+        y for y in _known_years
+        if (start is None or start <= date(y, 12, 31)) and (end is None or end >= date(y, 1, 1))
+    ]
+
+
+def transactions_source(start: date | None = None, end: date | None = None):
+    """
+    Сущность для выборок операций за период: сама Transaction, если период
+    не задевает архивы, иначе alias над UNION ALL основной таблицы и нужных архивов.
+    Объекты из архива — только для чтения.
+    """
+    years = years_overlapping(start, end)
+    if not years:
+        return Transaction
+
+    main = Transaction.__table__
+    parts = [select(*main.c)]
+    for y in years:
+        t = archive_table(y)
+        parts.append(select(*[t.c[c.name] for c in main.c]))
+    return aliased(Transaction, union_all(*parts).subquery("transactions_all"), name="tx")
+
+
+def move_closed_years(conn: Connection, db_path: Path, before_year: int) -> dict[int, int]:
+    """
+    Переносит операции с occurred_at < 01.01.before_year в годовые архивы.
+    Возвращает {год: перенесено строк}. Коммитит сам: ATTACH нельзя делать внутри транзакции.
+
+    Чтобы SQLite не переиспользовал id перенесённых строк (rowid без AUTOINCREMENT),
+    строки с id больше максимального id остающихся операций не переносятся.
+    """
+    tx = Transaction.__table__
+    cutoff = date(before_year, 1, 1)
+
+    years = conn.execute(
+        select(func.distinct(func.strftime("%Y", tx.c.occurred_at))).where(tx.c.occurred_at < cutoff)
+    ).scalars().all()
+    years = sorted(int(y) for y in years)
+    if not years:
+        return {}
+    if len(set(years) | set(_known_years)) > MAX_ATTACHED - 1:
+        raise RuntimeError(f"Слишком много архивных лет: SQLite подключает не более {MAX_ATTACHED} баз")
+
+    keep_from_id = conn.execute(select(func.max(tx.c.id)).where(tx.c.occurred_at >= cutoff)).scalar()
+    if keep_from_id is None:
+        keep_from_id = conn.execute(select(func.max(tx.c.id))).scalar()
+
+    # закрываем чтение: ATTACH внутри открытой транзакции SQLite не разрешает
+    conn.commit()
+    archive_dir(db_path).mkdir(parents=True, exist_ok=True)
+    dbapi_conn = conn.connection.dbapi_connection
+    for y in years:
+        _attach(dbapi_conn, db_path, y)
+
+    # перенос — не удаление: триггеры на DELETE уменьшили бы накопленное по целям
+    goals = Goal.__table__
+    saved = [{"gid": gid, "saved": cents} for gid, cents in conn.execute(select(goals.c.id, goals.c.saved_cents))]
+
+    moved: dict[int, int] = {}
+    try:
+        for y in years:
+            t = archive_table(y)
+            t.create(conn, checkfirst=True)
+            for column in ("occurred_at", "fingerprint"):
+                conn.exec_driver_sql(
+                    f"CREATE INDEX IF NOT EXISTS {schema_name(y)}.ix_transactions_{column} "
+                    f"ON transactions ({column})"
+                )
+            cond = (
+                (tx.c.occurred_at >= date(y, 1, 1))
+                & (tx.c.occurred_at <= date(y, 12, 31))
+                & (tx.c.id < keep_from_id)
+            )
+            conn.execute(insert(t).from_select([c.name for c in tx.c], select(*tx.c).where(cond)))
+            moved[y] = conn.execute(delete(tx).where(cond)).rowcount
+        if saved:
+            conn.execute(
+                update(goals).where(goals.c.id == bindparam("gid")).values(saved_cents=bindparam("saved")), saved
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return {y: n for y, n in moved.items() if n}
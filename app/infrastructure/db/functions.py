@@ -0,0 +1,48 @@
+"""
+Python-функции, регистрируемые в каждом соединении SQLite.
+
+Встроенный lower() в SQLite понимает только ASCII, поэтому поиск
+без учёта регистра по кириллице идёт через py_lower.
+"""
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+from datetime import date
+
+from app.domain.enums import TransactionType
+
+# типы, уменьшающие баланс счёта-источника (см. tx_fingerprint)
+_OUTFLOW_TYPES = (TransactionType.EXPENSE.value, TransactionType.TRANSFER.value)
+
+
+def _py_lower(value):
+    return value.lower() if isinstance(value, str) else value
+
+
+def normalize_note(note: str | None) -> str:
+    return " ".join((note or "").lower().split())
+
+
+def tx_fingerprint(
+    tx_type: str,
+    account_id: int | None,
+    from_account_id: int | None,
+    occurred_at: date | str,
+    amount_cents: int,
+    note: str | None,
+) -> str:
+    """
+    Отпечаток операции для поиска дубликатов при импорте: хэш счёта-источника,
+    даты, суммы со знаком (расход и перевод — минус) и заметки без учёта
+    регистра и лишних пробелов. Категория не входит: её могут поменять после импорта.
+    """
+    day = occurred_at.isoformat() if isinstance(occurred_at, date) else str(occurred_at)[:10]
+    signed = -amount_cents if tx_type in _OUTFLOW_TYPES else amount_cents
+    raw = f"{account_id or from_account_id or 0}|{day}|{signed}|{normalize_note(note)}"
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def register_functions(dbapi_conn: sqlite3.Connection) -> None:
+    dbapi_conn.create_function("py_lower", 1, _py_lower, deterministic=True)
+    dbapi_conn.create_function("tx_fingerprint", 6, tx_fingerprint, deterministic=True)
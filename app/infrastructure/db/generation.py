@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from sqlalchemy import Connection, select
+from sqlalchemy.orm import Session
+
+from app.infrastructure.db.models import DbMeta
+
+WRITE_GENERATION_KEY = "write_generation"
+
+
+def current_generation(session: Session | Connection) -> int:
+    """
+    Текущее поколение записи (растёт при любом изменении данных).
+    Кэши, посчитанные при том же поколении, гарантированно актуальны.
+    """
+    value = session.execute(select(DbMeta.value).where(DbMeta.key == WRITE_GENERATION_KEY)).scalar()
+    return int(value or 0)
@@ -0,0 +1,48 @@
+"""write generation
+
+Revision ID: 00d40f79dc85
+Revises: d80186d904a7
+Create Date: 2026-10-19 07:40:14.179688
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '00d40f79dc85'
+down_revision: Union[str, Sequence[str], None] = 'd80186d904a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Счётчик поколений записи: любая запись в пользовательские таблицы
+# увеличивает его, по нему сбрасываются кэши и зеркала.
+_TABLES = ('transactions', 'accounts', 'categories', 'budgets')
+_BUMP = "UPDATE db_meta SET value = value + 1 WHERE key = 'write_generation';"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('db_meta',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('key', name=op.f('pk_db_meta'))
+    )
+    op.execute("INSERT INTO db_meta (key, value) VALUES ('write_generation', 0)")
+    for table in _TABLES:
+        for suffix, event in (('ai', 'INSERT'), ('au', 'UPDATE'), ('ad', 'DELETE')):
+            op.execute(f"""
+                CREATE TRIGGER trg_{table}_{suffix}_generation AFTER {event} ON {table}
+                BEGIN {_BUMP} END
+            """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in _TABLES:
+        for suffix in ('ai', 'au', 'ad'):
+            op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_{suffix}_generation")
+    op.drop_table('db_meta')
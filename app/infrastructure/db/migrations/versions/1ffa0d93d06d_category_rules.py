@@ -0,0 +1,56 @@
+"""category rules
+
+Revision ID: 1ffa0d93d06d
+Revises: 63f1d8d1aed8
+Create Date: 2026-10-19 08:06:26.796049
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1ffa0d93d06d'
+down_revision: Union[str, Sequence[str], None] = '63f1d8d1aed8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# правила — пользовательские данные: их правка тоже меняет поколение записи
+_BUMP = "UPDATE db_meta SET value = value + 1 WHERE key = 'write_generation';"
+_EVENTS = (('ai', 'INSERT'), ('au', 'UPDATE'), ('ad', 'DELETE'))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('category_rules',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('pattern', sa.String(length=255), nullable=True),
+    sa.Column('min_cents', sa.Integer(), nullable=True),
+    sa.Column('max_cents', sa.Integer(), nullable=True),
+    sa.Column('account_id', sa.Integer(), nullable=True),
+    sa.Column('priority', sa.Integer(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['account_id'], ['accounts.id'], name=op.f('fk_category_rules_account_id_accounts')),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], name=op.f('fk_category_rules_category_id_categories')),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_category_rules'))
+    )
+    op.create_index(op.f('ix_category_rules_category_id'), 'category_rules', ['category_id'], unique=False)
+    for suffix, event in _EVENTS:
+        op.execute(f"""
+            CREATE TRIGGER trg_category_rules_{suffix}_generation AFTER {event} ON category_rules
+            BEGIN {_BUMP} END
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for suffix, _event in _EVENTS:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_category_rules_{suffix}_generation")
+    op.drop_index(op.f('ix_category_rules_category_id'), table_name='category_rules')
+    op.drop_table('category_rules')
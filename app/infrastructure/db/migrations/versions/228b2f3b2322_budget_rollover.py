@@ -0,0 +1,28 @@
+"""budget rollover
+
+Revision ID: 228b2f3b2322
+Revises: 56bacec683ee
+Create Date: 2026-10-19 08:24:21.123432
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '228b2f3b2322'
+down_revision: Union[str, Sequence[str], None] = '56bacec683ee'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('budgets', sa.Column('rollover', sa.Boolean(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('budgets', 'rollover')
@@ -0,0 +1,83 @@
+"""goals
+
+Revision ID: 56bacec683ee
+Revises: ff688d31284d
+Create Date: 2026-10-19 08:22:23.505232
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '56bacec683ee'
+down_revision: Union[str, Sequence[str], None] = 'ff688d31284d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_BUMP = "UPDATE db_meta SET value = value + 1 WHERE key = 'write_generation';"
+_EVENTS = (('ai', 'INSERT'), ('au', 'UPDATE'), ('ad', 'DELETE'))
+
+
+def _apply(row: str, sign: str) -> str:
+    """Прибавляет (sign='+') или вычитает взнос операции row (NEW/OLD) из накопленного по целям."""
+    return f"""
+        UPDATE goals
+        SET saved_cents = saved_cents {sign} (
+            CASE WHEN account_id = {row}.from_account_id THEN -{row}.amount_cents ELSE {row}.amount_cents END
+        )
+        WHERE {row}.type = 'transfer'
+          AND (category_id = {row}.category_id OR account_id IN ({row}.to_account_id, {row}.from_account_id));
+    """
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('goals',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=120), nullable=False),
+    sa.Column('target_cents', sa.Integer(), nullable=False),
+    sa.Column('deadline', sa.Date(), nullable=True),
+    sa.Column('category_id', sa.Integer(), nullable=True),
+    sa.Column('account_id', sa.Integer(), nullable=True),
+    sa.Column('saved_cents', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.CheckConstraint('(category_id IS NULL) <> (account_id IS NULL)', name=op.f('ck_goals_one_link')),
+    sa.CheckConstraint('target_cents > 0', name=op.f('ck_goals_target_positive')),
+    sa.ForeignKeyConstraint(['account_id'], ['accounts.id'], name=op.f('fk_goals_account_id_accounts')),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], name=op.f('fk_goals_category_id_categories')),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_goals'))
+    )
+    for suffix, event in _EVENTS:
+        op.execute(f"""
+            CREATE TRIGGER trg_goals_{suffix}_generation AFTER {event} ON goals
+            BEGIN {_BUMP} END
+        """)
+
+    # накопленное по целям меняется вместе с переводами — без пересчёта по всей истории
+    op.execute(f"""
+        CREATE TRIGGER trg_transactions_ai_goals AFTER INSERT ON transactions
+        WHEN NEW.type = 'transfer'
+        BEGIN {_apply('NEW', '+')} END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER trg_transactions_ad_goals AFTER DELETE ON transactions
+        WHEN OLD.type = 'transfer'
+        BEGIN {_apply('OLD', '-')} END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER trg_transactions_au_goals
+        AFTER UPDATE OF type, category_id, from_account_id, to_account_id, amount_cents ON transactions
+        WHEN OLD.type = 'transfer' OR NEW.type = 'transfer'
+        BEGIN {_apply('OLD', '-')} {_apply('NEW', '+')} END
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for suffix in ('ai', 'au', 'ad'):
+        op.execute(f"DROP TRIGGER IF EXISTS trg_transactions_{suffix}_goals")
+        op.execute(f"DROP TRIGGER IF EXISTS trg_goals_{suffix}_generation")
+    op.drop_table('goals')
@@ -0,0 +1,28 @@
+"""transaction reconciled at
+
+Revision ID: 5e677df9b13b
+Revises: 1ffa0d93d06d
+Create Date: 2026-10-19 08:09:53.340904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e677df9b13b'
+down_revision: Union[str, Sequence[str], None] = '1ffa0d93d06d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('transactions', sa.Column('reconciled_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('transactions', 'reconciled_at')
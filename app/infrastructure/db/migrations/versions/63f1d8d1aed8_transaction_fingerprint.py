@@ -0,0 +1,43 @@
+"""transaction fingerprint
+
+Revision ID: 63f1d8d1aed8
+Revises: 88bd07b912cd
+Create Date: 2026-10-19 08:04:10.718752
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.infrastructure.db.functions import register_functions
+
+
+# revision identifiers, used by Alembic.
+revision: str = '63f1d8d1aed8'
+down_revision: Union[str, Sequence[str], None] = '88bd07b912cd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Отпечатки существующих операций считает та же Python-функция, что и ORM
+# (регистрируем её на соединении миграции). Архивы не трогаем: колонку и
+# отпечатки в них досоздаёт подключение архива (archive._backfill_fingerprints).
+_BACKFILL = """
+    UPDATE transactions
+    SET fingerprint = tx_fingerprint(type, account_id, from_account_id, occurred_at, amount_cents, note)
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('transactions', sa.Column('fingerprint', sa.String(length=16), nullable=True))
+    register_functions(op.get_bind().connection.driver_connection)
+    op.execute(_BACKFILL)
+    op.create_index('ix_transactions_fingerprint', 'transactions', ['fingerprint'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transactions_fingerprint', table_name='transactions')
+    op.drop_column('transactions', 'fingerprint')
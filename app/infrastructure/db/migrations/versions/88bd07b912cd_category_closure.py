@@ -0,0 +1,54 @@
+"""category closure
+
+Revision ID: 88bd07b912cd
+Revises: 00d40f79dc85
+Create Date: 2026-10-19 07:48:58.877412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '88bd07b912cd'
+down_revision: Union[str, Sequence[str], None] = '00d40f79dc85'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Заполняем замыкание по уже существующим parent_id: каждая категория —
+# предок самой себя (depth 0), дальше поднимаемся по родителям.
+_BACKFILL = """
+    WITH RECURSIVE tree(ancestor_id, descendant_id, depth) AS (
+        SELECT id, id, 0 FROM categories
+        UNION ALL
+        SELECT c.parent_id, t.descendant_id, t.depth + 1
+        FROM tree AS t
+        JOIN categories AS c ON c.id = t.ancestor_id
+        WHERE c.parent_id IS NOT NULL
+    )
+    INSERT INTO category_closure (ancestor_id, descendant_id, depth)
+    SELECT ancestor_id, descendant_id, depth FROM tree
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('category_closure',
+    sa.Column('ancestor_id', sa.Integer(), nullable=False),
+    sa.Column('descendant_id', sa.Integer(), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['ancestor_id'], ['categories.id'], name=op.f('fk_category_closure_ancestor_id_categories')),
+    sa.ForeignKeyConstraint(['descendant_id'], ['categories.id'], name=op.f('fk_category_closure_descendant_id_categories')),
+    sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id', name=op.f('pk_category_closure'))
+    )
+    op.create_index('ix_category_closure_descendant_id', 'category_closure', ['descendant_id'], unique=False)
+    op.execute(_BACKFILL)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_category_closure_descendant_id', table_name='category_closure')
+    op.drop_table('category_closure')
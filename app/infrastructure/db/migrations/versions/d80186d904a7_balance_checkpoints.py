@@ -0,0 +1,74 @@
+"""balance checkpoints
+
+Revision ID: d80186d904a7
+Revises: 425a684e2ab9
+Create Date: 2026-10-19 07:36:23.692519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd80186d904a7'
+down_revision: Union[str, Sequence[str], None] = '425a684e2ab9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Любая операция, задевающая счёт задним числом, делает чекпоинты
+# этого счёта начиная с её даты недействительными.
+_INVALIDATE_NEW = """
+    DELETE FROM balance_checkpoints
+    WHERE month_end >= NEW.occurred_at
+      AND account_id IN (NEW.account_id, NEW.from_account_id, NEW.to_account_id);
+"""
+_INVALIDATE_OLD = """
+    DELETE FROM balance_checkpoints
+    WHERE month_end >= OLD.occurred_at
+      AND account_id IN (OLD.account_id, OLD.from_account_id, OLD.to_account_id);
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('balance_checkpoints',
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('month_end', sa.Date(), nullable=False),
+    sa.Column('balance_cents', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['account_id'], ['accounts.id'], name=op.f('fk_balance_checkpoints_account_id_accounts')),
+    sa.PrimaryKeyConstraint('account_id', 'month_end', name=op.f('pk_balance_checkpoints'))
+    )
+    op.create_index('ix_transactions_occurred_at', 'transactions', ['occurred_at'], unique=False)
+    op.create_index('ix_transactions_account_id_occurred_at', 'transactions', ['account_id', 'occurred_at'], unique=False)
+    op.create_index('ix_transactions_from_account_id_occurred_at', 'transactions', ['from_account_id', 'occurred_at'], unique=False)
+    op.create_index('ix_transactions_to_account_id_occurred_at', 'transactions', ['to_account_id', 'occurred_at'], unique=False)
+
+    op.execute(f"""
+        CREATE TRIGGER trg_transactions_ai_checkpoints AFTER INSERT ON transactions
+        BEGIN {_INVALIDATE_NEW} END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER trg_transactions_ad_checkpoints AFTER DELETE ON transactions
+        BEGIN {_INVALIDATE_OLD} END
+    """)
+    op.execute(f"""
+        CREATE TRIGGER trg_transactions_au_checkpoints
+        AFTER UPDATE OF occurred_at, type, account_id, from_account_id, to_account_id, amount_cents
+        ON transactions
+        BEGIN {_INVALIDATE_OLD} {_INVALIDATE_NEW} END
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_transactions_au_checkpoints")
+    op.execute("DROP TRIGGER IF EXISTS trg_transactions_ad_checkpoints")
+    op.execute("DROP TRIGGER IF EXISTS trg_transactions_ai_checkpoints")
+    op.drop_index('ix_transactions_to_account_id_occurred_at', table_name='transactions')
+    op.drop_index('ix_transactions_from_account_id_occurred_at', table_name='transactions')
+    op.drop_index('ix_transactions_account_id_occurred_at', table_name='transactions')
+    op.drop_index('ix_transactions_occurred_at', table_name='transactions')
+    op.drop_table('balance_checkpoints')
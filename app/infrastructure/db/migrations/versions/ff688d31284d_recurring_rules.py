@@ -0,0 +1,67 @@
+"""recurring rules
+
+Revision ID: ff688d31284d
+Revises: 5e677df9b13b
+Create Date: 2026-10-19 08:19:15.860106
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ff688d31284d'
+down_revision: Union[str, Sequence[str], None] = '5e677df9b13b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# правила — пользовательские данные: их правка тоже меняет поколение записи
+_BUMP = "UPDATE db_meta SET value = value + 1 WHERE key = 'write_generation';"
+_EVENTS = (('ai', 'INSERT'), ('au', 'UPDATE'), ('ad', 'DELETE'))
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('recurring_rules',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=120), nullable=False),
+    sa.Column('type', sa.String(length=20), nullable=False),
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('to_account_id', sa.Integer(), nullable=True),
+    sa.Column('category_id', sa.Integer(), nullable=True),
+    sa.Column('amount_cents', sa.Integer(), nullable=False),
+    sa.Column('note', sa.String(length=255), nullable=True),
+    sa.Column('rrule', sa.String(length=255), nullable=False),
+    sa.Column('dtstart', sa.Date(), nullable=False),
+    sa.Column('materialized_through', sa.Date(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.CheckConstraint('amount_cents > 0', name=op.f('ck_recurring_rules_amount_positive')),
+    sa.ForeignKeyConstraint(['account_id'], ['accounts.id'], name=op.f('fk_recurring_rules_account_id_accounts')),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], name=op.f('fk_recurring_rules_category_id_categories')),
+    sa.ForeignKeyConstraint(['to_account_id'], ['accounts.id'], name=op.f('fk_recurring_rules_to_account_id_accounts')),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_recurring_rules'))
+    )
+    for suffix, event in _EVENTS:
+        op.execute(f"""
+            CREATE TRIGGER trg_recurring_rules_{suffix}_generation AFTER {event} ON recurring_rules
+            BEGIN {_BUMP} END
+        """)
+    # SQLite не умеет ALTER TABLE ADD CONSTRAINT, а batch-режим пересоздал бы таблицу
+    # вместе с её триггерами — внешний ключ объявляется прямо в ADD COLUMN
+    op.execute(
+        "ALTER TABLE transactions ADD COLUMN recurring_rule_id INTEGER "
+        "CONSTRAINT fk_transactions_recurring_rule_id_recurring_rules REFERENCES recurring_rules (id)"
+    )
+    op.create_index('uq_transactions_recurring_rule_id_occurred_at', 'transactions', ['recurring_rule_id', 'occurred_at'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_transactions_recurring_rule_id_occurred_at', table_name='transactions')
+    op.drop_column('transactions', 'recurring_rule_id')
+    for suffix, _event in _EVENTS:
+        op.execute(f"DROP TRIGGER IF EXISTS trg_recurring_rules_{suffix}_generation")
+    op.drop_table('recurring_rules')
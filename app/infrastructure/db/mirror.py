@@ -0,0 +1,95 @@
+"""
+Read-only копия базы в памяти для тяжёлых отчётов: чтения не конкурируют
+с записью в файл и не платят за промахи page cache. Копия снимается через
+SQLite backup API и пересобирается, когда меняется поколение записи.
+"""
+from __future__ import annotations
+
+import itertools
+import sqlite3
+import threading
+from pathlib import Path
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from app.infrastructure.db import archive
+from app.infrastructure.db.functions import register_functions
+
+_seq = itertools.count(1)
+
+
+class AnalyticsMirror:
+    def __init__(self, db_path: Path, pages_per_step: int = 1024):
+        self.db_path = db_path
+        self.pages_per_step = pages_per_step
+        self.generation: int | None = None
+
+        self._lock = threading.Lock()
+        self._holder: sqlite3.Connection | None = None
+        self._engine = None
+        self._sessionmaker: sessionmaker | None = None
+
+    def ensure_fresh(self, generation: int) -> None:
+        """Пересобирает зеркало, если база менялась с момента последней копии."""
+        if self.generation == generation:
+            return
+        with self._lock:
+            if self.generation != generation:
+                self._rebuild(generation)
+
+    def open_session(self, generation: int) -> Session:
+        self.ensure_fresh(generation)
+        session = self._sessionmaker()
+        session.info["mirror"] = True
+        return session
+
+    def _rebuild(self, generation: int) -> None:
+        """
+        Каждая пересборка — новая shared-cache база в памяти; старая живёт,
+        пока её не отпустят уже открытые сессии, так что читатели не блокируются.
+        """
+        uri = f"file:budget_mirror_{id(self)}_{next(_seq)}?mode=memory&cache=shared"
+        holder = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        src = sqlite3.connect(self.db_path)
+        try:
+            src.backup(holder, pages=self.pages_per_step)
+        finally:
+            src.close()
+
+        db_path = self.db_path
+        # URL "sqlite://" по умолчанию даёт SingletonThreadPool (соединение на поток,
+        # чужие закрываются при переполнении) — для параллельных отчётов нужен обычный пул
+        engine = create_engine(
+            "sqlite://",
+            creator=lambda: sqlite3.connect(uri, uri=True, check_same_thread=False),
+            poolclass=QueuePool,
+        )
+
+        @event.listens_for(engine, "connect")
+        def _on_connect(dbapi_conn, _record):
+            register_functions(dbapi_conn)
+            # архивы закрытых лет не меняются — подключаем файлы как есть
+            archive.attach_archives(dbapi_conn, db_path)
+            dbapi_conn.execute("PRAGMA query_only = ON")
+
+        old_engine, old_holder = self._engine, self._holder
+        self._holder = holder
+        self._engine = engine
+        self._sessionmaker = sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
+        self.generation = generation
+
+        if old_engine is not None:
+            old_engine.dispose()
+        if old_holder is not None:
+            old_holder.close()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._engine is not None:
+                self._engine.dispose()
+            if self._holder is not None:
+                self._holder.close()
+            self._engine = self._holder = self._sessionmaker = None
+            self.generation = None
@@ -11,11 +11,14 @@ from sqlalchemy import (
     ForeignKey,
     CheckConstraint,
     UniqueConstraint,
+    Index,
+    event,
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.infrastructure.db.base import Base
-from app.domain.enums import AccountType, CategoryKind, TransactionType
+from app.infrastructure.db.functions import tx_fingerprint
+from app.domain.enums import AccountType, CategoryKind, TransactionType, RuleKind
 
 
 class Account(Base):
@@ -89,6 +92,15 @@ class Transaction(Base):
 
     note: Mapped[str | None] = mapped_column(String(255), nullable=True)
 
+    # хэш счёта, даты, суммы и заметки (см. tx_fingerprint) — для поиска дубликатов при импорте
+    fingerprint: Mapped[str | None] = mapped_column(String(16), nullable=True)
+
+    # когда операция сверена с банковской выпиской (None — ещё не сверена)
+    reconciled_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    # правило, которым операция создана (см. RecurringRule); None — введена вручную
+    recurring_rule_id: Mapped[int | None] = mapped_column(ForeignKey("recurring_rules.id"), nullable=True)
+
     created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
 
     account: Mapped["Account | None"] = relationship(
@@ -111,8 +123,29 @@ class Transaction(Base):
 
     __table_args__ = (
         CheckConstraint("amount_cents > 0", name="amount_positive"),
+        # Индексы под выборки "по счёту за период" (балансы на дату, выписки)
+        Index("ix_transactions_occurred_at", "occurred_at"),
+        Index("ix_transactions_account_id_occurred_at", "account_id", "occurred_at"),
+        Index("ix_transactions_from_account_id_occurred_at", "from_account_id", "occurred_at"),
+        Index("ix_transactions_to_account_id_occurred_at", "to_account_id", "occurred_at"),
+        # не уникальный: две одинаковые покупки за день — нормальная ситуация
+        Index("ix_transactions_fingerprint", "fingerprint"),
+        # одно вхождение правила на дату: повторный запуск проведения ничего не дублирует
+        Index("uq_transactions_recurring_rule_id_occurred_at", "recurring_rule_id", "occurred_at", unique=True),
     )
 
+    def compute_fingerprint(self) -> str:
+        return tx_fingerprint(
+            self.type, self.account_id, self.from_account_id, self.occurred_at, self.amount_cents, self.note
+        )
+
+
+@event.listens_for(Transaction, "before_insert")
+@event.listens_for(Transaction, "before_update")
+def _set_fingerprint(_mapper, _connection, target: Transaction) -> None:
+    # bulk-вставки в обход ORM считают отпечаток сами (TransactionsRepo.bulk_add)
+    target.fingerprint = target.compute_fingerprint()
+
 
 class Budget(Base):
     __tablename__ = "budgets"
@@ -128,6 +161,140 @@ class Budget(Base):
     category: Mapped["Category"] = relationship()
 
     limit_cents: Mapped[int] = mapped_column()
+    # конверт: неизрасходованное (или перерасход) переносится на следующие месяцы
+    rollover: Mapped[bool] = mapped_column(default=False, server_default="0")
 
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class BalanceCheckpoint(Base):
+    """
+    Баланс счёта на конец месяца (включая все операции по month_end).
+    Создаётся лениво из ReportsRepo.balance_as_of; устаревшие чекпоинты
+    удаляются триггерами на transactions (см. миграцию balance_checkpoints).
+    """
+    __tablename__ = "balance_checkpoints"
+
+    account_id: Mapped[int] = mapped_column(ForeignKey("accounts.id"), primary_key=True)
+    # последний день месяца
+    month_end: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    balance_cents: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class DbMeta(Base):
+    """
+    Служебные значения базы. write_generation увеличивается триггерами
+    на каждую запись в transactions/accounts/categories/budgets.
+    """
+    __tablename__ = "db_meta"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    value: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class CategoryClosure(Base):
+    """
+    Замыкание дерева категорий: по строке на каждую пару (предок, потомок),
+    включая саму категорию (depth = 0). Поддерживается сервисами
+    create_category / move_category, чтобы отчёты сворачивали поддерево
+    одним join'ом.
+    """
+    __tablename__ = "category_closure"
+    __table_args__ = (
+        Index("ix_category_closure_descendant_id", "descendant_id"),
+    )
+
+    ancestor_id: Mapped[int] = mapped_column(ForeignKey("categories.id"), primary_key=True)
+    descendant_id: Mapped[int] = mapped_column(ForeignKey("categories.id"), primary_key=True)
+    depth: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class CategoryRule(Base):
+    """
+    Правило автокатегоризации: если заметка содержит ключевое слово
+    (или совпадает с regex), сумма попадает в диапазон и счёт совпадает —
+    операции ставится category_id. Пустые условия не проверяются.
+    Из подходящих правил побеждает с меньшим priority (затем с меньшим id).
+    """
+    __tablename__ = "category_rules"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    category_id: Mapped[int] = mapped_column(ForeignKey("categories.id"), nullable=False, index=True)
+
+    kind: Mapped[str] = mapped_column(String(20), nullable=False, default=RuleKind.KEYWORD.value)
+    pattern: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
+    # диапазон суммы (по модулю, в копейках), границы включительно
+    min_cents: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    max_cents: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    account_id: Mapped[int | None] = mapped_column(ForeignKey("accounts.id"), nullable=True)
+
+    priority: Mapped[int] = mapped_column(Integer, nullable=False, default=100)
+    is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+    category: Mapped["Category"] = relationship()
+
+
+class RecurringRule(Base):
+    """
+    Повторяющаяся операция (аренда, подписка, зарплата): шаблон операции
+    и расписание в формате RRULE (RFC 5545, например FREQ=MONTHLY;BYMONTHDAY=5),
+    отсчитываемое от dtstart. Вхождения по сегодняшний день проводятся
+    операциями пачкой; materialized_through — по какую дату уже проведено.
+    Для переводов account_id — счёт списания.
+    """
+    __tablename__ = "recurring_rules"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(120), nullable=False)
+
+    type: Mapped[str] = mapped_column(String(20), nullable=False, default=TransactionType.EXPENSE.value)
+    account_id: Mapped[int] = mapped_column(ForeignKey("accounts.id"), nullable=False)
+    to_account_id: Mapped[int | None] = mapped_column(ForeignKey("accounts.id"), nullable=True)
+    category_id: Mapped[int | None] = mapped_column(ForeignKey("categories.id"), nullable=True)
+    amount_cents: Mapped[int] = mapped_column(Integer, nullable=False)
+    note: Mapped[str | None] = mapped_column(String(255), nullable=True)
+
+    rrule: Mapped[str] = mapped_column(String(255), nullable=False)
+    dtstart: Mapped[date] = mapped_column(Date, nullable=False)
+    materialized_through: Mapped[date | None] = mapped_column(Date, nullable=True)
+
+    is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        CheckConstraint("amount_cents > 0", name="amount_positive"),
+    )
+
+
+class Goal(Base):
+    """
+    Цель накоплений. Взносы — переводы с её категорией накоплений (category_id)
+    или на её счёт-копилку (account_id; переводы с этого счёта уменьшают
+    накопленное). saved_cents — текущая сумма взносов: ведётся триггерами
+    на transactions (см. миграцию goals), а не пересчитывается по всем переводам.
+    """
+    __tablename__ = "goals"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(120), nullable=False)
+
+    target_cents: Mapped[int] = mapped_column(Integer, nullable=False)
+    deadline: Mapped[date | None] = mapped_column(Date, nullable=True)
+
+    category_id: Mapped[int | None] = mapped_column(ForeignKey("categories.id"), nullable=True)
+    account_id: Mapped[int | None] = mapped_column(ForeignKey("accounts.id"), nullable=True)
+
+    saved_cents: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        CheckConstraint("target_cents > 0", name="target_positive"),
+        # ровно одна привязка: категория или счёт
+        CheckConstraint("(category_id IS NULL) <> (account_id IS NULL)", name="one_link"),
+    )
@@ -0,0 +1,93 @@
+"""
+Прерываемые запросы SQLite.
+
+На время запроса на соединение ставится progress handler: SQLite вызывает
+его каждые PROGRESS_STEPS инструкций виртуальной машины, и ненулевой ответ
+прерывает текущий оператор (sqlite3.OperationalError: interrupted).
+Так устаревший запрос можно отменить из GUI-потока, а слишком долгий —
+оборвать по бюджету времени.
+"""
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+# ~ доли миллисекунды работы VM между проверками
+PROGRESS_STEPS = 10_000
+
+
+class QueryCancelled(Exception):
+    """Запрос отменён: пришёл более новый."""
+
+
+class QueryTimeout(Exception):
+    """Запрос не уложился в бюджет времени."""
+
+    def __init__(self, budget_s: float | None):
+        super().__init__(f"Запрос выполнялся дольше {budget_s:g} с")
+        self.budget_s = budget_s
+
+
+class QueryToken:
+    """
+    Отмена одного запроса. cancel() можно вызывать из любого потока;
+    budget_s — сколько секунд запросу разрешено выполняться (None — без ограничения).
+    """
+
+    def __init__(self, budget_s: float | None = None):
+        self.budget_s = budget_s
+        self._cancelled = threading.Event()
+        self._deadline: float | None = None
+        self.timed_out = False
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def check(self) -> None:
+        """Для проверок между запросами (в Python-коде)."""
+        if self.cancelled:
+            raise QueryCancelled()
+        if self._deadline is not None and time.monotonic() > self._deadline:
+            self.timed_out = True
+            raise QueryTimeout(self.budget_s)
+
+    def _should_abort(self) -> int:
+        if self.cancelled:
+            return 1
+        if self._deadline is not None and time.monotonic() > self._deadline:
+            self.timed_out = True
+            return 1
+        return 0
+
+
+@contextmanager
+def guarded(session: Session, token: QueryToken) -> Iterator[None]:
+    """
+    Запросы session внутри блока прерываются по token. Прерванный запрос
+    превращается в QueryCancelled или QueryTimeout.
+    """
+    dbapi_conn = session.connection().connection.driver_connection
+    if token.budget_s is not None:
+        token._deadline = time.monotonic() + token.budget_s
+    dbapi_conn.set_progress_handler(token._should_abort, PROGRESS_STEPS)
+    try:
+        token.check()
+        yield
+    except (OperationalError, sqlite3.OperationalError) as e:
+        if "interrupted" not in str(e):
+            raise
+        if token.timed_out:
+            raise QueryTimeout(token.budget_s) from e
+        raise QueryCancelled() from e
+    finally:
+        dbapi_conn.set_progress_handler(None, PROGRESS_STEPS)
@@ -1,9 +1,13 @@
 import os
 from pathlib import Path
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 
+from app.infrastructure.db import archive
+from app.infrastructure.db.functions import register_functions
+
 DEFAULT_DB_URL = "sqlite:///budget_tracker.sqlite3"
 
 
@@ -15,19 +19,39 @@ def get_database_url() -> str:
     return os.getenv("BUDGET_DB_URL", DEFAULT_DB_URL)
 
 
+def get_database_path() -> Path | None:
+    """Путь к файлу SQLite (None для не-SQLite и in-memory баз)."""
+    url = make_url(get_database_url())
+    if not url.drivername.startswith("sqlite") or not url.database or url.database == ":memory:":
+        return None
+    return Path(url.database).resolve()
+
+
 def create_db_engine(echo: bool = False):
     db_url = get_database_url()
 
     # SQLite: немного настроек для стабильности
     connect_args = {"check_same_thread": False} if db_url.startswith("sqlite") else {}
 
-    return create_engine(
+    eng = create_engine(
         db_url,
         echo=echo,
         future=True,
         connect_args=connect_args,
     )
 
+    if db_url.startswith("sqlite"):
+        db_path = get_database_path()
+        archive.discover_years(db_path)
+
+        # каждое новое соединение видит архивы закрытых лет и наши SQL-функции
+        @event.listens_for(eng, "connect")
+        def _on_connect(dbapi_conn, _record):
+            register_functions(dbapi_conn)
+            archive.attach_archives(dbapi_conn, db_path)
+
+    return eng
+
 
 engine = create_db_engine(echo=False)
 
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import select, delete, insert, func, literal, true
 
-from app.infrastructure.db.models import Category
+from app.infrastructure.db.models import Category, CategoryClosure
 
 
 class CategoriesRepo:
@@ -17,6 +17,10 @@ class CategoriesRepo:
     def get_by_id(self, category_id: int) -> Category | None:
         return self.session.get(Category, category_id)
 
+    def get_by_slug(self, slug: str) -> Category | None:
+        stmt = select(Category).where(Category.slug == slug)
+        return self.session.execute(stmt).scalar_one_or_none()
+
     def list_all(self) -> list[Category]:
         stmt = select(Category).order_by(Category.id.desc())
         return list(self.session.execute(stmt).scalars().all())
@@ -25,5 +29,89 @@ class CategoriesRepo:
         stmt = select(Category).where(Category.kind == kind).order_by(Category.id.desc())
         return list(self.session.execute(stmt).scalars().all())
 
+    def list_children(self, parent_id: int | None) -> list[Category]:
+        """Прямые потомки категории (parent_id=None — корни дерева)."""
+        cond = Category.parent_id.is_(None) if parent_id is None else Category.parent_id == parent_id
+        stmt = select(Category).where(cond).order_by(Category.kind, Category.name)
+        return list(self.session.execute(stmt).scalars().all())
+
+    def child_counts(self, parent_ids: list[int]) -> dict[int, int]:
+        """Количество прямых потомков для каждой категории (одним запросом)."""
+        if not parent_ids:
+            return {}
+        stmt = (
+            select(Category.parent_id, func.count())
+            .where(Category.parent_id.in_(parent_ids))
+            .group_by(Category.parent_id)
+        )
+        return {int(pid): int(n) for pid, n in self.session.execute(stmt).all()}
+
+    def subtree_ids(self, category_id: int) -> list[int]:
+        """Категория и все её потомки."""
+        stmt = select(CategoryClosure.descendant_id).where(CategoryClosure.ancestor_id == category_id)
+        return list(self.session.execute(stmt).scalars().all())
+
+    def ancestor_links(self, ancestor_ids: list[int]) -> list[tuple[int, int, str]]:
+        """Пары (потомок, предок, вид предка) для поддеревьев указанных категорий."""
+        if not ancestor_ids:
+            return []
+        stmt = (
+            select(CategoryClosure.descendant_id, CategoryClosure.ancestor_id, Category.kind)
+            .join(Category, Category.id == CategoryClosure.ancestor_id)
+            .where(CategoryClosure.ancestor_id.in_(ancestor_ids))
+        )
+        return [(int(d), int(a), kind) for d, a, kind in self.session.execute(stmt).all()]
+
+    def link_closure(self, cat: Category) -> None:
+        """
+        Добавляет строки замыкания для новой (листовой) категории:
+        она сама (depth 0) плюс все предки родителя на единицу глубже.
+        """
+        self.session.flush()
+        self.session.add(CategoryClosure(ancestor_id=cat.id, descendant_id=cat.id, depth=0))
+        if cat.parent_id is None:
+            return
+        self.session.execute(
+            insert(CategoryClosure).from_select(
+                ["ancestor_id", "descendant_id", "depth"],
+                select(CategoryClosure.ancestor_id, literal(cat.id), CategoryClosure.depth + 1)
+                .where(CategoryClosure.descendant_id == cat.parent_id),
+            )
+        )
+
+    def move_subtree(self, category_id: int, new_parent_id: int | None) -> None:
+        """
+        Переносит категорию со всем поддеревом под нового родителя:
+        рвём связи поддерева с прежними предками и пришиваем его
+        ко всем предкам нового родителя (декартово произведение).
+        """
+        subtree = select(CategoryClosure.descendant_id).where(CategoryClosure.ancestor_id == category_id)
+        old_ancestors = select(CategoryClosure.ancestor_id).where(
+            CategoryClosure.descendant_id == category_id,
+            CategoryClosure.ancestor_id != category_id,
+        )
+        self.session.execute(
+            delete(CategoryClosure).where(
+                CategoryClosure.descendant_id.in_(subtree),
+                CategoryClosure.ancestor_id.in_(old_ancestors),
+            )
+        )
+
+        if new_parent_id is not None:
+            sup = aliased(CategoryClosure)
+            sub = aliased(CategoryClosure)
+            self.session.execute(
+                insert(CategoryClosure).from_select(
+                    ["ancestor_id", "descendant_id", "depth"],
+                    select(sup.ancestor_id, sub.descendant_id, sup.depth + sub.depth + 1)
+                    .select_from(sup)
+                    .join(sub, true())
+                    .where(sup.descendant_id == new_parent_id, sub.ancestor_id == category_id),
+                )
+            )
+
+        cat = self.get_by_id(category_id)
+        cat.parent_id = new_parent_id
+
     def commit(self) -> None:
         self.session.commit()
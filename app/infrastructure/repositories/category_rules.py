@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.infrastructure.db.models import Category, CategoryRule
+
+
+class CategoryRulesRepo:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def add(self, rule: CategoryRule) -> CategoryRule:
+        self.session.add(rule)
+        return rule
+
+    def get_by_id(self, rule_id: int) -> CategoryRule | None:
+        return self.session.get(CategoryRule, rule_id)
+
+    def delete(self, rule_id: int) -> bool:
+        rule = self.get_by_id(rule_id)
+        if not rule:
+            return False
+        self.session.delete(rule)
+        self.session.commit()
+        return True
+
+    def list_all(self) -> list[CategoryRule]:
+        stmt = select(CategoryRule).order_by(CategoryRule.priority, CategoryRule.id)
+        return list(self.session.execute(stmt).scalars().all())
+
+    def list_active_with_kind(self) -> list[tuple[CategoryRule, str]]:
+        """Активные правила вместе с типом их категории (для сборки матчера)."""
+        stmt = (
+            select(CategoryRule, Category.kind)
+            .join(Category, Category.id == CategoryRule.category_id)
+            .where(CategoryRule.is_active.is_(True))
+            .order_by(CategoryRule.priority, CategoryRule.id)
+        )
+        return [(rule, kind) for rule, kind in self.session.execute(stmt).all()]
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from datetime import date
+
+from sqlalchemy import select, func, case, or_
+from sqlalchemy.orm import Session
+
+from app.infrastructure.db.archive import transactions_source
+from app.infrastructure.db.models import Goal
+from app.domain.enums import TransactionType
+
+
+class GoalsRepo:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def add(self, goal: Goal) -> Goal:
+        self.session.add(goal)
+        return goal
+
+    def get_by_id(self, goal_id: int) -> Goal | None:
+        return self.session.get(Goal, goal_id)
+
+    def delete(self, goal_id: int) -> bool:
+        goal = self.get_by_id(goal_id)
+        if not goal:
+            return False
+        self.session.delete(goal)
+        self.session.commit()
+        return True
+
+    def list_all(self) -> list[Goal]:
+        stmt = select(Goal).order_by(Goal.deadline.is_(None), Goal.deadline, Goal.name)
+        return list(self.session.execute(stmt).scalars().all())
+
+    def total_contributions(self, category_id: int | None, account_id: int | None) -> int:
+        """
+        Взносы за всю историю (включая архивы) — один раз, при создании цели;
+        дальше saved_cents ведут триггеры.
+        """
+        tx = transactions_source()
+        if category_id is not None:
+            signed, link = tx.amount_cents, tx.category_id == category_id
+        else:
+            signed = case((tx.from_account_id == account_id, -tx.amount_cents), else_=tx.amount_cents)
+            link = or_(tx.to_account_id == account_id, tx.from_account_id == account_id)
+        stmt = select(func.coalesce(func.sum(signed), 0)).where(tx.type == TransactionType.TRANSFER.value, link)
+        return int(self.session.execute(stmt).scalar_one())
+
+    def contributions_since(self, since: date) -> dict[int, int]:
+        """Взносы по каждой цели с даты since (для оценки темпа) — одним запросом."""
+        tx = transactions_source(since)
+        signed = case((tx.from_account_id == Goal.account_id, -tx.amount_cents), else_=tx.amount_cents)
+        stmt = (
+            select(Goal.id, func.sum(signed))
+            .join(
+                tx,
+                (tx.type == TransactionType.TRANSFER.value)
+                & (tx.occurred_at >= since)
+                & or_(
+                    tx.category_id == Goal.category_id,
+                    tx.to_account_id == Goal.account_id,
+                    tx.from_account_id == Goal.account_id,
+                ),
+            )
+            .group_by(Goal.id)
+        )
+        return {goal_id: int(total or 0) for goal_id, total in self.session.execute(stmt).all()}
+
+    def commit(self) -> None:
+        self.session.commit()
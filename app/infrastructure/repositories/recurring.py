@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from datetime import date
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.infrastructure.db.models import RecurringRule, Transaction
+
+
+class RecurringRulesRepo:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def add(self, rule: RecurringRule) -> RecurringRule:
+        self.session.add(rule)
+        return rule
+
+    def get_by_id(self, rule_id: int) -> RecurringRule | None:
+        return self.session.get(RecurringRule, rule_id)
+
+    def delete(self, rule_id: int) -> bool:
+        """Удаляет правило; уже проведённые им операции остаются (без ссылки на правило)."""
+        rule = self.get_by_id(rule_id)
+        if not rule:
+            return False
+        self.session.execute(
+            update(Transaction).where(Transaction.recurring_rule_id == rule_id).values(recurring_rule_id=None)
+        )
+        self.session.delete(rule)
+        self.session.commit()
+        return True
+
+    def list_all(self) -> list[RecurringRule]:
+        stmt = select(RecurringRule).order_by(RecurringRule.name, RecurringRule.id)
+        return list(self.session.execute(stmt).scalars().all())
+
+    def list_active(self) -> list[RecurringRule]:
+        stmt = select(RecurringRule).where(RecurringRule.is_active.is_(True)).order_by(RecurringRule.id)
+        return list(self.session.execute(stmt).scalars().all())
+
+    def set_materialized_through(self, through_by_id: dict[int, date]) -> None:
+        """Отметки «проведено по» одним executemany. Коммит — за вызывающим."""
+        if through_by_id:
+            self.session.execute(
+                update(RecurringRule),
+                [{"id": rule_id, "materialized_through": d} for rule_id, d in through_by_id.items()],
+            )
+
+    def commit(self) -> None:
+        self.session.commit()
@@ -1,13 +1,97 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import date
+from datetime import date, timedelta
 
-from sqlalchemy import select, func, case
+from sqlalchemy import select, func, case, cast, union_all, tuple_, literal, and_, or_, Integer
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
 
-from app.infrastructure.db.models import Transaction, Account, Category
-from app.domain.enums import TransactionType
+from app.infrastructure.db.archive import transactions_source
+from app.infrastructure.db.generation import current_generation
+from app.infrastructure.db.models import Account, Budget, Category, CategoryClosure, BalanceCheckpoint
+from app.infrastructure.repositories.transactions import apply_tx_filters
+from app.domain.enums import TransactionType, CategoryKind, Granularity
+
+
+def _month_end(d: date) -> date:
+    if d.month == 12:
+        return date(d.year, 12, 31)
+    return date(d.year, d.month + 1, 1) - timedelta(days=1)
+
+
+def _prev_month_end(d: date) -> date:
+    return date(d.year, d.month, 1) - timedelta(days=1)
+
+
+def _bucket_floor(d: date, granularity: str) -> date:
+    if granularity == Granularity.DAY:
+        return d
+    if granularity == Granularity.WEEK:
+        return d - timedelta(days=d.weekday())
+    if granularity == Granularity.MONTH:
+        return date(d.year, d.month, 1)
+    if granularity == Granularity.QUARTER:
+        return date(d.year, (d.month - 1) // 3 * 3 + 1, 1)
+    return date(d.year, 1, 1)
+
+
+def _bucket_next(d: date, granularity: str) -> date:
+    if granularity == Granularity.DAY:
+        return d + timedelta(days=1)
+    if granularity == Granularity.WEEK:
+        return d + timedelta(days=7)
+    step = {Granularity.MONTH: 1, Granularity.QUARTER: 3, Granularity.YEAR: 12}[granularity]
+    m = d.month - 1 + step
+    return date(d.year + m // 12, m % 12 + 1, 1)
+
+
+def _bucket_expr(col, granularity: str):
+    """SQL-выражение начала корзины ('YYYY-MM-DD') для даты операции."""
+    if granularity == Granularity.DAY:
+        return func.date(col)
+    if granularity == Granularity.WEEK:
+        # понедельник недели: %w — 0 для воскресенья
+        shift = (cast(func.strftime("%w", col), Integer) + 6) % 7
+        return func.date(col, func.printf("-%d days", shift))
+    if granularity == Granularity.MONTH:
+        return func.strftime("%Y-%m-01", col)
+    if granularity == Granularity.QUARTER:
+        q_month = (cast(func.strftime("%m", col), Integer) - 1) // 3 * 3 + 1
+        return func.printf("%s-%02d-01", func.strftime("%Y", col), q_month)
+    if granularity == Granularity.YEAR:
+        return func.strftime("%Y-01-01", col)
+    raise ValueError(f"Неизвестная гранулярность: {granularity}")
+
+
+def _pct_change(current: int, base: int) -> float | None:
+    # при нулевой базе процент не определён
+    if base == 0:
+        return None
+    return (current - base) * 100.0 / base
+
+
+def _shift_months(d: date, months: int) -> date:
+    """Первое число месяца, отстоящего от d на months месяцев."""
+    m = d.month - 1 + months
+    return date(d.year + m // 12, m % 12 + 1, 1)
+
+
+def _comparison_window(month_start: date, through_day: int | None) -> tuple[date, date]:
+    end = _month_end(month_start)
+    if through_day is not None:
+        end = min(end, month_start + timedelta(days=through_day - 1))
+    return month_start, end
+
+
+def _checkpoint_anchor(as_of: date) -> date:
+    """
+    Конец месяца, на который опираемся при расчёте баланса на as_of:
+    последний конец месяца <= as_of, но не позже последнего закрытого месяца
+    (чекпоинты на будущее бессмысленны — их сразу инвалидирует любая новая операция).
+    """
+    anchor = as_of if as_of == _month_end(as_of) else _prev_month_end(as_of)
+    return min(anchor, _prev_month_end(date.today()))
 
 
 @dataclass(frozen=True)
@@ -31,9 +115,181 @@ class CategoryTotalRow:
     total_cents: int
 
 
+@dataclass(frozen=True)
+class CategoryRollupRow:
+    category_id: int
+    parent_id: int | None
+    category_name: str
+    own_cents: int    # операции непосредственно в категории
+    total_cents: int  # вместе со всеми подкатегориями
+
+
+@dataclass(frozen=True)
+class BudgetEnvelopeRow:
+    category_id: int
+    month: date
+    budget_id: int | None   # None — на месяц бюджета нет
+    limit_cents: int
+    actual_cents: int
+    rollover: bool
+    available_cents: int    # лимит минус факт плюс перенос с прошлых месяцев
+
+    @property
+    def carried_cents(self) -> int:
+        return self.available_cents - (self.limit_cents - self.actual_cents)
+
+
+@dataclass(frozen=True)
+class MonthlyFlowRow:
+    account_id: int
+    category_id: int | None
+    tx_type: str
+    month: date
+    amount_cents: int  # со знаком для счёта (как в проводках)
+
+
+@dataclass(frozen=True)
+class CategoryComparisonRow:
+    category_id: int
+    category_name: str
+    current_cents: int
+    previous_cents: int  # прошлый месяц
+    year_ago_cents: int  # тот же месяц год назад
+
+    @property
+    def mom_delta_cents(self) -> int:
+        return self.current_cents - self.previous_cents
+
+    @property
+    def yoy_delta_cents(self) -> int:
+        return self.current_cents - self.year_ago_cents
+
+    @property
+    def mom_pct(self) -> float | None:
+        return _pct_change(self.current_cents, self.previous_cents)
+
+    @property
+    def yoy_pct(self) -> float | None:
+        return _pct_change(self.current_cents, self.year_ago_cents)
+
+
+@dataclass(frozen=True)
+class TimeseriesPoint:
+    bucket_start: date
+    group_id: int | None  # category_id / account_id при группировке, иначе None
+    income_cents: int
+    expense_cents: int
+    net_cents: int
+
+
+@dataclass(frozen=True)
+class StatementCursor:
+    """
+    Граница страницы выписки: следующая страница — проводки строго раньше
+    (occurred_at, tx_id). balance_cents — баланс по всем этим проводкам
+    (т.е. баланс сразу перед граничной строкой); None — посчитать по чекпоинтам.
+    """
+    occurred_at: date
+    tx_id: int
+    balance_cents: int | None = None
+
+
+@dataclass(frozen=True)
+class StatementRow:
+    tx_id: int
+    occurred_at: date
+    type: str
+    amount_cents: int        # со знаком: + приход, - расход
+    balance_cents: int       # остаток после операции
+    category_id: int | None
+    counterparty_id: int | None
+    note: str | None
+
+
+@dataclass(frozen=True)
+class StatementPage:
+    rows: list[StatementRow]
+    next_cursor: StatementCursor | None
+
+
 class ReportsRepo:
-    def __init__(self, session: Session):
+    def __init__(self, session: Session, read_only: bool = False):
+        """
+        read_only — сессия смотрит в зеркало/копию базы: ленивые чекпоинты
+        считаются, но не сохраняются.
+        """
         self.session = session
+        self.read_only = read_only
+
+    @staticmethod
+    def _ledger(
+        account_ids: list[int] | None = None,
+        after: date | None = None,
+        through: date | None = None,
+        before_key: tuple[date, int] | None = None,
+        details: bool = False,
+        newest_limit: int | None = None,
+        non_recurring: bool = False,
+    ):
+        """
+        Проводки по счетам (acc_id, occurred_at, id, amount_cents со знаком):
+        - income: +amount на account_id
+        - expense: -amount на account_id
+        - transfer: -amount с from_account_id, +amount на to_account_id
+
+        after — строго после даты, through — включительно, before_key —
+        строго раньше (occurred_at, id). Фильтры применяются в каждой ветке
+        UNION, чтобы работали индексы по (счёт, дата).
+        details=True добавляет type, category_id, note и counterparty_id (второй счёт перевода).
+        newest_limit — в каждой ветке только N самых новых проводок (обход индекса
+        по (счёт, дата) с конца вместо сортировки всего хвоста истории).
+        non_recurring — без операций, проведённых по повторяющимся правилам.
+        """
+        tx = transactions_source(after, through)
+
+        def branch(acc_col, amount, counterparty, *conds):
+            cols = [
+                acc_col.label("acc_id"),
+                tx.occurred_at.label("occurred_at"),
+                tx.id.label("tx_id"),
+                amount.label("amount_cents"),
+            ]
+            if details:
+                cols += [
+                    tx.type.label("type"),
+                    tx.category_id.label("category_id"),
+                    tx.note.label("note"),
+                    counterparty.label("counterparty_id"),
+                ]
+            q = select(*cols).where(acc_col.is_not(None), *conds)
+            if account_ids is not None:
+                q = q.where(acc_col.in_(account_ids))
+            if after is not None:
+                q = q.where(tx.occurred_at > after)
+            if through is not None:
+                q = q.where(tx.occurred_at <= through)
+            if before_key is not None:
+                q = q.where(tuple_(tx.occurred_at, tx.id) < tuple_(*before_key))
+            if non_recurring:
+                q = q.where(tx.recurring_rule_id.is_(None))
+            if newest_limit is not None:
+                q = q.order_by(tx.occurred_at.desc(), tx.id.desc()).limit(newest_limit)
+                # SQLite не допускает ORDER BY/LIMIT в ветке UNION без обёртки
+                q = select(q.subquery())
+            return q
+
+        base = branch(
+            tx.account_id,
+            case((tx.type == TransactionType.INCOME.value, tx.amount_cents), else_=-tx.amount_cents),
+            literal(None, type_=Integer),
+            tx.type.in_([TransactionType.INCOME.value, TransactionType.EXPENSE.value]),
+        )
+        out = branch(tx.from_account_id, -tx.amount_cents, tx.to_account_id, tx.type == TransactionType.TRANSFER.value)
+        inc = branch(tx.to_account_id, tx.amount_cents, tx.from_account_id, tx.type == TransactionType.TRANSFER.value)
+        return union_all(base, out, inc).subquery("ledger")
+
+    def account_ids(self) -> list[int]:
+        return list(self.session.execute(select(Account.id).order_by(Account.id)).scalars().all())
 
     def account_balances(self) -> list[AccountBalanceRow]:
         """
@@ -42,7 +298,7 @@ class ReportsRepo:
         - expense: -amount на account_id
         - transfer: -amount с from_account_id, +amount на to_account_id
         """
-        tx = Transaction
+        tx = transactions_source()
 
         # Вклад для "обычных" операций (income/expense) по account_id
         base_amount = case(
@@ -109,7 +365,7 @@ class ReportsRepo:
         ]
 
     def period_summary(self, start: date, end: date) -> PeriodSummary:
-        tx = Transaction
+        tx = transactions_source(start, end)
 
         income_sum = func.coalesce(
             func.sum(case((tx.type == TransactionType.INCOME.value, tx.amount_cents), else_=0)),
@@ -130,17 +386,35 @@ class ReportsRepo:
         expense = int(expense or 0)
         return PeriodSummary(income_cents=income, expense_cents=expense, net_cents=income - expense)
 
-    def top_expense_categories(self, start: date, end: date, limit: int = 10) -> list[CategoryTotalRow]:
-        tx = Transaction
-        stmt = (
-            select(
-                Category.id,
-                Category.name,
-                func.sum(tx.amount_cents).label("total_cents"),
+    def top_expense_categories(
+        self,
+        start: date,
+        end: date,
+        limit: int = 10,
+        rollup: bool = False,
+    ) -> list[CategoryTotalRow]:
+        """
+        Топ расходных категорий за период. rollup=True — суммы сворачиваются
+        до корневых категорий (вместе со всеми подкатегориями).
+        """
+        tx = transactions_source(start, end)
+        stmt = select(
+            Category.id,
+            Category.name,
+            func.sum(tx.amount_cents).label("total_cents"),
+        ).select_from(tx)
+
+        if rollup:
+            stmt = (
+                stmt.join(CategoryClosure, CategoryClosure.descendant_id == tx.category_id)
+                .join(Category, Category.id == CategoryClosure.ancestor_id)
+                .where(Category.parent_id.is_(None))
             )
-            .select_from(tx)
-            .join(Category, Category.id == tx.category_id)
-            .where(
+        else:
+            stmt = stmt.join(Category, Category.id == tx.category_id)
+
+        stmt = (
+            stmt.where(
                 tx.type == TransactionType.EXPENSE.value,
                 tx.occurred_at >= start,
                 tx.occurred_at <= end,
@@ -156,3 +430,557 @@ class ReportsRepo:
             CategoryTotalRow(category_id=r[0], category_name=r[1], total_cents=int(r[2] or 0))
             for r in rows
         ]
+
+    def category_rollup(
+        self,
+        start: date,
+        end: date,
+        tx_type: str = TransactionType.EXPENSE.value,
+    ) -> list[CategoryRollupRow]:
+        """
+        Суммы по всем уровням дерева категорий за период одним запросом:
+        каждая операция через category_closure засчитывается категории
+        и всем её предкам.
+        """
+        tx = transactions_source(start, end)
+        stmt = (
+            select(
+                Category.id,
+                Category.parent_id,
+                Category.name,
+                func.sum(case((CategoryClosure.depth == 0, tx.amount_cents), else_=0)),
+                func.sum(tx.amount_cents),
+            )
+            .select_from(tx)
+            .join(CategoryClosure, CategoryClosure.descendant_id == tx.category_id)
+            .join(Category, Category.id == CategoryClosure.ancestor_id)
+            .where(
+                tx.type == tx_type,
+                tx.occurred_at >= start,
+                tx.occurred_at <= end,
+            )
+            .group_by(Category.id, Category.parent_id, Category.name)
+            .order_by(func.sum(tx.amount_cents).desc())
+        )
+        return [
+            CategoryRollupRow(
+                category_id=r[0],
+                parent_id=r[1],
+                category_name=r[2],
+                own_cents=int(r[3] or 0),
+                total_cents=int(r[4] or 0),
+            )
+            for r in self.session.execute(stmt).all()
+        ]
+
+    def category_actuals(self, start: date, end: date, category_ids: list[int]) -> dict[int, int]:
+        """
+        Факт за период для бюджетов: по каждой категории — сумма по ней
+        и всем подкатегориям. Для расходных категорий считаются расходы,
+        для накоплений — переводы с этой категорией.
+        """
+        ids = sorted(set(category_ids))
+        if not ids:
+            return {}
+
+        tx = transactions_source(start, end)
+        stmt = (
+            select(CategoryClosure.ancestor_id, func.sum(tx.amount_cents))
+            .select_from(tx)
+            .join(CategoryClosure, CategoryClosure.descendant_id == tx.category_id)
+            .join(Category, Category.id == CategoryClosure.ancestor_id)
+            .where(
+                CategoryClosure.ancestor_id.in_(ids),
+                tx.occurred_at >= start,
+                tx.occurred_at <= end,
+                or_(
+                    and_(Category.kind == CategoryKind.EXPENSE.value, tx.type == TransactionType.EXPENSE.value),
+                    and_(Category.kind == CategoryKind.SAVINGS.value, tx.type == TransactionType.TRANSFER.value),
+                ),
+            )
+            .group_by(CategoryClosure.ancestor_id)
+        )
+        return {int(cat_id): int(total or 0) for cat_id, total in self.session.execute(stmt).all()}
+
+    def budget_envelopes(self, since: date, through: date) -> list[BudgetEnvelopeRow]:
+        """
+        Конверты бюджетов по месяцам [since, through] одним запросом.
+
+        Для каждой категории с бюджетами рекурсивный CTE строит непрерывный
+        ряд месяцев от её первого бюджета, к нему присоединяются лимиты и факт
+        (как в category_actuals). Доступно = накопленная оконная сумма
+        (лимит − факт) внутри цепочки: месяц с rollover передаёт остаток
+        (или перерасход) следующему, месяц без него (или без бюджета) цепочку
+        обрывает. История до since участвует в переносе, но не возвращается.
+        """
+        since = date(since.year, since.month, 1)
+        through = date(through.year, through.month, 1)
+        first_month = self.session.execute(
+            select(func.min(Budget.month_start)).where(Budget.month_start <= through)
+        ).scalar_one_or_none()
+        if first_month is None:
+            return []
+
+        firsts = (
+            select(Budget.category_id, func.min(Budget.month_start).label("month"))
+            .where(Budget.month_start <= through)
+            .group_by(Budget.category_id)
+            .cte("budget_firsts")
+        )
+        months = select(firsts.c.category_id, firsts.c.month).cte("budget_months", recursive=True)
+        months = months.union_all(
+            select(months.c.category_id, func.date(months.c.month, "+1 month"))
+            .where(months.c.month < through)
+        )
+
+        # сначала сворачиваем операции до (категория, тип, месяц), и только
+        # эти тысячи строк, а не сами операции, разворачиваются по предкам
+        tx = transactions_source(first_month, _month_end(through))
+        tx_month = _bucket_expr(tx.occurred_at, Granularity.MONTH)
+        monthly = (
+            select(
+                tx.category_id,
+                tx.type,
+                tx_month.label("month"),
+                func.sum(tx.amount_cents).label("total"),
+            )
+            .where(
+                tx.occurred_at >= first_month,
+                tx.occurred_at <= _month_end(through),
+                tx.type.in_([TransactionType.EXPENSE.value, TransactionType.TRANSFER.value]),
+            )
+            .group_by(tx.category_id, tx.type, tx_month)
+            .cte("budget_tx_months")
+        )
+        actuals = (
+            select(
+                CategoryClosure.ancestor_id.label("category_id"),
+                monthly.c.month,
+                func.sum(monthly.c.total).label("actual"),
+            )
+            .select_from(monthly)
+            .join(CategoryClosure, CategoryClosure.descendant_id == monthly.c.category_id)
+            .join(Category, Category.id == CategoryClosure.ancestor_id)
+            .where(
+                CategoryClosure.ancestor_id.in_(select(firsts.c.category_id)),
+                or_(
+                    and_(Category.kind == CategoryKind.EXPENSE.value, monthly.c.type == TransactionType.EXPENSE.value),
+                    and_(Category.kind == CategoryKind.SAVINGS.value, monthly.c.type == TransactionType.TRANSFER.value),
+                ),
+            )
+            .group_by(CategoryClosure.ancestor_id, monthly.c.month)
+            .cte("budget_actuals")
+        )
+
+        rollover = func.coalesce(Budget.rollover, False)
+        per_month = (
+            select(
+                months.c.category_id,
+                months.c.month,
+                Budget.id.label("budget_id"),
+                func.coalesce(Budget.limit_cents, 0).label("limit_cents"),
+                func.coalesce(actuals.c.actual, 0).label("actual_cents"),
+                rollover.label("rollover"),
+                # номер цепочки: сколько месяцев без переноса было раньше
+                func.coalesce(
+                    func.sum(case((rollover, 0), else_=1)).over(
+                        partition_by=months.c.category_id,
+                        order_by=months.c.month,
+                        rows=(None, -1),
+                    ),
+                    0,
+                ).label("chain"),
+            )
+            .select_from(months)
+            .outerjoin(
+                Budget,
+                and_(Budget.category_id == months.c.category_id, Budget.month_start == months.c.month),
+            )
+            .outerjoin(
+                actuals,
+                and_(actuals.c.category_id == months.c.category_id, actuals.c.month == months.c.month),
+            )
+            .subquery()
+        )
+        available = func.sum(per_month.c.limit_cents - per_month.c.actual_cents).over(
+            partition_by=(per_month.c.category_id, per_month.c.chain),
+            order_by=per_month.c.month,
+        )
+        # окно считается по всей истории, а фильтр по since — снаружи
+        envelopes = select(
+            per_month.c.category_id,
+            per_month.c.month,
+            per_month.c.budget_id,
+            per_month.c.limit_cents,
+            per_month.c.actual_cents,
+            per_month.c.rollover,
+            available.label("available_cents"),
+        ).subquery()
+        stmt = (
+            select(envelopes)
+            .where(envelopes.c.month >= since)
+            .order_by(envelopes.c.category_id, envelopes.c.month)
+        )
+        return [
+            BudgetEnvelopeRow(
+                category_id=int(r[0]),
+                month=date.fromisoformat(str(r[1])),
+                budget_id=r[2],
+                limit_cents=int(r[3]),
+                actual_cents=int(r[4]),
+                rollover=bool(r[5]),
+                available_cents=int(r[6]),
+            )
+            for r in self.session.execute(stmt).all()
+        ]
+
+    def monthly_flows(self, start: date, end: date, non_recurring: bool = False) -> list[MonthlyFlowRow]:
+        """
+        Помесячные обороты по (счёт, категория, тип) за [start, end] одним
+        GROUP BY по проводкам: у перевода две строки — списание и зачисление.
+        non_recurring — без операций повторяющихся правил (их прогноз
+        строится по расписанию, а не по истории).
+        """
+        ledger = self._ledger(
+            after=start - timedelta(days=1), through=end, details=True, non_recurring=non_recurring
+        )
+        month = _bucket_expr(ledger.c.occurred_at, Granularity.MONTH)
+        stmt = (
+            select(ledger.c.acc_id, ledger.c.category_id, ledger.c.type, month, func.sum(ledger.c.amount_cents))
+            .group_by(ledger.c.acc_id, ledger.c.category_id, ledger.c.type, month)
+        )
+        return [
+            MonthlyFlowRow(
+                account_id=int(r[0]),
+                category_id=r[1],
+                tx_type=r[2],
+                month=date.fromisoformat(r[3]),
+                amount_cents=int(r[4] or 0),
+            )
+            for r in self.session.execute(stmt).all()
+        ]
+
+    def category_comparison(
+        self,
+        month: date,
+        through: date | None = None,
+        tx_type: str = TransactionType.EXPENSE.value,
+    ) -> list[CategoryComparisonRow]:
+        """
+        Суммы по категориям за месяц, прошлый месяц и тот же месяц год назад —
+        один проход по операциям с условной агрегацией по трём окнам.
+        through — сравнивать «день в день»: все три окна обрезаются до того же
+        числа месяца (для текущего, ещё не закончившегося месяца).
+        """
+        cur_start = _shift_months(month, 0)
+        through_day = through.day if through is not None else None
+        windows = [
+            _comparison_window(cur_start, through_day),
+            _comparison_window(_shift_months(cur_start, -1), through_day),
+            _comparison_window(_shift_months(cur_start, -12), through_day),
+        ]
+
+        tx = transactions_source(windows[2][0], windows[0][1])
+        in_window = [and_(tx.occurred_at >= a, tx.occurred_at <= b) for a, b in windows]
+        sums = [func.sum(case((cond, tx.amount_cents), else_=0)) for cond in in_window]
+
+        stmt = (
+            select(Category.id, Category.name, *sums)
+            .select_from(tx)
+            .join(Category, Category.id == tx.category_id)
+            .where(tx.type == tx_type, or_(*in_window))
+            .group_by(Category.id, Category.name)
+            .order_by(sums[0].desc(), Category.name)
+        )
+        return [
+            CategoryComparisonRow(
+                category_id=r[0],
+                category_name=r[1],
+                current_cents=int(r[2] or 0),
+                previous_cents=int(r[3] or 0),
+                year_ago_cents=int(r[4] or 0),
+            )
+            for r in self.session.execute(stmt).all()
+        ]
+
+    def balance_as_of(self, account_ids: list[int], as_of: date) -> list[AccountBalanceRow]:
+        """
+        Баланс счетов на конец дня as_of = чекпоинт на конец месяца + операции после него.
+        Недостающие чекпоинты создаются лениво (за один сгруппированный запрос).
+        """
+        ids = sorted(set(account_ids))
+        if not ids:
+            return []
+
+        anchor = _checkpoint_anchor(as_of)
+        balances = self._ensure_checkpoints(ids, anchor)
+
+        ledger = self._ledger(ids, after=anchor, through=as_of)
+        delta_stmt = select(ledger.c.acc_id, func.sum(ledger.c.amount_cents)).group_by(ledger.c.acc_id)
+        for acc_id, delta in self.session.execute(delta_stmt).all():
+            balances[acc_id] = balances.get(acc_id, 0) + int(delta or 0)
+
+        names = self.session.execute(
+            select(Account.id, Account.name).where(Account.id.in_(ids)).order_by(Account.name)
+        ).all()
+        return [
+            AccountBalanceRow(account_id=r[0], account_name=r[1], balance_cents=balances.get(r[0], 0))
+            for r in names
+        ]
+
+    def _ensure_checkpoints(self, account_ids: list[int], anchor: date) -> dict[int, int]:
+        """
+        Возвращает {account_id: баланс на anchor}, достраивая цепочку месячных
+        чекпоинтов от последнего уцелевшего до anchor.
+        """
+        # Поколение читается до подсчёта: если к сохранению оно изменится,
+        # посчитанные балансы могли не увидеть запись задним числом.
+        generation = current_generation(self.session)
+        cp = BalanceCheckpoint
+        rows = self.session.execute(
+            select(cp.account_id, cp.balance_cents).where(cp.month_end == anchor, cp.account_id.in_(account_ids))
+        ).all()
+        result = {r[0]: int(r[1]) for r in rows}
+        missing = [a for a in account_ids if a not in result]
+        if not missing:
+            return result
+
+        # Последний действительный чекпоинт до anchor (триггеры удаляют только "хвост",
+        # так что всё, что раньше него, тоже действительно).
+        last_q = (
+            select(cp.account_id, func.max(cp.month_end).label("month_end"))
+            .where(cp.account_id.in_(missing), cp.month_end < anchor)
+            .group_by(cp.account_id)
+            .subquery()
+        )
+        base_rows = self.session.execute(
+            select(cp.account_id, cp.month_end, cp.balance_cents).join(
+                last_q, (last_q.c.account_id == cp.account_id) & (last_q.c.month_end == cp.month_end)
+            )
+        ).all()
+        bases = {r[0]: (r[1], int(r[2])) for r in base_rows}
+
+        # Помесячные обороты после самого раннего из базовых чекпоинтов
+        after = min((b[0] for b in bases.values()), default=None) if len(bases) == len(missing) else None
+        ledger = self._ledger(missing, after=after, through=anchor)
+        month_key = func.strftime("%Y-%m", ledger.c.occurred_at)
+        turnover: dict[int, dict[str, int]] = {}
+        for acc_id, ym, total in self.session.execute(
+            select(ledger.c.acc_id, month_key, func.sum(ledger.c.amount_cents)).group_by(ledger.c.acc_id, month_key)
+        ).all():
+            turnover.setdefault(acc_id, {})[ym] = int(total or 0)
+
+        new_rows = []
+        for acc_id in missing:
+            months = turnover.get(acc_id, {})
+            if acc_id in bases:
+                month, balance = bases[acc_id]
+                month = _month_end(month + timedelta(days=1))
+            else:
+                balance = 0
+                first = min(months, default=None)
+                month = _month_end(date.fromisoformat(f"{first}-01")) if first else anchor
+
+            while month <= anchor:
+                balance += months.get(month.strftime("%Y-%m"), 0)
+                new_rows.append({"account_id": acc_id, "month_end": month, "balance_cents": balance})
+                month = _month_end(month + timedelta(days=1))
+            result[acc_id] = balance
+
+        if new_rows and not self.read_only:
+            self._save_checkpoints(new_rows, generation)
+        return result
+
+    def _save_checkpoints(self, rows: list[dict], generation: int) -> None:
+        """
+        Сохраняет чекпоинты своим соединением и в своей транзакции, сессию
+        вызывающего не коммитит. Ничего не сохраняется, если балансы могли
+        разойтись с базой: в сессии есть незакоммиченная запись или после
+        подсчёта (поколение generation) кто-то успел закоммитить операцию —
+        её триггер уже отработал и эти чекпоинты не удалит.
+        Чекпоинты — только кэш, их достроит следующий вызов.
+        """
+        dbapi_conn = self.session.connection().connection.dbapi_connection
+        if getattr(dbapi_conn, "in_transaction", False):
+            return
+        with self.session.get_bind().connect() as conn:
+            trans = conn.begin()
+            conn.execute(sqlite_insert(BalanceCheckpoint).on_conflict_do_nothing(), rows)
+            # После вставки транзакция держит блокировку записи: поколение, прочитанное
+            # теперь, до коммита не изменится, а более поздняя запись удалит чекпоинты сама.
+            if current_generation(conn) == generation:
+                trans.commit()
+            else:
+                trans.rollback()
+
+    def timeseries(
+        self,
+        start: date,
+        end: date,
+        granularity: str = Granularity.MONTH.value,
+        group_by: str | None = None,
+        tx_type: str | None = None,
+        account_id: int | None = None,
+        category_id: int | None = None,
+    ) -> list[TimeseriesPoint]:
+        """
+        Доходы/расходы по корзинам (day/week/month/quarter/year) за [start, end]
+        одним GROUP BY. group_by: None / "category" / "account".
+        Пустые корзины заполняются нулями; фильтры — как у TransactionsRepo.list_filtered.
+        Порядок: по группе, затем по времени.
+        """
+        granularity = Granularity(granularity)
+        tx = transactions_source(start, end)
+
+        group_cols = {None: None, "category": tx.category_id, "account": tx.account_id}
+        if group_by not in group_cols:
+            raise ValueError(f"Неизвестная группировка: {group_by}")
+        group_col = group_cols[group_by]
+
+        bucket = _bucket_expr(tx.occurred_at, granularity).label("bucket")
+        income_sum = func.sum(case((tx.type == TransactionType.INCOME.value, tx.amount_cents), else_=0))
+        expense_sum = func.sum(case((tx.type == TransactionType.EXPENSE.value, tx.amount_cents), else_=0))
+
+        cols = [bucket, income_sum, expense_sum]
+        if group_col is not None:
+            cols.append(group_col.label("group_id"))
+        stmt = select(*cols).where(tx.type.in_([TransactionType.INCOME.value, TransactionType.EXPENSE.value]))
+        stmt = apply_tx_filters(stmt, tx, start, end, tx_type, account_id, category_id)
+        stmt = stmt.group_by(bucket) if group_col is None else stmt.group_by(group_col, bucket)
+
+        found: dict[tuple[int | None, str], tuple[int, int]] = {}
+        groups: set[int | None] = set() if group_col is not None else {None}
+        for row in self.session.execute(stmt).all():
+            gid = row[3] if group_col is not None else None
+            groups.add(gid)
+            found[(gid, row[0])] = (int(row[1] or 0), int(row[2] or 0))
+
+        buckets = []
+        b = _bucket_floor(start, granularity)
+        while b <= end:
+            buckets.append(b)
+            b = _bucket_next(b, granularity)
+
+        points = []
+        for gid in sorted(groups, key=lambda g: (g is None, g or 0)):
+            for b in buckets:
+                income, expense = found.get((gid, b.isoformat()), (0, 0))
+                points.append(TimeseriesPoint(b, gid, income, expense, income - expense))
+        return points
+
+    def first_transaction_date(self) -> date | None:
+        """Дата самой ранней операции (с учётом архивов)."""
+        tx = transactions_source()
+        return self.session.execute(select(func.min(tx.occurred_at))).scalar()
+
+    def daily_totals(
+        self,
+        year: int,
+        tx_type: str = TransactionType.EXPENSE.value,
+        category_id: int | None = None,
+    ) -> list[int]:
+        """
+        Суммы по дням года одним GROUP BY: плотный список на 365/366 элементов,
+        индекс — номер дня от 1 января. category_id учитывает и подкатегории.
+        """
+        start, end = date(year, 1, 1), date(year, 12, 31)
+        tx = transactions_source(start, end)
+        stmt = (
+            select(tx.occurred_at, func.sum(tx.amount_cents))
+            .where(tx.type == tx_type, tx.occurred_at >= start, tx.occurred_at <= end)
+            .group_by(tx.occurred_at)
+        )
+        if category_id is not None:
+            stmt = stmt.join(CategoryClosure, CategoryClosure.descendant_id == tx.category_id).where(
+                CategoryClosure.ancestor_id == category_id
+            )
+
+        totals = [0] * ((end - start).days + 1)
+        for day, total in self.session.execute(stmt).all():
+            totals[(day - start).days] = int(total or 0)
+        return totals
+
+    def statement_cursor_at(self, account_id: int, day: date) -> StatementCursor:
+        """Курсор, с которого выписка начинается с конца дня day (включительно)."""
+        balance = self.balance_as_of([account_id], day)
+        return StatementCursor(
+            occurred_at=day + timedelta(days=1),
+            tx_id=0,
+            balance_cents=balance[0].balance_cents if balance else 0,
+        )
+
+    def account_statement(
+        self,
+        account_id: int,
+        cursor: StatementCursor | None = None,
+        page_size: int = 100,
+    ) -> StatementPage:
+        """
+        Выписка по счёту от новых к старым с колонкой остатка (keyset-пагинация).
+
+        Страница засевается балансом на своей границе (из курсора или по
+        чекпоинтам), а остаток внутри страницы считает окно
+        SUM() OVER (ORDER BY occurred_at, id) — поэтому страница глубоко в истории
+        стоит столько же, сколько первая.
+        """
+        if cursor is None:
+            seed = self.balance_as_of([account_id], date.max)
+            seed_balance = seed[0].balance_cents if seed else 0
+            before_key = None
+        else:
+            before_key = (cursor.occurred_at, cursor.tx_id)
+            seed_balance = cursor.balance_cents
+            if seed_balance is None:
+                seed_balance = self._balance_before(account_id, before_key)
+
+        ledger = self._ledger([account_id], before_key=before_key, details=True, newest_limit=page_size)
+        page = (
+            select(ledger)
+            .order_by(ledger.c.occurred_at.desc(), ledger.c.tx_id.desc())
+            .limit(page_size)
+            .subquery("page")
+        )
+        running = (
+            seed_balance
+            - func.sum(page.c.amount_cents).over()
+            + func.sum(page.c.amount_cents).over(order_by=(page.c.occurred_at, page.c.tx_id))
+        )
+        stmt = select(
+            page.c.tx_id,
+            page.c.occurred_at,
+            page.c.type,
+            page.c.amount_cents,
+            running.label("balance_cents"),
+            page.c.category_id,
+            page.c.counterparty_id,
+            page.c.note,
+        ).order_by(page.c.occurred_at.desc(), page.c.tx_id.desc())
+
+        rows = [
+            StatementRow(
+                tx_id=r[0],
+                occurred_at=r[1],
+                type=r[2],
+                amount_cents=int(r[3]),
+                balance_cents=int(r[4]),
+                category_id=r[5],
+                counterparty_id=r[6],
+                note=r[7],
+            )
+            for r in self.session.execute(stmt).all()
+        ]
+
+        next_cursor = None
+        if len(rows) == page_size:
+            last = rows[-1]
+            next_cursor = StatementCursor(last.occurred_at, last.tx_id, last.balance_cents - last.amount_cents)
+        return StatementPage(rows=rows, next_cursor=next_cursor)
+
+    def _balance_before(self, account_id: int, key: tuple[date, int]) -> int:
+        """Баланс по проводкам строго раньше key: чекпоинт на конец прошлого дня + хвост этого дня."""
+        day, tx_id = key
+        prev = self.balance_as_of([account_id], day - timedelta(days=1))
+        balance = prev[0].balance_cents if prev else 0
+        ledger = self._ledger([account_id], after=day - timedelta(days=1), before_key=key)
+        tail = self.session.execute(select(func.coalesce(func.sum(ledger.c.amount_cents), 0))).scalar()
+        return balance + int(tail or 0)
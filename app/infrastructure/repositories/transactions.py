@@ -1,10 +1,84 @@
 from __future__ import annotations
 
-from datetime import date
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Iterable
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, func, or_, and_, insert, update, delete, case
+
+from app.infrastructure.db.archive import transactions_source
+from app.infrastructure.db.functions import tx_fingerprint
+from app.infrastructure.db.models import Transaction, Account, Category, BalanceCheckpoint
+from app.domain.enums import TransactionType
+
+# сколько значений подставляем в один IN (лимит параметров SQLite — 999 в старых сборках)
+IN_CHUNK = 500
+
+
+@dataclass(frozen=True)
+class FilteredTotals:
+    count: int
+    income_cents: int
+    expense_cents: int
+    transfer_cents: int
+
+
+def apply_tx_filters(
+    stmt,
+    tx,
+    start: date | None = None,
+    end: date | None = None,
+    tx_type: str | None = None,
+    account_id: int | None = None,
+    category_id: int | None = None,
+):
+    """
+    Общие фильтры выборок операций (см. TransactionsRepo.list_filtered).
+    tx — Transaction или alias над архивами.
+    """
+    if start is not None:
+        stmt = stmt.where(tx.occurred_at >= start)
+    if end is not None:
+        stmt = stmt.where(tx.occurred_at <= end)
+    if tx_type:
+        stmt = stmt.where(tx.type == tx_type)
 
-from app.infrastructure.db.models import Transaction
+    if category_id is not None:
+        stmt = stmt.where(tx.category_id == category_id)
+
+    if account_id is not None:
+        stmt = stmt.where(
+            (tx.account_id == account_id)
+            | (tx.from_account_id == account_id)
+            | (tx.to_account_id == account_id)
+        )
+    return stmt
+
+
+def apply_tx_search(stmt, tx, needle: str):
+    """
+    Поиск подстроки без учёта регистра по типу, заметке, названию категории
+    и счетов. needle — уже в нижнем регистре; py_lower регистрируется
+    в каждом соединении (см. db/functions.py).
+    """
+    def has(col):
+        return func.instr(func.py_lower(col), needle) > 0
+
+    acc_ids = select(Account.id).where(has(Account.name))
+    cat_ids = select(Category.id).where(has(Category.name))
+    return stmt.where(
+        or_(
+            has(tx.type),
+            has(tx.note),
+            tx.category_id.in_(cat_ids),
+            tx.account_id.in_(acc_ids),
+            tx.from_account_id.in_(acc_ids),
+            tx.to_account_id.in_(acc_ids),
+        )
+    )
 
 
 class TransactionsRepo:
@@ -18,6 +92,210 @@ class TransactionsRepo:
     def get_by_id(self, tx_id: int) -> Transaction | None:
         return self.session.get(Transaction, tx_id)
 
+    def bulk_add(self, rows: list[dict], skip_conflicts: bool = False) -> int:
+        """
+        Вставка пачки одним executemany, без объектов ORM. rows — значения колонок
+        Transaction; отпечаток считается здесь (ORM-события bulk-вставка не вызывает).
+        skip_conflicts — строки, нарушающие уникальность (вхождение правила
+        на ту же дату), молча пропускаются: INSERT ... ON CONFLICT DO NOTHING.
+        Возвращает число вставленных строк. Коммит — за вызывающим.
+        """
+        if not rows:
+            return 0
+        for r in rows:
+            r["fingerprint"] = tx_fingerprint(
+                r["type"], r.get("account_id"), r.get("from_account_id"), r["occurred_at"], r["amount_cents"], r.get("note")
+            )
+        if not skip_conflicts:
+            self.session.execute(insert(Transaction), rows)
+            return len(rows)
+        return self.session.execute(sqlite_insert(Transaction.__table__).on_conflict_do_nothing(), rows).rowcount
+
+    def categorization_facts(self, tx_ids: Iterable[int]) -> list[tuple[int, str, int | None, int, str | None, int | None]]:
+        """(id, тип, счёт, сумма, заметка, категория) для перекатегоризации — без объектов ORM."""
+        ids = list(tx_ids)
+        out = []
+        for i in range(0, len(ids), IN_CHUNK):
+            stmt = select(
+                Transaction.id,
+                Transaction.type,
+                Transaction.account_id,
+                Transaction.amount_cents,
+                Transaction.note,
+                Transaction.category_id,
+            ).where(Transaction.id.in_(ids[i:i + IN_CHUNK]))
+            out.extend(tuple(r) for r in self.session.execute(stmt).all())
+        return out
+
+    def set_categories(self, category_by_id: dict[int, int]) -> int:
+        """Массовая смена категорий одним executemany (UPDATE по первичному ключу)."""
+        if not category_by_id:
+            return 0
+        self.session.execute(
+            update(Transaction),
+            [{"id": tx_id, "category_id": cat_id} for tx_id, cat_id in category_by_id.items()],
+        )
+        return len(category_by_id)
+
+    def account_movements(
+        self, account_id: int, start: date, end: date
+    ) -> list[tuple[int, date, int, str | None, datetime | None]]:
+        """
+        Движения по счёту за период для сверки: (id, дата, сумма со знаком
+        для этого счёта, заметка, reconciled_at). Архивы не учитываются.
+        """
+        tx = Transaction
+        signed = case(
+            (tx.to_account_id == account_id, tx.amount_cents),
+            (tx.type == TransactionType.INCOME.value, tx.amount_cents),
+            else_=-tx.amount_cents,
+        )
+        stmt = (
+            select(tx.id, tx.occurred_at, signed, tx.note, tx.reconciled_at)
+            .where(tx.occurred_at >= start, tx.occurred_at <= end)
+            .where((tx.account_id == account_id) | (tx.from_account_id == account_id) | (tx.to_account_id == account_id))
+            .order_by(tx.occurred_at, tx.id)
+        )
+        return [tuple(r) for r in self.session.execute(stmt).all()]
+
+    def mark_reconciled(self, tx_ids: Iterable[int], at: datetime | None) -> int:
+        """Ставит (или снимает, at=None) отметку сверки; по IN_CHUNK id на запрос."""
+        ids = list(tx_ids)
+        for i in range(0, len(ids), IN_CHUNK):
+            self.session.execute(
+                update(Transaction).where(Transaction.id.in_(ids[i:i + IN_CHUNK])).values(reconciled_at=at)
+            )
+        return len(ids)
+
+    def _invalidate_checkpoints(self, ids: list[int], shift_days: int = 0, target_account_id: int | None = None) -> None:
+        """
+        Сбрасывает чекпоинты балансов, которые заденет массовая правка ids, одним DELETE
+        заранее — построчные триггеры после этого находят пустой диапазон.
+        shift_days < 0 расширяет диапазон назад; target_account_id — счёт, куда переносим.
+        """
+        since: dict[int, date] = {}
+        for i in range(0, len(ids), IN_CHUNK):
+            stmt = select(
+                Transaction.account_id, Transaction.from_account_id, Transaction.to_account_id, Transaction.occurred_at
+            ).where(Transaction.id.in_(ids[i:i + IN_CHUNK]))
+            for *acc_ids, day in self.session.execute(stmt):
+                for acc_id in acc_ids:
+                    if acc_id is not None and (acc_id not in since or day < since[acc_id]):
+                        since[acc_id] = day
+        if not since:
+            return
+        shift = timedelta(days=min(shift_days, 0))
+        if target_account_id is not None:
+            since[target_account_id] = min(since.values())
+        bc = BalanceCheckpoint
+        self.session.execute(
+            delete(bc).where(or_(*(and_(bc.account_id == a, bc.month_end >= d + shift) for a, d in since.items())))
+        )
+
+    def bulk_set_category(self, tx_ids: Iterable[int], category_id: int, tx_type: str) -> int:
+        """Категория для операций типа tx_type из tx_ids (прочие не трогаются). Коммит — за вызывающим."""
+        ids = list(tx_ids)
+        n = 0
+        for i in range(0, len(ids), IN_CHUNK):
+            n += self.session.execute(
+                update(Transaction)
+                .where(Transaction.id.in_(ids[i:i + IN_CHUNK]), Transaction.type == tx_type)
+                .values(category_id=category_id)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+        return n
+
+    def bulk_move_to_account(self, tx_ids: Iterable[int], account_id: int) -> int:
+        """
+        Перенос на счёт: у расходов и доходов меняется счёт, у переводов — счёт-источник
+        (кроме переводов на сам этот счёт). Отпечаток пересчитывается в том же UPDATE
+        функцией tx_fingerprint, отметка сверки снимается. Коммит — за вызывающим.
+        """
+        ids = list(tx_ids)
+        self._invalidate_checkpoints(ids, target_account_id=account_id)
+        tx = Transaction
+        is_transfer = tx.type == TransactionType.TRANSFER.value
+        n = 0
+        for i in range(0, len(ids), IN_CHUNK):
+            n += self.session.execute(
+                update(tx)
+                .where(tx.id.in_(ids[i:i + IN_CHUNK]), or_(tx.to_account_id.is_(None), tx.to_account_id != account_id))
+                .values(
+                    account_id=case((is_transfer, tx.account_id), else_=account_id),
+                    from_account_id=case((is_transfer, account_id), else_=tx.from_account_id),
+                    fingerprint=func.tx_fingerprint(tx.type, account_id, None, tx.occurred_at, tx.amount_cents, tx.note),
+                    reconciled_at=None,
+                )
+                .execution_options(synchronize_session=False)
+            ).rowcount
+        return n
+
+    def bulk_shift_dates(self, tx_ids: Iterable[int], days: int) -> int:
+        """
+        Сдвиг дат на days дней одним UPDATE на пачку; отпечаток — по новой дате, сверка снимается.
+        Сдвинутые вхождения повторяющихся операций отвязываются от правила (иначе
+        сдвиг мог бы наложиться на соседнее вхождение того же правила).
+        """
+        ids = list(tx_ids)
+        self._invalidate_checkpoints(ids, shift_days=days)
+        tx = Transaction
+        new_day = func.date(tx.occurred_at, f"{days:+d} days")
+        n = 0
+        for i in range(0, len(ids), IN_CHUNK):
+            n += self.session.execute(
+                update(tx)
+                .where(tx.id.in_(ids[i:i + IN_CHUNK]))
+                .values(
+                    occurred_at=new_day,
+                    fingerprint=func.tx_fingerprint(
+                        tx.type, tx.account_id, tx.from_account_id, new_day, tx.amount_cents, tx.note
+                    ),
+                    reconciled_at=None,
+                    recurring_rule_id=None,
+                )
+                .execution_options(synchronize_session=False)
+            ).rowcount
+        return n
+
+    def bulk_delete(self, tx_ids: Iterable[int]) -> int:
+        """DELETE ... WHERE id IN (...) по IN_CHUNK id. Коммит — за вызывающим."""
+        ids = list(tx_ids)
+        self._invalidate_checkpoints(ids)
+        n = 0
+        for i in range(0, len(ids), IN_CHUNK):
+            n += self.session.execute(
+                delete(Transaction)
+                .where(Transaction.id.in_(ids[i:i + IN_CHUNK]))
+                .execution_options(synchronize_session=False)
+            ).rowcount
+        return n
+
+    def ids_by_fingerprint(
+        self,
+        fingerprints: Iterable[str],
+        start: date | None = None,
+        end: date | None = None,
+    ) -> dict[str, list[int]]:
+        """
+        Существующие операции с данными отпечатками: fingerprint → [id].
+        Один запрос на IN_CHUNK отпечатков (по индексам ix_transactions_fingerprint).
+        start/end — период дат отпечатков: архивы закрытых лет, которые он
+        задевает, проверяются вместе с основной таблицей.
+        """
+        tx = transactions_source(start, end)
+        fps = list(set(fingerprints))
+        found: dict[str, list[int]] = defaultdict(list)
+        for i in range(0, len(fps), IN_CHUNK):
+            chunk = fps[i:i + IN_CHUNK]
+            stmt = (
+                select(tx.fingerprint, tx.id)
+                .where(tx.fingerprint.in_(chunk))
+                .order_by(tx.id)
+            )
+            for fp, tx_id in self.session.execute(stmt):
+                found[fp].append(tx_id)
+        return dict(found)
+
     def delete(self, tx_id: int) -> bool:
         tx = self.get_by_id(tx_id)
         if not tx:
@@ -41,30 +319,51 @@ class TransactionsRepo:
         account_id: int | None = None,
         category_id: int | None = None,
         limit: int = 500,
+        search: str | None = None,
     ) -> list[Transaction]:
         """
         account_id:
           - для income/expense фильтрует по Transaction.account_id
           - для transfer фильтрует по from_account_id OR to_account_id
-        """
-        stmt = select(Transaction)
 
-        if start is not None:
-            stmt = stmt.where(Transaction.occurred_at >= start)
-        if end is not None:
-            stmt = stmt.where(Transaction.occurred_at <= end)
-        if tx_type:
-            stmt = stmt.where(Transaction.type == tx_type)
+        search — подстрока (без учёта регистра) в типе, заметке, категории или счетах.
 
-        if category_id is not None:
-            stmt = stmt.where(Transaction.category_id == category_id)
+        Если период задевает архивные годы — они подмешиваются через UNION ALL
+        (такие объекты только для чтения).
+        """
+        tx = transactions_source(start, end)
+        stmt = apply_tx_filters(select(tx), tx, start, end, tx_type, account_id, category_id)
+        if search:
+            stmt = apply_tx_search(stmt, tx, search.lower())
+        stmt = stmt.order_by(desc(tx.occurred_at), desc(tx.id)).limit(limit)
+        return list(self.session.execute(stmt).scalars().all())
 
-        if account_id is not None:
-            stmt = stmt.where(
-                (Transaction.account_id == account_id)
-                | (Transaction.from_account_id == account_id)
-                | (Transaction.to_account_id == account_id)
-            )
+    def filtered_totals(
+        self,
+        start: date | None = None,
+        end: date | None = None,
+        tx_type: str | None = None,
+        account_id: int | None = None,
+        category_id: int | None = None,
+        search: str | None = None,
+    ) -> FilteredTotals:
+        """
+        Число операций и суммы по типам для тех же фильтров, что у list_filtered,
+        но без лимита — одним агрегирующим запросом.
+        """
+        tx = transactions_source(start, end)
 
-        stmt = stmt.order_by(desc(Transaction.occurred_at), desc(Transaction.id)).limit(limit)
-        return list(self.session.execute(stmt).scalars().all())
+        def total(tx_type_: TransactionType):
+            return func.coalesce(func.sum(case((tx.type == tx_type_.value, tx.amount_cents), else_=0)), 0)
+
+        stmt = select(
+            func.count(),
+            total(TransactionType.INCOME),
+            total(TransactionType.EXPENSE),
+            total(TransactionType.TRANSFER),
+        ).select_from(tx)
+        stmt = apply_tx_filters(stmt, tx, start, end, tx_type, account_id, category_id)
+        if search:
+            stmt = apply_tx_search(stmt, tx, search.lower())
+        count, income, expense, transfer = self.session.execute(stmt).one()
+        return FilteredTotals(int(count), int(income), int(expense), int(transfer))
@@ -1,10 +1,23 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import os
+from dataclasses import dataclass, field
 
 from PySide6.QtCore import QObject, Signal
 
-from app.infrastructure.db.session import SessionLocal
+from app.application.alerts import BudgetAlertEngine
+from app.application.cache import GenerationCache
+from app.application.services.startup_cache import (
+    ReferenceData,
+    StartupCache,
+    load_reference_data,
+    read_startup_cache,
+    startup_cache_path,
+    write_startup_cache,
+)
+from app.infrastructure.db.generation import current_generation
+from app.infrastructure.db.mirror import AnalyticsMirror
+from app.infrastructure.db.session import SessionLocal, get_database_path
 from app.infrastructure.repositories.reports import ReportsRepo
 
 
@@ -12,17 +25,93 @@ class AppSignals(QObject):
     """
     Глобальные сигналы приложения.
     ui_data_changed — когда изменились данные (операции/категории/счета и т.п.)
+    reference_data_changed — когда обновились справочники в ctx.reference
+    budget_alert(BudgetAlert) — категория перешла порог месячного бюджета
     """
     ui_data_changed = Signal()
+    # справочники счетов/категорий обновлены (например, после фоновой проверки при старте)
+    reference_data_changed = Signal()
+    # испускается из потока, закоммитившего операцию; доставка в UI — очередью Qt
+    budget_alert = Signal(object)
 
 
 @dataclass
 class AppContext:
+    # Отчёты читаются из копии базы в памяти (BUDGET_ANALYTICS_MIRROR=1)
+    analytics_mirror: bool = field(default_factory=lambda: os.getenv("BUDGET_ANALYTICS_MIRROR") == "1")
+
     def __post_init__(self):
         self.signals = AppSignals()
 
+        db_path = get_database_path()
+        self.mirror = AnalyticsMirror(db_path) if self.analytics_mirror and db_path else None
+        # кэш отчётов по поколению записи (общий для всех экранов)
+        self.report_cache = GenerationCache()
+        # суммы бюджетов текущего месяца в памяти: пороги проверяются на каждой записи
+        self.budget_alerts = BudgetAlertEngine(self.open_session, on_alert=self.signals.budget_alert.emit)
+        self.budget_alerts.install(SessionLocal)
+
+        # кэш быстрого старта: из него экраны рисуются до первых запросов
+        self.startup_cache_path = startup_cache_path(db_path) if db_path else None
+        self.startup: StartupCache | None = (
+            read_startup_cache(self.startup_cache_path) if self.startup_cache_path else None
+        )
+        self.reference: ReferenceData | None = self.startup.reference if self.startup else None
+        self.last_dashboard = self.startup.dashboard if self.startup else None
+        # после изменений в этом сеансе справочники сверяются с базой даже при allow_stale
+        self._reference_trusted = self.reference is not None
+        self.signals.ui_data_changed.connect(self._on_data_changed)
+
+    def _on_data_changed(self):
+        self._reference_trusted = False
+
     def open_session(self):
         return SessionLocal()
 
+    def open_reports_session(self):
+        """
+        Сессия для отчётов: зеркало в памяти (если включено и актуализировано
+        по поколению записи) или обычная сессия к файлу.
+        """
+        if self.mirror is None:
+            return self.open_session()
+        with self.open_session() as session:
+            generation = current_generation(session)
+        return self.mirror.open_session(generation)
+
     def reports_repo(self, session):
-        return ReportsRepo(session)
+        return ReportsRepo(session, read_only=session.info.get("mirror", False))
+
+    def reference_data(self, allow_stale: bool = False) -> ReferenceData:
+        """
+        Справочники счетов и категорий. allow_stale=True — отдать то, что есть
+        (в т.ч. из кэша старта), без обращения к базе, если в этом сеансе
+        данные не менялись; иначе сверить поколение и при надобности перечитать.
+        """
+        if allow_stale and self._reference_trusted and self.reference is not None:
+            return self.reference
+        with self.open_session() as session:
+            if self.reference is None or self.reference.generation != current_generation(session):
+                self.reference = load_reference_data(session)
+        self._reference_trusted = True
+        return self.reference
+
+    def fetch_reference_if_changed(self, generation: int | None) -> ReferenceData | None:
+        """Для фоновой проверки: новые справочники или None, если поколение то же."""
+        with self.open_session() as session:
+            if generation is not None and generation == current_generation(session):
+                return None
+            return load_reference_data(session)
+
+    def set_reference(self, reference: ReferenceData) -> None:
+        self.reference = reference
+        self.signals.reference_data_changed.emit()
+
+    def save_startup_cache(self) -> None:
+        if self.startup_cache_path is None:
+            return
+        try:
+            write_startup_cache(self.startup_cache_path, self.last_dashboard, self.reference)
+        except OSError:
+            # кэш старта — оптимизация, без него приложение просто стартует медленнее
+            pass
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from PySide6.QtCore import QThreadPool
 from PySide6.QtWidgets import (
     QMainWindow,
     QWidget,
@@ -11,6 +12,12 @@ from PySide6.QtWidgets import (
 )
 
 from app.ui.app_context import AppContext
+from app.application.alerts import BudgetAlert
+from app.application.money import format_rub
+from app.application.services.recurring import materialize_due
+from app.infrastructure.repositories.recurring import RecurringRulesRepo
+from app.infrastructure.repositories.transactions import TransactionsRepo
+from app.ui.workers import Worker
 from app.ui.views.dashboard import DashboardView
 
 # Заглушки/остальные экраны
@@ -99,3 +106,51 @@ class MainWindow(QMainWindow):
         self.btn_budgets.clicked.connect(lambda: self.stack.setCurrentWidget(self.view_budgets))
         self.btn_goals.clicked.connect(lambda: self.stack.setCurrentWidget(self.view_goals))
         self.btn_settings.clicked.connect(lambda: self.stack.setCurrentWidget(self.view_settings))
+
+        # справочники из кэша старта сверяем с базой в фоне
+        self._reference_worker: Worker | None = None
+        if ctx.reference is not None:
+            worker = Worker(ctx.fetch_reference_if_changed, ctx.reference.generation)
+            worker.signals.finished.connect(self._on_reference_checked)
+            self._reference_worker = worker
+            QThreadPool.globalInstance().start(worker)
+
+        self.ctx.signals.budget_alert.connect(self._on_budget_alert)
+
+        # повторяющиеся операции, наступившие с прошлого запуска, — одной пачкой в фоне
+        self._recurring_worker = Worker(self._materialize_recurring)
+        self._recurring_worker.signals.finished.connect(self._on_recurring_done)
+        self._recurring_worker.signals.failed.connect(self._on_recurring_failed)
+        QThreadPool.globalInstance().start(self._recurring_worker)
+
+    def _on_reference_checked(self, reference):
+        self._reference_worker = None
+        if reference is not None:
+            self.ctx.set_reference(reference)
+
+    def _materialize_recurring(self) -> int:
+        with self.ctx.open_session() as session:
+            return materialize_due(RecurringRulesRepo(session), TransactionsRepo(session))
+
+    def _on_recurring_done(self, added: int):
+        self._recurring_worker = None
+        if added:
+            self.statusBar().showMessage(f"Проведено повторяющихся операций: {added}", 10000)
+            self.ctx.signals.ui_data_changed.emit()
+            self.view_tx.refresh()
+
+    def _on_recurring_failed(self, msg: str):
+        self._recurring_worker = None
+        self.statusBar().showMessage(f"Не удалось провести повторяющиеся операции: {msg}", 10000)
+
+    def _on_budget_alert(self, alert: BudgetAlert):
+        name = self.ctx.reference_data(allow_stale=True).category_names().get(alert.category_id, f"#{alert.category_id}")
+        state = "превышен" if alert.threshold >= 100 else f"израсходовано {alert.threshold}%"
+        self.statusBar().showMessage(
+            f"Бюджет «{name}»: {state} — {format_rub(alert.spent_cents)} из {format_rub(alert.limit_cents)}",
+            15000,
+        )
+
+    def closeEvent(self, event):
+        self.ctx.save_startup_cache()
+        super().closeEvent(event)
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+from pathlib import Path
+
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
     QTableWidget, QTableWidgetItem, QHeaderView,
-    QDialog, QFormLayout, QLineEdit, QComboBox, QMessageBox
+    QDialog, QFormLayout, QLineEdit, QComboBox, QMessageBox, QFileDialog
 )
 
 from app.ui.app_context import AppContext
+from app.ui.views.statement import AccountStatementDialog
+from app.ui.views.reconcile import ReconcileDialog
+from app.application.services.imports import read_statement
 from app.infrastructure.repositories.accounts import AccountsRepo
 from app.application.services.accounts import create_account
 from app.domain.enums import AccountType
@@ -58,10 +63,14 @@ class AccountsView(QWidget):
 
         self.btn_add = QPushButton("Добавить")
         self.btn_deactivate = QPushButton("Деактивировать")
+        self.btn_statement = QPushButton("Выписка")
+        self.btn_reconcile = QPushButton("Сверка…")
 
         header = QHBoxLayout()
         header.addWidget(self.title)
         header.addStretch(1)
+        header.addWidget(self.btn_statement)
+        header.addWidget(self.btn_reconcile)
         header.addWidget(self.btn_add)
         header.addWidget(self.btn_deactivate)
 
@@ -80,6 +89,9 @@ class AccountsView(QWidget):
 
         self.btn_add.clicked.connect(self.add_account)
         self.btn_deactivate.clicked.connect(self.deactivate_selected)
+        self.btn_statement.clicked.connect(self.open_statement)
+        self.btn_reconcile.clicked.connect(self.reconcile_selected)
+        self.table.cellDoubleClicked.connect(lambda *_: self.open_statement())
 
         self.refresh()
 
@@ -119,6 +131,39 @@ class AccountsView(QWidget):
             QMessageBox.critical(self, "Ошибка", f"Не удалось добавить счёт: {e}")
 
 
+    def open_statement(self):
+        row = self.table.currentRow()
+        if row < 0:
+            QMessageBox.information(self, "Выбор", "Выбери строку со счетом.")
+            return
+
+        acc_id = int(self.table.item(row, 0).text())
+        name = self.table.item(row, 1).text()
+        AccountStatementDialog(self.ctx, acc_id, name, self).exec()
+
+    def reconcile_selected(self):
+        row = self.table.currentRow()
+        if row < 0:
+            QMessageBox.information(self, "Выбор", "Выбери строку со счетом.")
+            return
+
+        acc_id = int(self.table.item(row, 0).text())
+        name = self.table.item(row, 1).text()
+        path, _ = QFileDialog.getOpenFileName(
+            self, f"Выписка банка: {name}", "", "Выписки (*.csv *.txt *.xlsx);;Все файлы (*)"
+        )
+        if not path:
+            return
+        try:
+            rows = read_statement(Path(path))
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Ошибка", f"Не удалось прочитать выписку: {e}")
+            return
+        if not rows:
+            QMessageBox.information(self, "Сверка", "В файле нет операций.")
+            return
+        ReconcileDialog(self.ctx, acc_id, name, Path(path), rows, self).exec()
+
     def deactivate_selected(self):
         row = self.table.currentRow()
         if row < 0:
@@ -3,20 +3,23 @@ from __future__ import annotations
 from datetime import date, timedelta
 
 from PySide6.QtCore import QDate
+from PySide6.QtGui import QBrush, QColor
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
     QTableWidget, QTableWidgetItem, QHeaderView,
-    QDialog, QFormLayout, QComboBox, QLineEdit, QMessageBox, QDateEdit
+    QDialog, QFormLayout, QComboBox, QLineEdit, QMessageBox, QDateEdit, QCheckBox, QSpinBox
 )
 
 from app.ui.app_context import AppContext
 from app.application.money import format_rub
-from app.domain.enums import TransactionType, CategoryKind
+from app.domain.enums import CategoryKind
 
 from app.infrastructure.repositories.budgets import BudgetsRepo
 from app.infrastructure.repositories.categories import CategoriesRepo
-from app.infrastructure.repositories.transactions import TransactionsRepo
-from app.application.services.budgets import upsert_budget
+from app.infrastructure.repositories.reports import BudgetEnvelopeRow
+from app.application.services.budgets import get_budget_envelopes, upsert_budget
+
+MONTH_LABELS = ["Янв", "Фев", "Мар", "Апр", "Май", "Июн", "Июл", "Авг", "Сен", "Окт", "Ноя", "Дек"]
 
 
 def parse_rub_to_cents(text: str) -> int | None:
@@ -75,11 +78,14 @@ class BudgetDialog(QDialog):
         self.limit_inp = QLineEdit()
         self.limit_inp.setPlaceholderText("Напр.: 25000,00")
 
+        self.rollover_chk = QCheckBox("Переносить остаток на следующий месяц")
+
         form = QFormLayout()
         form.addRow("Месяц:", self.month_edit)
         form.addRow("Тип:", self.kind_box)
         form.addRow("Категория:", self.category_box)
         form.addRow("Лимит (₽):", self.limit_inp)
+        form.addRow("", self.rollover_chk)
 
         self.btn_ok = QPushButton("Сохранить")
         self.btn_cancel = QPushButton("Отмена")
@@ -117,7 +123,86 @@ class BudgetDialog(QDialog):
         m = month_start(m)
         cat_id = int(self.category_box.currentData()) if self.category_box.currentData() is not None else -1
         limit_cents = parse_rub_to_cents(self.limit_inp.text())
-        return m, cat_id, limit_cents
+        return m, cat_id, limit_cents, self.rollover_chk.isChecked()
+
+
+class BudgetYearDialog(QDialog):
+    """
+    Бюджеты на год: строка — категория, столбец — месяц, в ячейке
+    «доступно» с учётом переноса. Весь год — один запрос конвертов.
+    """
+
+    def __init__(self, ctx: AppContext, year: int, parent: QWidget | None = None):
+        super().__init__(parent)
+        self.ctx = ctx
+        self.setWindowTitle("Бюджеты на год")
+        self.resize(1100, 520)
+
+        self.year_spin = QSpinBox()
+        self.year_spin.setRange(2000, 2100)
+        self.year_spin.setValue(year)
+
+        header = QHBoxLayout()
+        header.addWidget(QLabel("Год:"))
+        header.addWidget(self.year_spin)
+        header.addStretch(1)
+
+        self.table = QTableWidget(0, 12)
+        self.table.setHorizontalHeaderLabels(MONTH_LABELS)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setEditTriggers(self.table.EditTrigger.NoEditTriggers)
+
+        self.lbl_hint = QLabel("Доступно = лимит − факт + перенос; ↻ — остаток переносится дальше. Подробности — в подсказке ячейки.")
+
+        self.btn_close = QPushButton("Закрыть")
+        self.btn_close.clicked.connect(self.accept)
+        btns = QHBoxLayout()
+        btns.addStretch(1)
+        btns.addWidget(self.btn_close)
+
+        root = QVBoxLayout()
+        root.addLayout(header)
+        root.addWidget(self.table)
+        root.addWidget(self.lbl_hint)
+        root.addLayout(btns)
+        self.setLayout(root)
+
+        self.year_spin.valueChanged.connect(lambda *_: self.refresh())
+        self.refresh()
+
+    def refresh(self):
+        year = self.year_spin.value()
+        names = self.ctx.reference_data().category_names()
+        with self.ctx.open_reports_session() as session:
+            rows = get_budget_envelopes(
+                self.ctx.reports_repo(session), date(year, 1, 1), date(year, 12, 1), cache=self.ctx.report_cache
+            )
+
+        by_cat: dict[int, dict[int, BudgetEnvelopeRow]] = {}
+        for e in rows:
+            by_cat.setdefault(e.category_id, {})[e.month.month] = e
+        # категории, у которых в этом году нет ни бюджета, ни переноса, не показываем
+        cat_ids = sorted(
+            (c for c, months in by_cat.items() if any(e.budget_id or e.carried_cents for e in months.values())),
+            key=lambda c: names.get(c, ""),
+        )
+
+        self.table.setRowCount(len(cat_ids))
+        self.table.setVerticalHeaderLabels([names.get(c, f"#{c}") for c in cat_ids])
+        negative = QBrush(QColor("#c0392b"))
+        for r, cat_id in enumerate(cat_ids):
+            for month, e in by_cat[cat_id].items():
+                if e.budget_id is None and e.carried_cents == 0:
+                    continue
+                item = QTableWidgetItem(format_rub(e.available_cents) + (" ↻" if e.rollover else ""))
+                item.setToolTip(
+                    f"Лимит: {format_rub(e.limit_cents)}\n"
+                    f"Факт: {format_rub(e.actual_cents)}\n"
+                    f"Перенос: {format_rub(e.carried_cents)}"
+                )
+                if e.available_cents < 0:
+                    item.setForeground(negative)
+                self.table.setItem(r, month - 1, item)
 
 
 class BudgetsView(QWidget):
@@ -134,6 +219,7 @@ class BudgetsView(QWidget):
 
         self.btn_add = QPushButton("Добавить/обновить")
         self.btn_delete = QPushButton("Удалить")
+        self.btn_year = QPushButton("Год…")
 
         header = QHBoxLayout()
         header.addWidget(self.title)
@@ -142,16 +228,16 @@ class BudgetsView(QWidget):
         header.addWidget(self.month_pick)
         header.addWidget(self.btn_add)
         header.addWidget(self.btn_delete)
+        header.addWidget(self.btn_year)
 
-        self.table = QTableWidget(0, 7)
-        self.table.setHorizontalHeaderLabels(["ID", "Категория", "Тип", "Лимит", "Факт", "Остаток", "%"])
+        self.table = QTableWidget(0, 9)
+        self.table.setHorizontalHeaderLabels(
+            ["ID", "Категория", "Тип", "Лимит", "Факт", "Остаток", "Перенос", "Доступно", "%"]
+        )
         self.table.setColumnHidden(0, True)
         self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
-        self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeToContents)
-        self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeToContents)
-        self.table.horizontalHeader().setSectionResizeMode(4, QHeaderView.ResizeToContents)
-        self.table.horizontalHeader().setSectionResizeMode(5, QHeaderView.ResizeToContents)
-        self.table.horizontalHeader().setSectionResizeMode(6, QHeaderView.ResizeToContents)
+        for col in range(2, 9):
+            self.table.horizontalHeader().setSectionResizeMode(col, QHeaderView.ResizeToContents)
         self.table.setEditTriggers(self.table.EditTrigger.NoEditTriggers)
         self.table.setSelectionBehavior(self.table.SelectionBehavior.SelectRows)
 
@@ -162,6 +248,7 @@ class BudgetsView(QWidget):
 
         self.btn_add.clicked.connect(self.add_or_update_budget)
         self.btn_delete.clicked.connect(self.delete_selected)
+        self.btn_year.clicked.connect(self.open_year)
 
         self.month_pick.dateChanged.connect(lambda *_: self.refresh())
         self.ctx.signals.ui_data_changed.connect(self.refresh)
@@ -182,33 +269,20 @@ class BudgetsView(QWidget):
 
     def refresh(self):
         m = month_start(self.month_pick.date().toPython())
-        end = month_end(m)
-
         with self.ctx.open_session() as session:
             b_repo = BudgetsRepo(session)
-            t_repo = TransactionsRepo(session)
             c_repo = CategoriesRepo(session)
 
             budgets = b_repo.list_by_month(m)
             cats = {c.id: c for c in c_repo.list_all()}
 
-            txs = t_repo.list_filtered(start=m, end=end, limit=10000)
-
-        # считаем факт по категориям
-        fact_by_cat: dict[int, int] = {}
-        for t in txs:
-            if not t.category_id:
-                continue
-            cat = cats.get(t.category_id)
-            if not cat:
-                continue
-
-            if cat.kind == CategoryKind.EXPENSE.value and t.type == TransactionType.EXPENSE.value:
-                fact_by_cat[t.category_id] = fact_by_cat.get(t.category_id, 0) + t.amount_cents
-
-            if cat.kind == CategoryKind.SAVINGS.value and t.type == TransactionType.TRANSFER.value:
-                # накопления — это transfer с category_id (мы так делаем "savings_flow")
-                fact_by_cat[t.category_id] = fact_by_cat.get(t.category_id, 0) + t.amount_cents
+        # факт по категории бюджета включает все её подкатегории;
+        # перенос — накопленный остаток прошлых месяцев цепочки rollover
+        with self.ctx.open_reports_session() as session:
+            envelopes = {
+                e.category_id: e
+                for e in get_budget_envelopes(self.ctx.reports_repo(session), m, m, cache=self.ctx.report_cache)
+            }
 
         self.table.setRowCount(0)
         for r, b in enumerate(budgets):
@@ -222,25 +296,29 @@ class BudgetsView(QWidget):
                 CategoryKind.INCOME.value: "Доход",
             }.get(kind, kind)
 
-            fact = fact_by_cat.get(b.category_id, 0)
+            env = envelopes.get(b.category_id)
+            fact = env.actual_cents if env else 0
+            carried = env.carried_cents if env else 0
             remain = b.limit_cents - fact
             pct = int((fact / b.limit_cents) * 100) if b.limit_cents > 0 else 0
 
             self.table.insertRow(r)
             self.table.setItem(r, 0, QTableWidgetItem(str(b.id)))
-            self.table.setItem(r, 1, QTableWidgetItem(cat_name))
+            self.table.setItem(r, 1, QTableWidgetItem(cat_name + (" ↻" if b.rollover else "")))
             self.table.setItem(r, 2, QTableWidgetItem(kind_label))
             self.table.setItem(r, 3, QTableWidgetItem(format_rub(b.limit_cents)))
             self.table.setItem(r, 4, QTableWidgetItem(format_rub(fact)))
             self.table.setItem(r, 5, QTableWidgetItem(format_rub(remain)))
-            self.table.setItem(r, 6, QTableWidgetItem(f"{pct}%"))
+            self.table.setItem(r, 6, QTableWidgetItem(format_rub(carried)))
+            self.table.setItem(r, 7, QTableWidgetItem(format_rub(carried + remain)))
+            self.table.setItem(r, 8, QTableWidgetItem(f"{pct}%"))
 
     def add_or_update_budget(self):
         dlg = BudgetDialog(self.ctx, self)
         if dlg.exec() != QDialog.DialogCode.Accepted:
             return
 
-        m, cat_id, limit_cents = dlg.get_data()
+        m, cat_id, limit_cents, rollover = dlg.get_data()
 
         if cat_id < 0:
             QMessageBox.warning(self, "Ошибка", "Нужна категория. Создай её в разделе Категории.")
@@ -251,7 +329,7 @@ class BudgetsView(QWidget):
 
         with self.ctx.open_session() as session:
             repo = BudgetsRepo(session)
-            upsert_budget(repo, month_start=m, category_id=cat_id, limit_cents=limit_cents)
+            upsert_budget(repo, month_start=m, category_id=cat_id, limit_cents=limit_cents, rollover=rollover)
 
         self.refresh()
         self.ctx.signals.ui_data_changed.emit()
@@ -275,3 +353,6 @@ class BudgetsView(QWidget):
 
         self.refresh()
         self.ctx.signals.ui_data_changed.emit()
+
+    def open_year(self):
+        BudgetYearDialog(self.ctx, self.month_pick.date().year(), self).exec()
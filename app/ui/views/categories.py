@@ -1,20 +1,45 @@
 from __future__ import annotations
 
+from PySide6.QtCore import Qt
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QTableWidget, QTableWidgetItem, QHeaderView,
+    QTreeWidget, QTreeWidgetItem, QHeaderView,
     QDialog, QFormLayout, QLineEdit, QComboBox, QMessageBox
 )
 
 from app.ui.app_context import AppContext
 from app.infrastructure.repositories.categories import CategoriesRepo
-from app.application.services.categories import create_category
+from app.application.services.categories import create_category, move_category
 from app.domain.enums import CategoryKind
+from app.ui.views.rules import CategoryRulesDialog
+
+
+KIND_LABELS = {
+    CategoryKind.EXPENSE.value: "Расход",
+    CategoryKind.INCOME.value: "Доход",
+    CategoryKind.SAVINGS.value: "Накопления",
+}
+
+# роль, в которой у элемента дерева лежит флаг "дети уже загружены"
+LOADED_ROLE = Qt.ItemDataRole.UserRole + 1
+
+
+def _fill_parent_box(box: QComboBox, ctx: AppContext, kind: str, exclude: set[int] | None = None):
+    with ctx.open_session() as session:
+        cats = CategoriesRepo(session).list_by_kind(kind)
+
+    box.clear()
+    box.addItem("— нет (корень) —", -1)
+    for c in sorted(cats, key=lambda c: c.name.lower()):
+        if exclude and c.id in exclude:
+            continue
+        box.addItem(c.name, c.id)
 
 
 class AddCategoryDialog(QDialog):
-    def __init__(self, parent: QWidget | None = None):
+    def __init__(self, ctx: AppContext, parent: QWidget | None = None, parent_category_id: int | None = None):
         super().__init__(parent)
+        self.ctx = ctx
         self.setWindowTitle("Добавить категорию")
         self.setMinimumWidth(420)
 
@@ -24,10 +49,12 @@ class AddCategoryDialog(QDialog):
         self.kind_box.addItem("Накопления", CategoryKind.SAVINGS.value)  # ✅ новое
 
         self.name_inp = QLineEdit()
+        self.parent_box = QComboBox()
 
         form = QFormLayout()
         form.addRow("Тип:", self.kind_box)
         form.addRow("Название:", self.name_inp)
+        form.addRow("Родитель:", self.parent_box)
 
         self.btn_ok = QPushButton("Добавить")
         self.btn_cancel = QPushButton("Отмена")
@@ -44,10 +71,74 @@ class AddCategoryDialog(QDialog):
         root.addLayout(btns)
         self.setLayout(root)
 
-    def get_data(self) -> tuple[str, str]:
+        self.kind_box.currentIndexChanged.connect(self._reload_parents)
+
+        # если добавляем подкатегорию к выбранной — тип берём у родителя
+        if parent_category_id is not None:
+            with self.ctx.open_session() as session:
+                cat = CategoriesRepo(session).get_by_id(parent_category_id)
+                kind = cat.kind if cat else None
+            idx = self.kind_box.findData(kind)
+            if idx >= 0:
+                self.kind_box.setCurrentIndex(idx)
+
+        self._reload_parents()
+        if parent_category_id is not None:
+            idx = self.parent_box.findData(parent_category_id)
+            if idx >= 0:
+                self.parent_box.setCurrentIndex(idx)
+
+    def _reload_parents(self):
+        _fill_parent_box(self.parent_box, self.ctx, self.kind_box.currentData())
+
+    def get_data(self) -> tuple[str, str, int | None]:
         kind = self.kind_box.currentData()
         name = self.name_inp.text().strip()
-        return kind, name
+        parent_id = self.parent_box.currentData()
+        return kind, name, (int(parent_id) if parent_id is not None and parent_id >= 0 else None)
+
+
+class MoveCategoryDialog(QDialog):
+    def __init__(self, ctx: AppContext, category_id: int, parent: QWidget | None = None):
+        super().__init__(parent)
+        self.setWindowTitle("Перенести категорию")
+        self.setMinimumWidth(420)
+
+        with ctx.open_session() as session:
+            repo = CategoriesRepo(session)
+            cat = repo.get_by_id(category_id)
+            kind, name, current_parent = cat.kind, cat.name, cat.parent_id
+            # в собственное поддерево переносить нельзя
+            subtree = set(repo.subtree_ids(category_id))
+
+        self.parent_box = QComboBox()
+        _fill_parent_box(self.parent_box, ctx, kind, exclude=subtree)
+        idx = self.parent_box.findData(current_parent if current_parent is not None else -1)
+        if idx >= 0:
+            self.parent_box.setCurrentIndex(idx)
+
+        form = QFormLayout()
+        form.addRow("Категория:", QLabel(name))
+        form.addRow("Новый родитель:", self.parent_box)
+
+        self.btn_ok = QPushButton("Перенести")
+        self.btn_cancel = QPushButton("Отмена")
+        self.btn_ok.clicked.connect(self.accept)
+        self.btn_cancel.clicked.connect(self.reject)
+
+        btns = QHBoxLayout()
+        btns.addStretch(1)
+        btns.addWidget(self.btn_cancel)
+        btns.addWidget(self.btn_ok)
+
+        root = QVBoxLayout()
+        root.addLayout(form)
+        root.addLayout(btns)
+        self.setLayout(root)
+
+    def get_parent_id(self) -> int | None:
+        parent_id = self.parent_box.currentData()
+        return int(parent_id) if parent_id is not None and parent_id >= 0 else None
 
 
 class CategoriesView(QWidget):
@@ -57,58 +148,95 @@ class CategoriesView(QWidget):
 
         self.title = QLabel("Категории")
         self.btn_add = QPushButton("Добавить")
+        self.btn_add_child = QPushButton("Подкатегория")
+        self.btn_move = QPushButton("Перенести")
+        self.btn_rules = QPushButton("Правила…")
 
         header = QHBoxLayout()
         header.addWidget(self.title)
         header.addStretch(1)
         header.addWidget(self.btn_add)
+        header.addWidget(self.btn_add_child)
+        header.addWidget(self.btn_move)
+        header.addWidget(self.btn_rules)
 
-        self.table = QTableWidget(0, 4)
-        self.table.setHorizontalHeaderLabels(["ID", "Тип", "Название", "Slug"])
-        self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
-        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
-        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeToContents)
-        self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeToContents)
-        self.table.setEditTriggers(self.table.EditTrigger.NoEditTriggers)
-        self.table.setSelectionBehavior(self.table.SelectionBehavior.SelectRows)
+        # дерево грузится лениво: корни сразу, дети — при раскрытии узла
+        self.tree = QTreeWidget()
+        self.tree.setColumnCount(4)
+        self.tree.setHeaderLabels(["Название", "Тип", "Slug", "ID"])
+        self.tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.tree.header().setSectionResizeMode(1, QHeaderView.ResizeToContents)
+        self.tree.header().setSectionResizeMode(2, QHeaderView.ResizeToContents)
+        self.tree.header().setSectionResizeMode(3, QHeaderView.ResizeToContents)
 
         layout = QVBoxLayout()
         layout.addLayout(header)
-        layout.addWidget(self.table)
+        layout.addWidget(self.tree)
         self.setLayout(layout)
 
-        self.btn_add.clicked.connect(self.add_category)
+        self.btn_add.clicked.connect(lambda: self.add_category(as_child=False))
+        self.btn_add_child.clicked.connect(lambda: self.add_category(as_child=True))
+        self.btn_move.clicked.connect(self.move_selected)
+        self.btn_rules.clicked.connect(self.open_rules)
+        self.tree.itemExpanded.connect(self._on_expanded)
 
         self.refresh()
 
+    def _make_item(self, cat, has_children: bool) -> QTreeWidgetItem:
+        item = QTreeWidgetItem([cat.name, KIND_LABELS.get(cat.kind, cat.kind), cat.slug, str(cat.id)])
+        item.setData(0, Qt.ItemDataRole.UserRole, cat.id)
+        item.setData(0, LOADED_ROLE, False)
+        if has_children:
+            item.setChildIndicatorPolicy(QTreeWidgetItem.ChildIndicatorPolicy.ShowIndicator)
+        return item
+
+    def _load_children(self, parent_id: int | None) -> list[QTreeWidgetItem]:
+        with self.ctx.open_session() as session:
+            repo = CategoriesRepo(session)
+            cats = repo.list_children(parent_id)
+            counts = repo.child_counts([c.id for c in cats])
+            return [self._make_item(c, counts.get(c.id, 0) > 0) for c in cats]
+
+    def _on_expanded(self, item: QTreeWidgetItem):
+        if item.data(0, LOADED_ROLE):
+            return
+        try:
+            children = self._load_children(int(item.data(0, Qt.ItemDataRole.UserRole)))
+        except Exception as e:
+            QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить подкатегории: {e}")
+            return
+        item.addChildren(children)
+        item.setData(0, LOADED_ROLE, True)
+        if not children:
+            item.setChildIndicatorPolicy(QTreeWidgetItem.ChildIndicatorPolicy.DontShowIndicator)
+
+    def _selected_category_id(self) -> int | None:
+        item = self.tree.currentItem()
+        if item is None:
+            return None
+        return int(item.data(0, Qt.ItemDataRole.UserRole))
+
     def refresh(self):
         try:
-            with self.ctx.open_session() as session:
-                repo = CategoriesRepo(session)
-                items = repo.list_all()
-
-            kind_label_map = {
-                CategoryKind.EXPENSE.value: "Расход",
-                CategoryKind.INCOME.value: "Доход",
-                CategoryKind.SAVINGS.value: "Накопления",
-            }
-
-            self.table.setRowCount(0)
-            for r, cat in enumerate(items):
-                self.table.insertRow(r)
-                self.table.setItem(r, 0, QTableWidgetItem(str(cat.id)))
-                self.table.setItem(r, 1, QTableWidgetItem(kind_label_map.get(cat.kind, cat.kind)))
-                self.table.setItem(r, 2, QTableWidgetItem(cat.name))
-                self.table.setItem(r, 3, QTableWidgetItem(cat.slug))
+            roots = self._load_children(None)
+            self.tree.clear()
+            self.tree.addTopLevelItems(roots)
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Произошла ошибка при обновлении категорий: {e}")
 
-    def add_category(self):
-        dlg = AddCategoryDialog(self)
+    def add_category(self, as_child: bool = False):
+        parent_category_id = None
+        if as_child:
+            parent_category_id = self._selected_category_id()
+            if parent_category_id is None:
+                QMessageBox.information(self, "Выбор", "Выбери родительскую категорию в дереве.")
+                return
+
+        dlg = AddCategoryDialog(self.ctx, self, parent_category_id=parent_category_id)
         if dlg.exec() != QDialog.DialogCode.Accepted:
             return
 
-        kind, name = dlg.get_data()
+        kind, name, parent_id = dlg.get_data()
         if not name:
             QMessageBox.warning(self, "Ошибка", "Название категории не может быть пустым.")
             return
@@ -116,9 +244,32 @@ class CategoriesView(QWidget):
         try:
             with self.ctx.open_session() as session:
                 repo = CategoriesRepo(session)
-                create_category(repo, kind=kind, name=name)
+                create_category(repo, kind=kind, name=name, parent_id=parent_id)
 
             self.refresh()
             self.ctx.signals.ui_data_changed.emit()
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Не удалось добавить категорию: {e}")
+
+    def move_selected(self):
+        cat_id = self._selected_category_id()
+        if cat_id is None:
+            QMessageBox.information(self, "Выбор", "Выбери категорию в дереве.")
+            return
+
+        dlg = MoveCategoryDialog(self.ctx, cat_id, self)
+        if dlg.exec() != QDialog.DialogCode.Accepted:
+            return
+
+        try:
+            with self.ctx.open_session() as session:
+                repo = CategoriesRepo(session)
+                move_category(repo, cat_id, dlg.get_parent_id())
+
+            self.refresh()
+            self.ctx.signals.ui_data_changed.emit()
+        except Exception as e:
+            QMessageBox.critical(self, "Ошибка", f"Не удалось перенести категорию: {e}")
+
+    def open_rules(self):
+        CategoryRulesDialog(self.ctx, self).exec()
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from datetime import date
+from datetime import date, datetime, timedelta
+from PySide6.QtCore import QThreadPool
 from PySide6.QtWidgets import (
     QWidget,
     QVBoxLayout,
@@ -12,16 +13,55 @@ from PySide6.QtWidgets import (
     QTableWidgetItem,
     QHeaderView,
     QMessageBox,
+    QHBoxLayout,
+    QSpinBox,
+    QComboBox,
 )
 
 from app.ui.app_context import AppContext
 from app.application.money import format_rub
+from app.application.services.dashboard import DashboardSnapshot, build_dashboard_snapshot
+from app.application.services.forecast import (
+    FORECAST_MAX_HORIZON,
+    FORECAST_MIN_HORIZON,
+    CashFlowForecast,
+    get_cash_flow_forecast,
+)
+from app.domain.enums import TransactionType
+from app.infrastructure.db.generation import current_generation
+from app.ui.workers import Worker
+from app.ui.widgets.heatmap import CalendarHeatmap
+from app.ui.widgets.trend_chart import TrendChart
+
+
+# сколько категорий показывать в таблице прогноза
+FORECAST_TOP_CATEGORIES = 10
+
+
+def _month_end(d: date) -> date:
+    return date(d.year + d.month // 12, d.month % 12 + 1, 1) - timedelta(days=1)
+
+
+def _load_forecast(ctx: AppContext, horizon: int) -> CashFlowForecast:
+    with ctx.open_reports_session() as session:
+        return get_cash_flow_forecast(ctx.reports_repo(session), horizon, cache=ctx.report_cache)
+
+
+def _format_delta(delta_cents: int, pct: float | None) -> tuple[str, str]:
+    sign = "+" if delta_cents > 0 else ""
+    pct_text = "—" if pct is None else f"{pct:+.0f}%"
+    return f"{sign}{format_rub(delta_cents)}", pct_text
 
 
 class DashboardView(QWidget):
     def __init__(self, ctx: AppContext):
         super().__init__()
         self.ctx = ctx
+        self._snapshot_worker: Worker | None = None
+        self._forecast_worker: Worker | None = None
+        self._forecast_pending = False
+        self._revalidate_worker: Worker | None = None
+        self._refresh_pending = False
 
         self.title = QLabel("Dashboard")
         self.subtitle = QLabel("Сводка и балансы (данные из SQLite)")
@@ -59,6 +99,80 @@ class DashboardView(QWidget):
         vb2.addWidget(self.top_table)
         self.top_box.setLayout(vb2)
 
+        # Month-over-month / year-over-year
+        self.compare_box = QGroupBox("Категории: к прошлому месяцу и к прошлому году (день в день)")
+        self.compare_table = QTableWidget(0, 6)
+        self.compare_table.setHorizontalHeaderLabels(
+            ["Категория", "Сейчас", "Δ к пр. месяцу", "%", "Δ к пр. году", "%"]
+        )
+        self.compare_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        for col in range(1, 6):
+            self.compare_table.horizontalHeader().setSectionResizeMode(col, QHeaderView.ResizeToContents)
+        self.compare_table.setEditTriggers(self.compare_table.EditTrigger.NoEditTriggers)
+        vb3 = QVBoxLayout()
+        vb3.addWidget(self.compare_table)
+        self.compare_box.setLayout(vb3)
+
+        # Calendar heatmap
+        self.heatmap_box = QGroupBox("Календарь расходов")
+        self.heatmap_year = QSpinBox()
+        self.heatmap_year.setRange(2000, 2100)
+        self.heatmap_year.setValue(date.today().year)
+        self.heatmap_total = QLabel("-")
+        self.heatmap = CalendarHeatmap()
+        hb = QHBoxLayout()
+        hb.addWidget(QLabel("Год:"))
+        hb.addWidget(self.heatmap_year)
+        hb.addStretch(1)
+        hb.addWidget(self.heatmap_total)
+        vb4 = QVBoxLayout()
+        vb4.addLayout(hb)
+        vb4.addWidget(self.heatmap)
+        self.heatmap_box.setLayout(vb4)
+
+        # Trend charts
+        self.trend_box = QGroupBox("Динамика")
+        self.trend_period = QComboBox()
+        self.trend_period.addItem("Год", 365)
+        self.trend_period.addItem("3 года", 3 * 365)
+        self.trend_period.addItem("Вся история", 0)
+        self.balance_chart = TrendChart("Баланс всех счетов", "#2b7bb9")
+        self.spending_chart = TrendChart("Расходы по дням", "#c0392b")
+        hb2 = QHBoxLayout()
+        hb2.addWidget(QLabel("Период:"))
+        hb2.addWidget(self.trend_period)
+        hb2.addStretch(1)
+        vb5 = QVBoxLayout()
+        vb5.addLayout(hb2)
+        vb5.addWidget(self.balance_chart)
+        vb5.addWidget(self.spending_chart)
+        self.trend_box.setLayout(vb5)
+
+        # Forecast
+        self.forecast_box = QGroupBox("Прогноз")
+        self.forecast_horizon = QSpinBox()
+        self.forecast_horizon.setRange(FORECAST_MIN_HORIZON, FORECAST_MAX_HORIZON)
+        self.forecast_horizon.setValue(6)
+        self.forecast_horizon.setSuffix(" мес.")
+        self.forecast_note = QLabel("-")
+        self.forecast_chart = TrendChart("Баланс всех счетов на конец месяца", "#27ae60")
+        self.forecast_table = QTableWidget(0, 4)
+        self.forecast_table.setHorizontalHeaderLabels(["Категория", "В среднем", "След. месяц", "За период"])
+        self.forecast_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        for col in range(1, 4):
+            self.forecast_table.horizontalHeader().setSectionResizeMode(col, QHeaderView.ResizeToContents)
+        self.forecast_table.setEditTriggers(self.forecast_table.EditTrigger.NoEditTriggers)
+        hb3 = QHBoxLayout()
+        hb3.addWidget(QLabel("Горизонт:"))
+        hb3.addWidget(self.forecast_horizon)
+        hb3.addStretch(1)
+        hb3.addWidget(self.forecast_note)
+        vb6 = QVBoxLayout()
+        vb6.addLayout(hb3)
+        vb6.addWidget(self.forecast_chart)
+        vb6.addWidget(self.forecast_table)
+        self.forecast_box.setLayout(vb6)
+
         layout = QVBoxLayout()
         layout.addWidget(self.title)
         layout.addWidget(self.subtitle)
@@ -66,37 +180,191 @@ class DashboardView(QWidget):
         layout.addWidget(self.summary_box)
         layout.addWidget(self.balances_box)
         layout.addWidget(self.top_box)
+        layout.addWidget(self.compare_box)
+        layout.addWidget(self.heatmap_box)
+        layout.addWidget(self.trend_box)
+        layout.addWidget(self.forecast_box)
         layout.addStretch(1)
         self.setLayout(layout)
 
         self.refresh_btn.clicked.connect(self.refresh)
+        self.heatmap_year.valueChanged.connect(lambda *_: self.refresh())
+        self.trend_period.currentIndexChanged.connect(lambda *_: self.refresh())
+        self.forecast_horizon.valueChanged.connect(lambda *_: self.refresh_forecast())
         self.ctx.signals.ui_data_changed.connect(self.refresh)
 
+        # первый рендер: сразу из кэша старта (помечен как устаревший), затем сверка с базой
+        cached = self.ctx.last_dashboard
+        if cached is not None:
+            self._restore_controls(cached)
+            self.apply_snapshot(cached)
+            saved_at = self.ctx.startup.saved_at if self.ctx.startup else None
+            when = f" от {saved_at:%d.%m %H:%M}" if saved_at else ""
+            self.subtitle.setText(f"Показаны сохранённые данные{when} — проверяем актуальность…")
+            self.revalidate()
+            # прогноза в кэше старта нет — считаем сразу
+            self.refresh_forecast()
+        else:
+            self.refresh()
+
+    def _restore_controls(self, snap: DashboardSnapshot):
+        # без сигналов — иначе каждое изменение запустит пересборку
+        self.heatmap_year.blockSignals(True)
+        self.trend_period.blockSignals(True)
+        self.heatmap_year.setValue(snap.heatmap_year)
+        idx = self.trend_period.findData(snap.trend_days)
+        if idx >= 0:
+            self.trend_period.setCurrentIndex(idx)
+        self.heatmap_year.blockSignals(False)
+        self.trend_period.blockSignals(False)
+
+    def _read_generation(self) -> int:
+        with self.ctx.open_session() as session:
+            return current_generation(session)
+
+    def revalidate(self):
+        """Лёгкая фоновая проверка: пересобираем снимок, только если база менялась."""
+        worker = Worker(self._read_generation)
+        worker.signals.finished.connect(self._on_generation)
+        worker.signals.failed.connect(self._on_generation_failed)
+        self._revalidate_worker = worker
+        QThreadPool.globalInstance().start(worker)
+
+    def _on_generation(self, generation: int):
+        self._revalidate_worker = None
+        cached = self.ctx.last_dashboard
+        if cached is not None and cached.generation == generation and cached.today == date.today():
+            self._mark_fresh()
+        else:
+            self.refresh()
 
-        # первый рендер
+    def _on_generation_failed(self, _msg: str):
+        self._revalidate_worker = None
         self.refresh()
 
+    def _mark_fresh(self):
+        self.subtitle.setText(f"Сводка и балансы (данные из SQLite, обновлено {datetime.now():%H:%M:%S})")
+
     def refresh(self):
-        try:
-            today = date.today()
-            start = date(today.year, today.month, 1)
-            end = today
-
-            with self.ctx.open_session() as session:
-                rep = self.ctx.reports_repo(session)
-
-                summary = rep.period_summary(start, end)
-                self.lbl_income.setText(format_rub(summary.income_cents))
-                self.lbl_expense.setText(format_rub(summary.expense_cents))
-                self.lbl_net.setText(format_rub(summary.net_cents))
-
-                balances = rep.account_balances()
-                self._fill_table(self.balances_table, [(b.account_name, format_rub(b.balance_cents)) for b in balances])
-
-                top = rep.top_expense_categories(start, end, limit=10)
-                self._fill_table(self.top_table, [(c.category_name, format_rub(c.total_cents)) for c in top])
-        except Exception as e:
-            QMessageBox.critical(self, "Ошибка", f"Произошла ошибка при обновлении данных: {e}")
+        """
+        Данные всех виджетов собираются одним снимком в фоне (запросы —
+        параллельно на отдельных соединениях). Если обновление уже идёт,
+        повторим его по завершении, чтобы не показать устаревшие данные.
+        """
+        self.refresh_forecast()
+        if self._snapshot_worker is not None:
+            self._refresh_pending = True
+            return
+        self._refresh_pending = False
+        self.refresh_btn.setEnabled(False)
+
+        worker = Worker(
+            build_dashboard_snapshot,
+            self.ctx.open_reports_session,
+            self.ctx.reports_repo,
+            cache=self.ctx.report_cache,
+            heatmap_year=self.heatmap_year.value(),
+            trend_days=int(self.trend_period.currentData() or 0),
+        )
+        worker.signals.finished.connect(self._on_snapshot)
+        worker.signals.failed.connect(self._on_snapshot_failed)
+        self._snapshot_worker = worker
+        QThreadPool.globalInstance().start(worker)
+
+    def _on_snapshot(self, snap: DashboardSnapshot):
+        self._snapshot_worker = None
+        self.refresh_btn.setEnabled(True)
+        self.apply_snapshot(snap)
+        self._mark_fresh()
+        self.ctx.last_dashboard = snap
+        self.ctx.save_startup_cache()
+        if self._refresh_pending:
+            self.refresh()
+
+    def _on_snapshot_failed(self, msg: str):
+        self._snapshot_worker = None
+        self.refresh_btn.setEnabled(True)
+        QMessageBox.critical(self, "Ошибка", f"Произошла ошибка при обновлении данных: {msg}")
+        if self._refresh_pending:
+            self.refresh()
+
+    def apply_snapshot(self, snap: DashboardSnapshot):
+        self.lbl_income.setText(format_rub(snap.summary.income_cents))
+        self.lbl_expense.setText(format_rub(snap.summary.expense_cents))
+        self.lbl_net.setText(format_rub(snap.summary.net_cents))
+
+        self._fill_table(self.balances_table, [(b.account_name, format_rub(b.balance_cents)) for b in snap.balances])
+        self._fill_table(self.top_table, [(c.category_name, format_rub(c.total_cents)) for c in snap.top_categories])
+        self._fill_comparison(snap.comparison)
+
+        self.heatmap.set_data(snap.heatmap_year, list(snap.daily_totals))
+        self.heatmap_total.setText(f"Всего за год: {format_rub(sum(snap.daily_totals))}")
+
+        self.balance_chart.set_series(*snap.balance_trend)
+        self.spending_chart.set_series(*snap.spending_trend)
+
+    def refresh_forecast(self):
+        """Прогноз считается отдельно от снимка: он не входит в кэш старта."""
+        if self._forecast_worker is not None:
+            self._forecast_pending = True
+            return
+        self._forecast_pending = False
+        worker = Worker(_load_forecast, self.ctx, self.forecast_horizon.value())
+        worker.signals.finished.connect(self._on_forecast)
+        worker.signals.failed.connect(self._on_forecast_failed)
+        self._forecast_worker = worker
+        QThreadPool.globalInstance().start(worker)
+
+    def _on_forecast(self, fc: CashFlowForecast):
+        self._forecast_worker = None
+        if self._forecast_pending:
+            self.refresh_forecast()
+            return
+        self.apply_forecast(fc)
+
+    def _on_forecast_failed(self, msg: str):
+        self._forecast_worker = None
+        self.forecast_note.setText(f"Прогноз недоступен: {msg}")
+        if self._forecast_pending:
+            self.refresh_forecast()
+
+    def apply_forecast(self, fc: CashFlowForecast):
+        now = sum(a.balance_cents for a in fc.accounts)
+        totals = fc.total_balances_cents
+        self.forecast_chart.set_series([fc.today] + [_month_end(m) for m in fc.months], [now, *totals])
+        if fc.months:
+            self.forecast_note.setText(f"На {_month_end(fc.months[-1]):%d.%m.%Y}: {format_rub(totals[-1])}")
+
+        names = self.ctx.reference_data(allow_stale=True).category_names()
+        spending = [
+            c for c in fc.categories
+            if c.tx_type in (TransactionType.EXPENSE.value, TransactionType.TRANSFER.value)
+        ]
+        spending.sort(key=lambda c: sum(c.values_cents), reverse=True)
+        rows = [
+            (
+                names.get(c.category_id, f"#{c.category_id}"),
+                format_rub(c.average_cents),
+                format_rub(c.values_cents[0]),
+                format_rub(sum(c.values_cents)),
+            )
+            for c in spending[:FORECAST_TOP_CATEGORIES]
+        ]
+        table = self.forecast_table
+        table.setRowCount(len(rows))
+        for r, values in enumerate(rows):
+            for c, text in enumerate(values):
+                table.setItem(r, c, QTableWidgetItem(text))
+
+    def _fill_comparison(self, rows):
+        table = self.compare_table
+        table.setRowCount(0)
+        for r, row in enumerate(rows):
+            mom, mom_pct = _format_delta(row.mom_delta_cents, row.mom_pct)
+            yoy, yoy_pct = _format_delta(row.yoy_delta_cents, row.yoy_pct)
+            table.insertRow(r)
+            for c, text in enumerate([row.category_name, format_rub(row.current_cents), mom, mom_pct, yoy, yoy_pct]):
+                table.setItem(r, c, QTableWidgetItem(text))
 
     @staticmethod
     def _fill_table(table: QTableWidget, rows: list[tuple[str, str]]):
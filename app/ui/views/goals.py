@@ -1,11 +1,183 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel
+from __future__ import annotations
+
+from PySide6.QtCore import QDate
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QTableWidget, QTableWidgetItem, QHeaderView, QProgressBar,
+    QDialog, QFormLayout, QComboBox, QLineEdit, QMessageBox, QDateEdit, QCheckBox
+)
+
 from app.ui.app_context import AppContext
+from app.application.money import format_rub
+from app.application.services.goals import GOAL_VELOCITY_DAYS, add_goal, goal_progress
+from app.domain.enums import CategoryKind
+from app.infrastructure.repositories.goals import GoalsRepo
+from app.ui.views.budgets import parse_rub_to_cents
+
+
+class GoalDialog(QDialog):
+    def __init__(self, ctx: AppContext, parent: QWidget | None = None):
+        super().__init__(parent)
+        self.setWindowTitle("Новая цель")
+        self.setMinimumWidth(440)
+
+        ref = ctx.reference_data()
+        self.name_inp = QLineEdit()
+        self.name_inp.setPlaceholderText("Например: Отпуск")
+        self.target_inp = QLineEdit()
+        self.target_inp.setPlaceholderText("Напр.: 150000")
+
+        self.deadline_chk = QCheckBox("Есть срок")
+        self.deadline_edit = QDateEdit(QDate.currentDate().addYears(1))
+        self.deadline_edit.setCalendarPopup(True)
+        self.deadline_edit.setEnabled(False)
+        self.deadline_chk.toggled.connect(self.deadline_edit.setEnabled)
+
+        # взносы — переводы с категорией накоплений или на счёт-копилку
+        self.link_box = QComboBox()
+        for c in ref.categories:
+            if c.kind == CategoryKind.SAVINGS.value:
+                self.link_box.addItem(f"Категория: {c.name}", ("category", c.id))
+        for a in ref.active_accounts():
+            self.link_box.addItem(f"Счёт: {a.name}", ("account", a.id))
+
+        deadline_row = QHBoxLayout()
+        deadline_row.addWidget(self.deadline_chk)
+        deadline_row.addWidget(self.deadline_edit)
+
+        form = QFormLayout()
+        form.addRow("Название:", self.name_inp)
+        form.addRow("Сумма (₽):", self.target_inp)
+        form.addRow("Срок:", deadline_row)
+        form.addRow("Взносы — это:", self.link_box)
+
+        self.btn_ok = QPushButton("Сохранить")
+        self.btn_cancel = QPushButton("Отмена")
+        self.btn_ok.clicked.connect(self.accept)
+        self.btn_cancel.clicked.connect(self.reject)
+
+        btns = QHBoxLayout()
+        btns.addStretch(1)
+        btns.addWidget(self.btn_cancel)
+        btns.addWidget(self.btn_ok)
+
+        root = QVBoxLayout()
+        root.addLayout(form)
+        root.addLayout(btns)
+        self.setLayout(root)
+
+    def get_data(self) -> dict:
+        link = self.link_box.currentData()
+        return {
+            "name": self.name_inp.text(),
+            "target_cents": parse_rub_to_cents(self.target_inp.text()),
+            "deadline": self.deadline_edit.date().toPython() if self.deadline_chk.isChecked() else None,
+            "category_id": link[1] if link and link[0] == "category" else None,
+            "account_id": link[1] if link and link[0] == "account" else None,
+        }
+
 
 class GoalsView(QWidget):
     def __init__(self, ctx: AppContext):
         super().__init__()
         self.ctx = ctx
+
+        self.title = QLabel("Цели")
+        self.btn_add = QPushButton("Добавить")
+        self.btn_delete = QPushButton("Удалить")
+
+        header = QHBoxLayout()
+        header.addWidget(self.title)
+        header.addStretch(1)
+        header.addWidget(self.btn_add)
+        header.addWidget(self.btn_delete)
+
+        self.table = QTableWidget(0, 8)
+        self.table.setHorizontalHeaderLabels(
+            ["ID", "Цель", "Прогресс", "Накоплено", "Осталось", "Срок", "Темп", "Прогноз"]
+        )
+        self.table.setColumnHidden(0, True)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        self.table.setEditTriggers(self.table.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(self.table.SelectionBehavior.SelectRows)
+
+        self.lbl_hint = QLabel(
+            f"Темп — средний взнос в месяц за последние {GOAL_VELOCITY_DAYS} дней; прогноз — дата достижения при таком темпе."
+        )
+
         layout = QVBoxLayout()
-        layout.addWidget(QLabel("Goals (скоро)"))
-        layout.addStretch(1)
+        layout.addLayout(header)
+        layout.addWidget(self.table)
+        layout.addWidget(self.lbl_hint)
         self.setLayout(layout)
+
+        self.btn_add.clicked.connect(self.add_goal)
+        self.btn_delete.clicked.connect(self.delete_selected)
+        self.ctx.signals.ui_data_changed.connect(self.refresh)
+
+        self.refresh()
+
+    def refresh(self):
+        with self.ctx.open_session() as session:
+            rows = goal_progress(GoalsRepo(session))
+
+        self.table.setRowCount(len(rows))
+        for r, g in enumerate(rows):
+            bar = QProgressBar()
+            bar.setRange(0, 1000)
+            bar.setValue(int(g.percent * 10))
+            bar.setFormat(f"{g.percent:.0f}% из {format_rub(g.target_cents)}")
+
+            if g.remaining_cents == 0:
+                forecast = "достигнута"
+            elif g.projected_date is None:
+                forecast = "нет взносов"
+            else:
+                forecast = f"{g.projected_date:%d.%m.%Y}"
+                if g.on_track is False:
+                    forecast += f" — не успеваем, нужно {format_rub(g.needed_per_month_cents)}/мес"
+
+            values = [
+                str(g.goal_id),
+                g.name,
+                "",
+                format_rub(g.saved_cents),
+                format_rub(g.remaining_cents),
+                f"{g.deadline:%d.%m.%Y}" if g.deadline else "—",
+                f"{format_rub(g.per_month_cents)}/мес",
+                forecast,
+            ]
+            for c, text in enumerate(values):
+                self.table.setItem(r, c, QTableWidgetItem(text))
+            self.table.setCellWidget(r, 2, bar)
+
+    def _selected_goal_id(self) -> int | None:
+        row = self.table.currentRow()
+        if row < 0:
+            return None
+        return int(self.table.item(row, 0).text())
+
+    def add_goal(self):
+        dlg = GoalDialog(self.ctx, self)
+        if dlg.exec() != QDialog.DialogCode.Accepted:
+            return
+        try:
+            with self.ctx.open_session() as session:
+                add_goal(GoalsRepo(session), **dlg.get_data())
+        except ValueError as e:
+            QMessageBox.warning(self, "Ошибка", str(e))
+            return
+        self.refresh()
+
+    def delete_selected(self):
+        goal_id = self._selected_goal_id()
+        if goal_id is None:
+            QMessageBox.information(self, "Выбор", "Выбери цель в таблице.")
+            return
+        if QMessageBox.question(self, "Подтверждение", "Удалить цель? Переводы останутся.") != QMessageBox.StandardButton.Yes:
+            return
+        with self.ctx.open_session() as session:
+            GoalsRepo(session).delete(goal_id)
+        self.refresh()
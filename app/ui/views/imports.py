@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QDialog, QFormLayout, QComboBox, QSpinBox, QMessageBox,
+)
+
+from app.ui.app_context import AppContext
+from app.application.money import format_rub
+from app.application.services.categorization import load_categorizer
+from app.application.services.imports import (
+    DUPLICATE_DATE_WINDOW_DAYS,
+    ImportResult,
+    StatementRow,
+    find_duplicates,
+    import_statement,
+)
+from app.domain.enums import CategoryKind
+from app.infrastructure.repositories.category_rules import CategoryRulesRepo
+from app.infrastructure.repositories.transactions import TransactionsRepo
+
+
+class ImportStatementDialog(QDialog):
+    """
+    Импорт разобранной выписки на выбранный счёт. Число дубликатов
+    пересчитывается при смене счёта или окна дат — до записи в базу.
+    """
+
+    def __init__(self, ctx: AppContext, path: Path, rows: list[StatementRow], parent: QWidget | None = None):
+        super().__init__(parent)
+        self.ctx = ctx
+        self.rows = rows
+        self.result_: ImportResult | None = None
+
+        self.setWindowTitle(f"Импорт: {path.name}")
+        self.setMinimumWidth(480)
+
+        ref = ctx.reference_data()
+        self.account_box = QComboBox()
+        for a in ref.active_accounts():
+            self.account_box.addItem(a.name, a.id)
+        self.expense_box = QComboBox()
+        self.income_box = QComboBox()
+        for c in ref.categories:
+            if c.kind == CategoryKind.EXPENSE.value:
+                self.expense_box.addItem(c.name, c.id)
+            elif c.kind == CategoryKind.INCOME.value:
+                self.income_box.addItem(c.name, c.id)
+
+        self.window_spin = QSpinBox()
+        self.window_spin.setRange(0, 10)
+        self.window_spin.setValue(DUPLICATE_DATE_WINDOW_DAYS)
+        self.window_spin.setSuffix(" дн.")
+
+        outflow = sum(-r.amount_cents for r in rows if r.amount_cents < 0)
+        inflow = sum(r.amount_cents for r in rows if r.amount_cents > 0)
+        period = f"{min(r.occurred_at for r in rows):%d.%m.%Y} — {max(r.occurred_at for r in rows):%d.%m.%Y}"
+        self.lbl_summary = QLabel(
+            f"Строк: {len(rows)} ({period}), списания {format_rub(outflow)}, поступления {format_rub(inflow)}"
+        )
+        self.lbl_dups = QLabel("")
+
+        form = QFormLayout()
+        form.addRow("Счёт:", self.account_box)
+        form.addRow("Категория расходов (если не подошли правила):", self.expense_box)
+        form.addRow("Категория доходов (если не подошли правила):", self.income_box)
+        form.addRow("Дубликат, если дата отличается не более чем на:", self.window_spin)
+
+        self.btn_ok = QPushButton("Импортировать")
+        self.btn_cancel = QPushButton("Отмена")
+        self.btn_ok.clicked.connect(self.do_import)
+        self.btn_cancel.clicked.connect(self.reject)
+
+        btns = QHBoxLayout()
+        btns.addStretch(1)
+        btns.addWidget(self.btn_cancel)
+        btns.addWidget(self.btn_ok)
+
+        root = QVBoxLayout()
+        root.addWidget(self.lbl_summary)
+        root.addLayout(form)
+        root.addWidget(self.lbl_dups)
+        root.addLayout(btns)
+        self.setLayout(root)
+
+        self.account_box.currentIndexChanged.connect(self.update_duplicates)
+        self.window_spin.valueChanged.connect(self.update_duplicates)
+        self.update_duplicates()
+
+    def update_duplicates(self):
+        account_id = self.account_box.currentData()
+        if account_id is None:
+            self.lbl_dups.setText("Нет активных счетов.")
+            return
+        with self.ctx.open_session() as session:
+            matched = find_duplicates(TransactionsRepo(session), int(account_id), self.rows, self.window_spin.value())
+        dups = sum(1 for m in matched if m is not None)
+        self.lbl_dups.setText(f"Уже есть в базе (будут пропущены): {dups}, новых: {len(self.rows) - dups}")
+
+    def do_import(self):
+        account_id = self.account_box.currentData()
+        expense_id = self.expense_box.currentData()
+        income_id = self.income_box.currentData()
+        if account_id is None:
+            QMessageBox.warning(self, "Ошибка", "Выбери счёт.")
+            return
+        if expense_id is None or income_id is None:
+            QMessageBox.warning(self, "Ошибка", "Нужны категории расходов и доходов (создай их в разделе Категории).")
+            return
+
+        with self.ctx.open_session() as session:
+            # категории по правилам; выбранные выше — для строк, к которым правила не подошли
+            categorizer = load_categorizer(CategoryRulesRepo(session), self.ctx.report_cache)
+            self.result_ = import_statement(
+                TransactionsRepo(session),
+                int(account_id),
+                self.rows,
+                int(expense_id),
+                int(income_id),
+                self.window_spin.value(),
+                categorizer=categorizer,
+            )
+        self.accept()
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from PySide6.QtCore import QDate
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QTableWidget, QTableWidgetItem, QHeaderView, QTabWidget,
+    QDialog, QDateEdit, QSpinBox, QMessageBox
+)
+
+from app.ui.app_context import AppContext
+from app.application.money import format_rub
+from app.application.services.imports import StatementRow
+from app.application.services.reconciliation import (
+    RECONCILE_DATE_WINDOW_DAYS,
+    ReconciliationReport,
+    mark_reconciled,
+    reconcile,
+)
+from app.infrastructure.repositories.transactions import TransactionsRepo
+
+
+def _table(headers: list[str]) -> QTableWidget:
+    table = QTableWidget(0, len(headers))
+    table.setHorizontalHeaderLabels(headers)
+    table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+    table.horizontalHeader().setStretchLastSection(True)
+    table.setEditTriggers(table.EditTrigger.NoEditTriggers)
+    table.setSelectionBehavior(table.SelectionBehavior.SelectRows)
+    return table
+
+
+def _fill(table: QTableWidget, rows: list[list[str]]) -> None:
+    table.setRowCount(len(rows))
+    for r, values in enumerate(rows):
+        for c, text in enumerate(values):
+            table.setItem(r, c, QTableWidgetItem(text))
+
+
+class ReconcileDialog(QDialog):
+    """
+    Сверка счёта с выпиской: что совпало, чего нет в учёте и что есть
+    в учёте, но не в выписке. Совпавшие можно отметить сверенными —
+    в следующий раз они не попадут в отчёт.
+    """
+
+    def __init__(
+        self,
+        ctx: AppContext,
+        account_id: int,
+        account_name: str,
+        path: Path,
+        rows: list[StatementRow],
+        parent: QWidget | None = None,
+    ):
+        super().__init__(parent)
+        self.ctx = ctx
+        self.account_id = account_id
+        self.rows = rows
+        self.report: ReconciliationReport | None = None
+
+        self.setWindowTitle(f"Сверка: {account_name} — {path.name}")
+        self.resize(900, 600)
+
+        first = min(r.occurred_at for r in rows)
+        last = max(r.occurred_at for r in rows)
+        self.date_from = QDateEdit(QDate(first.year, first.month, first.day))
+        self.date_from.setCalendarPopup(True)
+        self.date_to = QDateEdit(QDate(last.year, last.month, last.day))
+        self.date_to.setCalendarPopup(True)
+        self.window_spin = QSpinBox()
+        self.window_spin.setRange(0, 10)
+        self.window_spin.setValue(RECONCILE_DATE_WINDOW_DAYS)
+        self.window_spin.setSuffix(" дн.")
+        self.btn_run = QPushButton("Сверить")
+
+        header = QHBoxLayout()
+        header.addWidget(QLabel("С:"))
+        header.addWidget(self.date_from)
+        header.addWidget(QLabel("По:"))
+        header.addWidget(self.date_to)
+        header.addWidget(QLabel("Расхождение дат до:"))
+        header.addWidget(self.window_spin)
+        header.addWidget(self.btn_run)
+        header.addStretch(1)
+
+        self.lbl_summary = QLabel("")
+
+        self.matched_table = _table(["Дата в выписке", "Дата в учёте", "Сумма", "Описание", "Заметка в учёте"])
+        self.missing_table = _table(["Дата", "Сумма", "Описание"])
+        self.extra_table = _table(["ID", "Дата", "Сумма", "Заметка"])
+        self.tabs = QTabWidget()
+        self.tabs.addTab(self.matched_table, "Совпало")
+        self.tabs.addTab(self.missing_table, "Нет в учёте")
+        self.tabs.addTab(self.extra_table, "Нет в выписке")
+
+        self.btn_mark = QPushButton("Отметить совпавшие сверенными")
+        self.btn_close = QPushButton("Закрыть")
+        btns = QHBoxLayout()
+        btns.addStretch(1)
+        btns.addWidget(self.btn_mark)
+        btns.addWidget(self.btn_close)
+
+        root = QVBoxLayout()
+        root.addLayout(header)
+        root.addWidget(self.lbl_summary)
+        root.addWidget(self.tabs)
+        root.addLayout(btns)
+        self.setLayout(root)
+
+        self.btn_run.clicked.connect(self.run)
+        self.btn_mark.clicked.connect(self.mark_matched)
+        self.btn_close.clicked.connect(self.accept)
+
+        self.run()
+
+    def run(self):
+        start = self.date_from.date().toPython()
+        end = self.date_to.date().toPython()
+        if start > end:
+            QMessageBox.warning(self, "Ошибка", "Дата начала позже даты окончания.")
+            return
+        try:
+            with self.ctx.open_session() as session:
+                self.report = reconcile(
+                    TransactionsRepo(session), self.account_id, self.rows, start, end, self.window_spin.value()
+                )
+        except ValueError as e:
+            QMessageBox.warning(self, "Ошибка", str(e))
+            return
+        self._show(self.report)
+
+    def _show(self, rep: ReconciliationReport):
+        _fill(self.matched_table, [
+            [f"{row.occurred_at:%d.%m.%Y}", f"{item.occurred_at:%d.%m.%Y}", format_rub(row.amount_cents), row.note or "", item.note or ""]
+            for row, item in rep.matched
+        ])
+        _fill(self.missing_table, [
+            [f"{row.occurred_at:%d.%m.%Y}", format_rub(row.amount_cents), row.note or ""]
+            for row in rep.missing
+        ])
+        _fill(self.extra_table, [
+            [str(item.id), f"{item.occurred_at:%d.%m.%Y}", format_rub(item.amount_cents), item.note or ""]
+            for item in rep.extra
+        ])
+        self.tabs.setTabText(0, f"Совпало ({len(rep.matched)})")
+        self.tabs.setTabText(1, f"Нет в учёте ({len(rep.missing)})")
+        self.tabs.setTabText(2, f"Нет в выписке ({len(rep.extra)})")
+        self.lbl_summary.setText(
+            f"Сверено ранее: {rep.already_reconciled}. "
+            f"Расхождение (выписка − учёт): {format_rub(rep.difference_cents)}"
+        )
+        self.btn_mark.setEnabled(bool(rep.matched))
+
+    def mark_matched(self):
+        if self.report is None or not self.report.matched:
+            return
+        with self.ctx.open_session() as session:
+            n = mark_reconciled(TransactionsRepo(session), self.report)
+        QMessageBox.information(self, "Сверка", f"Отмечено сверенными: {n}")
+        self.ctx.signals.ui_data_changed.emit()
+        self.run()
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+from PySide6.QtCore import QDate
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
+    QTableWidget, QTableWidgetItem, QHeaderView,
+    QDialog, QFormLayout, QLineEdit, QComboBox, QDateEdit, QMessageBox
+)
+
+from app.ui.app_context import AppContext
+from app.application.money import format_rub
+from app.application.services.recurring import RRULE_PRESETS, add_recurring_rule, materialize_due
+from app.domain.enums import CategoryKind, TransactionType
+from app.infrastructure.repositories.recurring import RecurringRulesRepo
+from app.infrastructure.repositories.transactions import TransactionsRepo
+from app.ui.views.transactions import TYPE_LABELS, parse_rub_to_cents
+
+# какие категории предлагать для типа операции (как в TxDialog)
+_CATEGORY_KIND = {
+    TransactionType.EXPENSE.value: CategoryKind.EXPENSE.value,
+    TransactionType.INCOME.value: CategoryKind.INCOME.value,
+    TransactionType.TRANSFER.value: CategoryKind.SAVINGS.value,
+}
+_CUSTOM = "Своё (RRULE)…"
+
+
+class AddRecurringDialog(QDialog):
+    def __init__(self, ctx: AppContext, parent: QWidget | None = None):
+        super().__init__(parent)
+        self.setWindowTitle("Повторяющаяся операция")
+        self.setMinimumWidth(460)
+
+        self.ref = ctx.reference_data()
+        self.name_inp = QLineEdit()
+        self.name_inp.setPlaceholderText("Например: Аренда")
+
+        self.type_box = QComboBox()
+        for tx_type in (TransactionType.EXPENSE, TransactionType.INCOME, TransactionType.TRANSFER):
+            self.type_box.addItem(TYPE_LABELS[tx_type.value], tx_type.value)
+
+        self.account_box = QComboBox()
+        self.to_account_box = QComboBox()
+        for a in self.ref.active_accounts():
+            self.account_box.addItem(a.name, a.id)
+            self.to_account_box.addItem(a.name, a.id)
+        self.category_box = QComboBox()
+
+        self.amount_inp = QLineEdit()
+        self.amount_inp.setPlaceholderText("Например: 35000")
+        self.note_inp = QLineEdit()
+        self.note_inp.setPlaceholderText("по умолчанию — название")
+
+        self.schedule_box = QComboBox()
+        for label, rule in RRULE_PRESETS.items():
+            self.schedule_box.addItem(label, rule)
+        self.schedule_box.addItem(_CUSTOM, None)
+        self.rrule_inp = QLineEdit()
+        self.rrule_inp.setPlaceholderText("FREQ=MONTHLY;BYMONTHDAY=5")
+        self.rrule_inp.setEnabled(False)
+
+        self.dtstart = QDateEdit(QDate.currentDate())
+        self.dtstart.setCalendarPopup(True)
+
+        form = QFormLayout()
+        form.addRow("Название:", self.name_inp)
+        form.addRow("Тип:", self.type_box)
+        form.addRow("Счёт:", self.account_box)
+        form.addRow("Куда (для перевода):", self.to_account_box)
+        form.addRow("Категория:", self.category_box)
+        form.addRow("Сумма (₽):", self.amount_inp)
+        form.addRow("Заметка:", self.note_inp)
+        form.addRow("Повторять:", self.schedule_box)
+        form.addRow("RRULE:", self.rrule_inp)
+        form.addRow("Начиная с:", self.dtstart)
+
+        self.btn_ok = QPushButton("Добавить")
+        self.btn_cancel = QPushButton("Отмена")
+        self.btn_ok.clicked.connect(self.accept)
+        self.btn_cancel.clicked.connect(self.reject)
+
+        btns = QHBoxLayout()
+        btns.addStretch(1)
+        btns.addWidget(self.btn_cancel)
+        btns.addWidget(self.btn_ok)
+
+        root = QVBoxLayout()
+        root.addLayout(form)
+        root.addLayout(btns)
+        self.setLayout(root)
+
+        self.type_box.currentIndexChanged.connect(self._apply_type)
+        self.schedule_box.currentIndexChanged.connect(
+            lambda *_: self.rrule_inp.setEnabled(self.schedule_box.currentData() is None)
+        )
+        self._apply_type()
+
+    def _apply_type(self):
+        tx_type = self.type_box.currentData()
+        self.to_account_box.setEnabled(tx_type == TransactionType.TRANSFER.value)
+        self.category_box.clear()
+        if tx_type == TransactionType.TRANSFER.value:
+            self.category_box.addItem("— без категории —", None)
+        for c in self.ref.categories:
+            if c.kind == _CATEGORY_KIND[tx_type]:
+                self.category_box.addItem(c.name, c.id)
+
+    def get_data(self) -> dict:
+        tx_type = self.type_box.currentData()
+        rrule = self.schedule_box.currentData()
+        return {
+            "name": self.name_inp.text(),
+            "tx_type": tx_type,
+            "account_id": self.account_box.currentData(),
+            "to_account_id": self.to_account_box.currentData() if tx_type == TransactionType.TRANSFER.value else None,
+            "category_id": self.category_box.currentData(),
+            "amount_cents": parse_rub_to_cents(self.amount_inp.text()),
+            "note": self.note_inp.text(),
+            "rrule": rrule if rrule is not None else self.rrule_inp.text(),
+            "dtstart": self.dtstart.date().toPython(),
+        }
+
+
+class RecurringRulesDialog(QDialog):
+    """
+    Повторяющиеся операции. Вхождения по сегодняшний день проводятся
+    при запуске приложения и по кнопке «Провести сейчас».
+    """
+
+    def __init__(self, ctx: AppContext, parent: QWidget | None = None):
+        super().__init__(parent)
+        self.ctx = ctx
+        self.setWindowTitle("Повторяющиеся операции")
+        self.resize(860, 420)
+
+        self.table = QTableWidget(0, 8)
+        self.table.setHorizontalHeaderLabels(
+            ["ID", "Название", "Тип", "Счёт", "Категория", "Сумма", "Расписание", "Проведено по"]
+        )
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.table.setEditTriggers(self.table.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(self.table.SelectionBehavior.SelectRows)
+        self.table.setColumnHidden(0, True)
+
+        self.btn_add = QPushButton("Добавить")
+        self.btn_delete = QPushButton("Удалить")
+        self.btn_run = QPushButton("Провести сейчас")
+        self.btn_close = QPushButton("Закрыть")
+        self.btn_add.clicked.connect(self.add_rule)
+        self.btn_delete.clicked.connect(self.delete_rule)
+        self.btn_run.clicked.connect(self.run_due)
+        self.btn_close.clicked.connect(self.accept)
+
+        btns = QHBoxLayout()
+        btns.addWidget(self.btn_add)
+        btns.addWidget(self.btn_delete)
+        btns.addWidget(self.btn_run)
+        btns.addStretch(1)
+        btns.addWidget(self.btn_close)
+
+        root = QVBoxLayout()
+        root.addWidget(self.table)
+        root.addLayout(btns)
+        self.setLayout(root)
+
+        self.refresh()
+
+    def refresh(self):
+        ref = self.ctx.reference_data()
+        accounts = ref.account_names()
+        cats = ref.category_names()
+        with self.ctx.open_session() as session:
+            rules = RecurringRulesRepo(session).list_all()
+
+        self.table.setRowCount(len(rules))
+        for r, rule in enumerate(rules):
+            account = accounts.get(rule.account_id, f"#{rule.account_id}")
+            if rule.to_account_id:
+                account += f" → {accounts.get(rule.to_account_id, f'#{rule.to_account_id}')}"
+            values = [
+                str(rule.id),
+                rule.name if rule.is_active else f"{rule.name} (выкл.)",
+                TYPE_LABELS.get(rule.type, rule.type),
+                account,
+                cats.get(rule.category_id, "") if rule.category_id else "",
+                format_rub(rule.amount_cents),
+                f"{rule.rrule} с {rule.dtstart:%d.%m.%Y}",
+                f"{rule.materialized_through:%d.%m.%Y}" if rule.materialized_through else "—",
+            ]
+            for c, text in enumerate(values):
+                self.table.setItem(r, c, QTableWidgetItem(text))
+
+    def add_rule(self):
+        dlg = AddRecurringDialog(self.ctx, self)
+        if dlg.exec() != QDialog.DialogCode.Accepted:
+            return
+        data = dlg.get_data()
+        if data["account_id"] is None:
+            QMessageBox.warning(self, "Ошибка", "Нет активных счетов.")
+            return
+        try:
+            with self.ctx.open_session() as session:
+                add_recurring_rule(RecurringRulesRepo(session), **data)
+        except ValueError as e:
+            QMessageBox.warning(self, "Ошибка", str(e))
+            return
+        self.refresh()
+
+    def delete_rule(self):
+        row = self.table.currentRow()
+        if row < 0:
+            QMessageBox.information(self, "Выбор", "Выбери правило в таблице.")
+            return
+        if QMessageBox.question(
+            self, "Подтверждение", "Удалить правило? Уже проведённые операции останутся."
+        ) != QMessageBox.StandardButton.Yes:
+            return
+        rule_id = int(self.table.item(row, 0).text())
+        with self.ctx.open_session() as session:
+            RecurringRulesRepo(session).delete(rule_id)
+        self.refresh()
+
+    def run_due(self):
+        try:
+            with self.ctx.open_session() as session:
+                n = materialize_due(RecurringRulesRepo(session), TransactionsRepo(session))
+        except ValueError as e:
+            QMessageBox.warning(self, "Ошибка", str(e))
+            return
+        QMessageBox.information(self, "Проведение", f"Добавлено операций: {n}")
+        self.refresh()
+        if n:
+            self.ctx.signals.ui_data_changed.emit()
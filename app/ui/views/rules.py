@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
+    QTableWidget, QTableWidgetItem, QHeaderView,
+    QDialog, QFormLayout, QLineEdit, QComboBox, QSpinBox, QMessageBox
+)
+
+from app.ui.app_context import AppContext
+from app.application.money import format_rub
+from app.application.services.categorization import add_rule
+from app.domain.enums import CategoryKind, RuleKind
+from app.infrastructure.repositories.category_rules import CategoryRulesRepo
+from app.ui.views.transactions import parse_rub_to_cents
+
+RULE_KIND_LABELS = {
+    RuleKind.KEYWORD.value: "Слово",
+    RuleKind.REGEX.value: "Regex",
+}
+
+
+class AddRuleDialog(QDialog):
+    def __init__(self, ctx: AppContext, parent: QWidget | None = None):
+        super().__init__(parent)
+        self.setWindowTitle("Добавить правило")
+        self.setMinimumWidth(460)
+
+        ref = ctx.reference_data()
+        self.category_box = QComboBox()
+        for c in sorted(ref.categories, key=lambda c: (c.kind, c.name.lower())):
+            if c.kind in (CategoryKind.EXPENSE.value, CategoryKind.INCOME.value):
+                prefix = "Расход" if c.kind == CategoryKind.EXPENSE.value else "Доход"
+                self.category_box.addItem(f"{prefix}: {c.name}", c.id)
+
+        self.kind_box = QComboBox()
+        self.kind_box.addItem("Заметка содержит слово", RuleKind.KEYWORD.value)
+        self.kind_box.addItem("Регулярное выражение", RuleKind.REGEX.value)
+
+        self.pattern_inp = QLineEdit()
+        self.pattern_inp.setPlaceholderText("Например: пятёрочка")
+        self.min_inp = QLineEdit()
+        self.min_inp.setPlaceholderText("не важно")
+        self.max_inp = QLineEdit()
+        self.max_inp.setPlaceholderText("не важно")
+
+        self.account_box = QComboBox()
+        self.account_box.addItem("Любой", None)
+        for a in ref.active_accounts():
+            self.account_box.addItem(a.name, a.id)
+
+        self.priority_spin = QSpinBox()
+        self.priority_spin.setRange(0, 1000)
+        self.priority_spin.setValue(100)
+
+        form = QFormLayout()
+        form.addRow("Категория:", self.category_box)
+        form.addRow("Условие:", self.kind_box)
+        form.addRow("Шаблон:", self.pattern_inp)
+        form.addRow("Сумма от (₽):", self.min_inp)
+        form.addRow("Сумма до (₽):", self.max_inp)
+        form.addRow("Счёт:", self.account_box)
+        form.addRow("Приоритет (меньше — раньше):", self.priority_spin)
+
+        self.btn_ok = QPushButton("Добавить")
+        self.btn_cancel = QPushButton("Отмена")
+        self.btn_ok.clicked.connect(self.accept)
+        self.btn_cancel.clicked.connect(self.reject)
+
+        btns = QHBoxLayout()
+        btns.addStretch(1)
+        btns.addWidget(self.btn_cancel)
+        btns.addWidget(self.btn_ok)
+
+        root = QVBoxLayout()
+        root.addLayout(form)
+        root.addLayout(btns)
+        self.setLayout(root)
+
+    def get_data(self) -> dict:
+        return {
+            "category_id": self.category_box.currentData(),
+            "kind": self.kind_box.currentData(),
+            "pattern": self.pattern_inp.text(),
+            "min_cents": parse_rub_to_cents(self.min_inp.text()),
+            "max_cents": parse_rub_to_cents(self.max_inp.text()),
+            "account_id": self.account_box.currentData(),
+            "priority": self.priority_spin.value(),
+        }
+
+
+class CategoryRulesDialog(QDialog):
+    """Правила автокатегоризации: применяются при импорте и по кнопке в «Операциях»."""
+
+    def __init__(self, ctx: AppContext, parent: QWidget | None = None):
+        super().__init__(parent)
+        self.ctx = ctx
+        self.setWindowTitle("Правила категорий")
+        self.resize(820, 420)
+
+        self.table = QTableWidget(0, 7)
+        self.table.setHorizontalHeaderLabels(["ID", "Приоритет", "Условие", "Шаблон", "Сумма", "Счёт", "Категория"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
+        self.table.setEditTriggers(self.table.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(self.table.SelectionBehavior.SelectRows)
+        self.table.setColumnHidden(0, True)
+
+        self.btn_add = QPushButton("Добавить")
+        self.btn_delete = QPushButton("Удалить")
+        self.btn_close = QPushButton("Закрыть")
+        self.btn_add.clicked.connect(self.add_rule)
+        self.btn_delete.clicked.connect(self.delete_rule)
+        self.btn_close.clicked.connect(self.accept)
+
+        btns = QHBoxLayout()
+        btns.addWidget(self.btn_add)
+        btns.addWidget(self.btn_delete)
+        btns.addStretch(1)
+        btns.addWidget(self.btn_close)
+
+        root = QVBoxLayout()
+        root.addWidget(self.table)
+        root.addLayout(btns)
+        self.setLayout(root)
+
+        self.refresh()
+
+    def refresh(self):
+        ref = self.ctx.reference_data()
+        accounts = ref.account_names()
+        cats = ref.category_names()
+        with self.ctx.open_session() as session:
+            rules = CategoryRulesRepo(session).list_all()
+
+        self.table.setRowCount(len(rules))
+        for r, rule in enumerate(rules):
+            if rule.min_cents is None and rule.max_cents is None:
+                amount = ""
+            else:
+                lo = format_rub(rule.min_cents) if rule.min_cents is not None else "…"
+                hi = format_rub(rule.max_cents) if rule.max_cents is not None else "…"
+                amount = f"{lo} — {hi}"
+            values = [
+                str(rule.id),
+                str(rule.priority),
+                RULE_KIND_LABELS.get(rule.kind, rule.kind),
+                rule.pattern or "",
+                amount,
+                accounts.get(rule.account_id, "") if rule.account_id else "любой",
+                cats.get(rule.category_id, f"#{rule.category_id}"),
+            ]
+            for c, text in enumerate(values):
+                self.table.setItem(r, c, QTableWidgetItem(text))
+
+    def add_rule(self):
+        dlg = AddRuleDialog(self.ctx, self)
+        if dlg.exec() != QDialog.DialogCode.Accepted:
+            return
+        data = dlg.get_data()
+        if data["category_id"] is None:
+            QMessageBox.warning(self, "Ошибка", "Нет категорий расходов или доходов.")
+            return
+        try:
+            with self.ctx.open_session() as session:
+                add_rule(CategoryRulesRepo(session), **data)
+        except ValueError as e:
+            QMessageBox.warning(self, "Ошибка", str(e))
+            return
+        self.refresh()
+        self.ctx.signals.ui_data_changed.emit()
+
+    def delete_rule(self):
+        row = self.table.currentRow()
+        if row < 0:
+            QMessageBox.information(self, "Выбор", "Выбери правило в таблице.")
+            return
+        rule_id = int(self.table.item(row, 0).text())
+        with self.ctx.open_session() as session:
+            CategoryRulesRepo(session).delete(rule_id)
+        self.refresh()
+        self.ctx.signals.ui_data_changed.emit()
@@ -1,11 +1,138 @@
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QLabel
+from __future__ import annotations
+
+from datetime import datetime
+
+from PySide6.QtCore import QThreadPool, QTimer
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QGroupBox, QFormLayout, QProgressBar, QMessageBox
+)
+
 from app.ui.app_context import AppContext
+from app.ui.workers import Worker
+from app.infrastructure.db.session import get_database_path
+from app.application.services.backup import (
+    archive_copies_dir, backup_config_from_env, backup_due, list_backups, run_backup,
+)
+
+# как часто проверяем, не пора ли сделать плановую копию
+BACKUP_CHECK_INTERVAL_MS = 10 * 60 * 1000
+# первая проверка — не сразу после запуска, чтобы не мешать загрузке экранов
+BACKUP_FIRST_CHECK_MS = 60 * 1000
+
 
 class SettingsView(QWidget):
     def __init__(self, ctx: AppContext):
         super().__init__()
         self.ctx = ctx
+
+        self.db_path = get_database_path()
+        self.backup_config = backup_config_from_env(self.db_path) if self.db_path else None
+        self._backup_worker: Worker | None = None
+        self._backup_scheduled = False
+
+        self.title = QLabel("Настройки")
+
+        # ===== Backup =====
+        self.backup_box = QGroupBox("Резервное копирование")
+        form = QFormLayout()
+        self.lbl_db = QLabel(str(self.db_path) if self.db_path else "— не файловая база —")
+        self.lbl_dir = QLabel(str(self.backup_config.backup_dir) if self.backup_config else "-")
+        self.lbl_policy = QLabel("-")
+        self.lbl_last = QLabel("-")
+        form.addRow("База:", self.lbl_db)
+        form.addRow("Каталог копий:", self.lbl_dir)
+        form.addRow("Политика:", self.lbl_policy)
+        form.addRow("Последняя копия:", self.lbl_last)
+
+        self.btn_backup = QPushButton("Создать копию сейчас")
+        self.progress = QProgressBar()
+        self.progress.setRange(0, 100)
+        self.progress.setValue(0)
+
+        row = QHBoxLayout()
+        row.addWidget(self.btn_backup)
+        row.addWidget(self.progress, 1)
+
+        vb = QVBoxLayout()
+        vb.addLayout(form)
+        vb.addLayout(row)
+        self.backup_box.setLayout(vb)
+
         layout = QVBoxLayout()
-        layout.addWidget(QLabel("Settings (скоро)"))
+        layout.addWidget(self.title)
+        layout.addWidget(self.backup_box)
         layout.addStretch(1)
         self.setLayout(layout)
+
+        self.btn_backup.clicked.connect(lambda: self.start_backup(scheduled=False))
+
+        if self.backup_config is None:
+            self.btn_backup.setEnabled(False)
+            return
+
+        cfg = self.backup_config
+        self.lbl_policy.setText(
+            f"каждые {cfg.interval_hours} ч, хранить {cfg.keep} шт., "
+            f"{'gzip' if cfg.compress else 'без сжатия'}, вместе с архивами закрытых лет"
+        )
+        self._refresh_last_backup()
+
+        # плановые копии
+        self._schedule_timer = QTimer(self)
+        self._schedule_timer.setInterval(BACKUP_CHECK_INTERVAL_MS)
+        self._schedule_timer.timeout.connect(self._maybe_scheduled_backup)
+        self._schedule_timer.start()
+        QTimer.singleShot(BACKUP_FIRST_CHECK_MS, self._maybe_scheduled_backup)
+
+    def _refresh_last_backup(self):
+        items = list_backups(self.backup_config, self.db_path)
+        if not items:
+            self.lbl_last.setText("ещё не было")
+            return
+        ts = datetime.fromtimestamp(items[0].stat().st_mtime)
+        self.lbl_last.setText(f"{items[0].name} ({ts:%d.%m.%Y %H:%M})")
+
+    def _maybe_scheduled_backup(self):
+        if self._backup_worker is None and backup_due(self.backup_config, self.db_path):
+            self.start_backup(scheduled=True)
+
+    def start_backup(self, scheduled: bool = False):
+        if self.backup_config is None or self._backup_worker is not None:
+            return
+
+        self.btn_backup.setEnabled(False)
+        self.progress.setValue(0)
+
+        worker = Worker(run_backup, self.db_path, self.backup_config, with_progress=True)
+        worker.signals.progress.connect(self._on_backup_progress)
+        worker.signals.finished.connect(self._on_backup_done)
+        worker.signals.failed.connect(self._on_backup_failed)
+        self._backup_worker = worker
+        self._backup_scheduled = scheduled
+        QThreadPool.globalInstance().start(worker)
+
+    def _on_backup_progress(self, done: int, total: int):
+        if total > 0:
+            self.progress.setValue(int(done * 100 / total))
+
+    def _on_backup_done(self, path):
+        self._backup_worker = None
+        self.btn_backup.setEnabled(True)
+        self.progress.setValue(100)
+        self._refresh_last_backup()
+        if not self._backup_scheduled:
+            msg = f"Резервная копия создана:\n{path}"
+            archives = archive_copies_dir(path)
+            if archives.is_dir():
+                msg += f"\nАрхивы закрытых лет:\n{archives}"
+            QMessageBox.information(self, "Готово", msg)
+
+    def _on_backup_failed(self, msg: str):
+        self._backup_worker = None
+        self.btn_backup.setEnabled(True)
+        self.progress.setValue(0)
+        if self._backup_scheduled:
+            self.lbl_last.setText(f"ошибка плановой копии: {msg}")
+        else:
+            QMessageBox.critical(self, "Ошибка", f"Не удалось создать резервную копию: {msg}")
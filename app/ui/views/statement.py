@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from PySide6.QtCore import QDate
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QTableWidget, QTableWidgetItem, QHeaderView,
+    QDialog, QDateEdit, QMessageBox
+)
+
+from app.ui.app_context import AppContext
+from app.application.money import format_rub
+from app.domain.enums import TransactionType
+from app.infrastructure.repositories.accounts import AccountsRepo
+from app.infrastructure.repositories.categories import CategoriesRepo
+from app.infrastructure.repositories.reports import StatementCursor
+
+PAGE_SIZE = 200
+
+
+class AccountStatementDialog(QDialog):
+    """
+    Выписка по счёту с остатком после каждой операции. Страницы подгружаются
+    при прокрутке вниз (keyset-курсор), можно перейти к произвольной дате.
+    """
+
+    def __init__(self, ctx: AppContext, account_id: int, account_name: str, parent: QWidget | None = None):
+        super().__init__(parent)
+        self.ctx = ctx
+        self.account_id = account_id
+        self._cursor: StatementCursor | None = None
+        self._exhausted = False
+        self._loading = False
+
+        self.setWindowTitle(f"Выписка: {account_name}")
+        self.resize(900, 600)
+
+        self.date_pick = QDateEdit()
+        self.date_pick.setCalendarPopup(True)
+        self.date_pick.setDate(QDate.currentDate())
+        self.btn_goto = QPushButton("Показать с даты")
+        self.btn_latest = QPushButton("С последних")
+        self.btn_more = QPushButton("Загрузить ещё")
+
+        header = QHBoxLayout()
+        header.addWidget(QLabel("По дату:"))
+        header.addWidget(self.date_pick)
+        header.addWidget(self.btn_goto)
+        header.addWidget(self.btn_latest)
+        header.addStretch(1)
+
+        self.table = QTableWidget(0, 6)
+        self.table.setHorizontalHeaderLabels(["Дата", "Тип", "Категория", "Откуда/куда · заметка", "Сумма", "Остаток"])
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
+        self.table.horizontalHeader().setSectionResizeMode(4, QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setSectionResizeMode(5, QHeaderView.ResizeToContents)
+        self.table.setEditTriggers(self.table.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(self.table.SelectionBehavior.SelectRows)
+
+        layout = QVBoxLayout()
+        layout.addLayout(header)
+        layout.addWidget(self.table)
+        layout.addWidget(self.btn_more)
+        self.setLayout(layout)
+
+        self.btn_goto.clicked.connect(self.goto_date)
+        self.btn_latest.clicked.connect(lambda: self.reload(None))
+        self.btn_more.clicked.connect(self.load_more)
+        self.table.verticalScrollBar().valueChanged.connect(self._on_scroll)
+
+        self._load_names()
+        self.reload(None)
+
+    def _load_names(self):
+        with self.ctx.open_session() as session:
+            self._accounts = {a.id: a.name for a in AccountsRepo(session).list_all()}
+            self._cats = {c.id: c.name for c in CategoriesRepo(session).list_all()}
+
+    def goto_date(self):
+        day = self.date_pick.date().toPython()
+        with self.ctx.open_reports_session() as session:
+            cursor = self.ctx.reports_repo(session).statement_cursor_at(self.account_id, day)
+        self.reload(cursor)
+
+    def reload(self, cursor: StatementCursor | None):
+        self.table.setRowCount(0)
+        self._cursor = cursor
+        self._exhausted = False
+        self.load_more()
+
+    def _on_scroll(self, value: int):
+        bar = self.table.verticalScrollBar()
+        if value >= bar.maximum() - 2:
+            self.load_more()
+
+    def load_more(self):
+        if self._exhausted or self._loading:
+            return
+        self._loading = True
+        try:
+            with self.ctx.open_reports_session() as session:
+                page = self.ctx.reports_repo(session).account_statement(self.account_id, self._cursor, PAGE_SIZE)
+            self._append(page)
+        except Exception as e:
+            QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить выписку: {e}")
+        finally:
+            self._loading = False
+
+    def _append(self, page):
+        self._cursor = page.next_cursor
+        self._exhausted = page.next_cursor is None
+        self.btn_more.setEnabled(not self._exhausted)
+
+        type_label = {
+            TransactionType.EXPENSE.value: "Расход",
+            TransactionType.INCOME.value: "Доход",
+            TransactionType.TRANSFER.value: "Перевод",
+        }
+
+        start = self.table.rowCount()
+        self.table.setRowCount(start + len(page.rows))
+        for i, row in enumerate(page.rows):
+            r = start + i
+            details = []
+            if row.counterparty_id:
+                arrow = "→" if row.amount_cents < 0 else "←"
+                details.append(f"{arrow} {self._accounts.get(row.counterparty_id, f'#{row.counterparty_id}')}")
+            if row.note:
+                details.append(row.note)
+
+            self.table.setItem(r, 0, QTableWidgetItem(str(row.occurred_at)))
+            self.table.setItem(r, 1, QTableWidgetItem(type_label.get(row.type, row.type)))
+            self.table.setItem(r, 2, QTableWidgetItem(self._cats.get(row.category_id, "") if row.category_id else ""))
+            self.table.setItem(r, 3, QTableWidgetItem(" · ".join(details)))
+            self.table.setItem(r, 4, QTableWidgetItem(format_rub(row.amount_cents)))
+            self.table.setItem(r, 5, QTableWidgetItem(format_rub(row.balance_cents)))
@@ -1,22 +1,47 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import date
+from pathlib import Path
+from typing import Callable
 
-from PySide6.QtCore import QDate, Qt, QTimer
+from PySide6.QtCore import QDate, Qt, QTimer, QThreadPool
 from PySide6.QtGui import QKeyEvent
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QTableWidget, QTableWidgetItem, QHeaderView,
-    QDialog, QFormLayout, QLineEdit, QComboBox, QMessageBox, QDateEdit, QGroupBox
+    QTableView, QHeaderView,
+    QDialog, QFormLayout, QLineEdit, QComboBox, QMessageBox, QDateEdit, QGroupBox,
+    QFileDialog, QInputDialog, QMenu,
 )
 
 from app.ui.app_context import AppContext
 from app.application.money import format_rub
 from app.infrastructure.repositories.accounts import AccountsRepo
 from app.infrastructure.repositories.categories import CategoriesRepo
-from app.infrastructure.repositories.transactions import TransactionsRepo
-from app.application.services.transactions import add_expense, add_income, add_transfer
+from app.infrastructure.repositories.transactions import TransactionsRepo, FilteredTotals
+from app.infrastructure.db.query_guard import QueryToken, QueryCancelled, QueryTimeout, guarded
+from app.application.services.transactions import (
+    add_expense, add_income, add_transfer,
+    bulk_set_category, bulk_move_to_account, bulk_shift_dates, bulk_delete,
+)
+from app.application.services.imports import read_statement
+from app.application.services.categorization import load_categorizer, recategorize
+from app.infrastructure.repositories.category_rules import CategoryRulesRepo
 from app.domain.enums import TransactionType, CategoryKind
+from app.ui.widgets.tables import TransactionsTableModel, TransactionsFilterProxy, TxRow
+from app.ui.workers import Worker
+from app.ui.views.imports import ImportStatementDialog
+
+# сколько операций загружаем из базы за раз
+TX_LIST_LIMIT = 2000
+# дольше этого запрос списка обрывается с просьбой уточнить фильтры
+TX_QUERY_BUDGET_S = 5.0
+
+TYPE_LABELS = {
+    TransactionType.EXPENSE.value: "Расход",
+    TransactionType.INCOME.value: "Доход",
+    TransactionType.TRANSFER.value: "Перевод",
+}
 
 
 def parse_rub_to_cents(text: str) -> int | None:
@@ -42,6 +67,88 @@ def parse_rub_to_cents(text: str) -> int | None:
         return None
 
 
+@dataclass(frozen=True)
+class TxLoadResult:
+    seq: int
+    needle: str
+    rows: list[TxRow] | None  # None — запрос отменён или прерван по времени
+    error: str | None = None
+
+
+@dataclass(frozen=True)
+class TxTotalsResult:
+    seq: int
+    totals: FilteredTotals | None  # None — запрос отменён или прерван по времени
+    error: str | None = None
+
+
+def build_tx_rows(txs, accounts: dict[int, str], cats: dict[int, str]) -> list[TxRow]:
+    def acc_name(acc_id_: int | None) -> str:
+        if not acc_id_:
+            return ""
+        return accounts.get(acc_id_, f"#{acc_id_}")
+
+    def cat_name(cat_id_: int | None) -> str:
+        if not cat_id_ or cat_id_ < 0:
+            return ""
+        return cats.get(cat_id_, f"#{cat_id_}")
+
+    rows = []
+    for t in txs:
+        if t.type == TransactionType.TRANSFER.value:
+            a1, a2 = acc_name(t.from_account_id), acc_name(t.to_account_id)
+        else:
+            a1, a2 = acc_name(t.account_id), ""
+        c1 = cat_name(t.category_id)
+        blob = "\n".join((t.type or "", a1, a2, c1, t.note or "")).lower()
+        rows.append(TxRow(
+            id=t.id,
+            occurred_at=t.occurred_at,
+            type=t.type,
+            type_label=TYPE_LABELS.get(t.type, t.type),
+            account=a1,
+            to_account=a2,
+            category=c1,
+            amount_cents=t.amount_cents,
+            search_blob=blob,
+        ))
+    return rows
+
+
+def load_tx_rows(
+    open_session: Callable,
+    seq: int,
+    token: QueryToken,
+    filters: dict,
+    needle: str,
+    accounts: dict[int, str],
+    cats: dict[int, str],
+) -> TxLoadResult:
+    """Выполняется в фоне; запрос прерывается по token (отмена или бюджет времени)."""
+    try:
+        with open_session() as session:
+            with guarded(session, token):
+                txs = TransactionsRepo(session).list_filtered(**filters, search=needle or None)
+    except QueryCancelled:
+        return TxLoadResult(seq, needle, None)
+    except QueryTimeout as e:
+        return TxLoadResult(seq, needle, None, error=str(e))
+    return TxLoadResult(seq, needle, build_tx_rows(txs, accounts, cats))
+
+
+def load_tx_totals(open_session: Callable, seq: int, token: QueryToken, filters: dict, needle: str) -> TxTotalsResult:
+    """Итоги по фильтру (без лимита строк); в фоне, независимо от загрузки списка."""
+    try:
+        with open_session() as session:
+            with guarded(session, token):
+                totals = TransactionsRepo(session).filtered_totals(**filters, search=needle or None)
+    except QueryCancelled:
+        return TxTotalsResult(seq, None)
+    except QueryTimeout as e:
+        return TxTotalsResult(seq, None, error=str(e))
+    return TxTotalsResult(seq, totals)
+
+
 def cents_to_rub_str(amount_cents: int) -> str:
     rub = abs(amount_cents) // 100
     kop = abs(amount_cents) % 100
@@ -222,6 +329,20 @@ class TransactionsView(QWidget):
         self.btn_add = QPushButton("Добавить")
         self.btn_edit = QPushButton("Редактировать")
         self.btn_delete = QPushButton("Удалить")
+        self.btn_import = QPushButton("Импорт…")
+        self.btn_recurring = QPushButton("Повторяющиеся…")
+        self.btn_categorize = QPushButton("По правилам")
+        self.btn_categorize.setToolTip("Проставить категории выбранным операциям по правилам")
+
+        # массовые правки выделенных строк (то же меню — по правому клику)
+        self.bulk_menu = QMenu(self)
+        self.bulk_menu.addAction("Сменить категорию…", self.bulk_category)
+        self.bulk_menu.addAction("Перенести на счёт…", self.bulk_move)
+        self.bulk_menu.addAction("Сдвинуть дату…", self.bulk_shift)
+        self.bulk_menu.addSeparator()
+        self.bulk_menu.addAction("Удалить", self.delete_tx)
+        self.btn_bulk = QPushButton("Выбранные")
+        self.btn_bulk.setMenu(self.bulk_menu)
 
         header = QHBoxLayout()
         header.addWidget(self.title)
@@ -229,6 +350,10 @@ class TransactionsView(QWidget):
         header.addWidget(self.btn_add)
         header.addWidget(self.btn_edit)
         header.addWidget(self.btn_delete)
+        header.addWidget(self.btn_bulk)
+        header.addWidget(self.btn_categorize)
+        header.addWidget(self.btn_import)
+        header.addWidget(self.btn_recurring)
 
         # ===== Filters =====
         self.filters_box = QGroupBox("Фильтры")
@@ -275,8 +400,13 @@ class TransactionsView(QWidget):
         self.filters_box.setLayout(fb)
 
         # ===== Table =====
-        self.table = QTableWidget(0, 7)
-        self.table.setHorizontalHeaderLabels(["ID", "Дата", "Тип", "Счёт/Откуда", "Куда", "Категория", "Сумма"])
+        # строки держит модель, поиск по уже загруженным строкам — прокси
+        self.model = TransactionsTableModel(self)
+        self.proxy = TransactionsFilterProxy(self)
+        self.proxy.setSourceModel(self.model)
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
+        self.table.verticalHeader().setVisible(False)
         self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeToContents)
         self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeToContents)
         self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeToContents)
@@ -286,33 +416,63 @@ class TransactionsView(QWidget):
         self.table.horizontalHeader().setSectionResizeMode(6, QHeaderView.ResizeToContents)
         self.table.setEditTriggers(self.table.EditTrigger.NoEditTriggers)
         self.table.setSelectionBehavior(self.table.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(self.table.SelectionMode.ExtendedSelection)
+        self.table.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.table.setColumnHidden(0, True)
 
         # ✅ сортировка по колонкам
         self.table.setSortingEnabled(True)
+        self.table.sortByColumn(1, Qt.SortOrder.DescendingOrder)
+
+        self.lbl_count = QLabel("")
+        self.lbl_totals = QLabel("")
+        footer = QHBoxLayout()
+        footer.addWidget(self.lbl_count)
+        footer.addStretch(1)
+        footer.addWidget(self.lbl_totals)
 
         # ===== Root layout =====
         layout = QVBoxLayout()
         layout.addLayout(header)
         layout.addWidget(self.filters_box)
         layout.addWidget(self.table)
+        layout.addLayout(footer)
         self.setLayout(layout)
 
+        # с какой строкой поиска загружены строки и не обрезаны ли они лимитом
+        self._loaded_needle: str | None = None
+        self._truncated = False
+
+        # загрузка идёт в фоне; новая отменяет предыдущую, ответы старых игнорируются
+        self._query_seq = 0
+        self._query_token: QueryToken | None = None
+        self._workers: dict[int, Worker] = {}
+        # итоги по фильтру считаются отдельным запросом по той же схеме
+        self._totals_seq = 0
+        self._totals_token: QueryToken | None = None
+        self._totals_workers: dict[int, Worker] = {}
+
         # debounce таймер на поиск
         self._search_timer = QTimer(self)
         self._search_timer.setSingleShot(True)
         self._search_timer.setInterval(250)
-        self._search_timer.timeout.connect(self.refresh)
+        self._search_timer.timeout.connect(self._on_search_changed)
 
         # Signals
         self.btn_add.clicked.connect(self.add_tx)
         self.btn_edit.clicked.connect(self.edit_tx)
         self.btn_delete.clicked.connect(self.delete_tx)
+        self.btn_import.clicked.connect(self.import_statement)
+        self.btn_recurring.clicked.connect(self.open_recurring)
+        self.btn_categorize.clicked.connect(self.categorize_selected)
 
         self.btn_reset.clicked.connect(self.reset_filters)
 
         # ✅ double click = edit
-        self.table.cellDoubleClicked.connect(lambda *_: self.edit_tx())
+        self.table.doubleClicked.connect(lambda *_: self.edit_tx())
+        self.table.customContextMenuRequested.connect(
+            lambda pos: self.bulk_menu.exec(self.table.viewport().mapToGlobal(pos))
+        )
 
         # ✅ автоприменение фильтров
         self.f_date_from.dateChanged.connect(lambda *_: self.refresh())
@@ -324,15 +484,21 @@ class TransactionsView(QWidget):
         # ✅ поиск с debounce
         self.f_search.textChanged.connect(lambda *_: self._search_timer.start())
 
-        self._load_filter_lists()
+        # справочники при старте — из кэша (если есть), свежие придут сигналом
+        self.ctx.signals.reference_data_changed.connect(self._on_reference_changed)
+        self._load_filter_lists(allow_stale=True)
         self.refresh()
 
-    def _load_filter_lists(self):
-        with self.ctx.open_session() as session:
-            acc_repo = AccountsRepo(session)
-            cat_repo = CategoriesRepo(session)
-            accounts = acc_repo.list_active()
-            cats = cat_repo.list_all()
+    def _load_filter_lists(self, allow_stale: bool = False):
+        ref = self.ctx.reference_data(allow_stale=allow_stale)
+        accounts = ref.active_accounts()
+        cats = sorted(ref.categories, key=lambda c: c.id, reverse=True)
+
+        # сохраняем выбор и не дёргаем refresh на каждое добавление пункта
+        acc_sel = self.f_account.currentData()
+        cat_sel = self.f_category.currentData()
+        self.f_account.blockSignals(True)
+        self.f_category.blockSignals(True)
 
         self.f_account.clear()
         self.f_account.addItem("Все счета", None)
@@ -344,6 +510,15 @@ class TransactionsView(QWidget):
         for c in cats:
             self.f_category.addItem(c.name, c.id)
 
+        self.f_account.setCurrentIndex(max(0, self.f_account.findData(acc_sel)) if acc_sel is not None else 0)
+        self.f_category.setCurrentIndex(max(0, self.f_category.findData(cat_sel)) if cat_sel is not None else 0)
+        self.f_account.blockSignals(False)
+        self.f_category.blockSignals(False)
+
+    def _on_reference_changed(self):
+        self._load_filter_lists(allow_stale=True)
+        self.refresh()
+
     def reset_filters(self):
         today = date.today()
         month_start = date(today.year, today.month, 1)
@@ -356,88 +531,150 @@ class TransactionsView(QWidget):
         self.refresh()
 
     def _selected_tx_id(self) -> int | None:
-        row = self.table.currentRow()
-        if row < 0:
-            return None
-        item = self.table.item(row, 0)
-        if not item:
-            return None
-        try:
-            return int(item.text())
-        except ValueError:
+        index = self.table.currentIndex()
+        if not index.isValid():
             return None
+        return self.model.row_at(self.proxy.mapToSource(index).row()).id
+
+    def _selected_tx_ids(self) -> list[int]:
+        rows = self.table.selectionModel().selectedRows()
+        return [self.model.row_at(self.proxy.mapToSource(i).row()).id for i in rows]
+
+    def _needle(self) -> str:
+        return (self.f_search.text() or "").strip().lower()
+
+    def _on_search_changed(self):
+        """
+        Если новая строка поиска уточняет ту, с которой загружены строки,
+        и загружено всё (без обрезки лимитом), — фильтруем в памяти.
+        Иначе (строку стёрли/заменили) — идём в базу.
+        """
+        needle = self._needle()
+        in_flight = self._query_token is not None
+        if not in_flight and self._loaded_needle is not None and not self._truncated and self._loaded_needle in needle:
+            self.proxy.set_needle(needle)
+            self._update_count()
+            self._refresh_totals(self._current_filters(), needle)
+        else:
+            self.refresh()
 
-    def refresh(self):
-        start = self.f_date_from.date().toPython()
-        end = self.f_date_to.date().toPython()
-        tx_type = self.f_type.currentData()
+    def _update_count(self):
+        shown = self.proxy.rowCount()
+        text = f"Показано: {shown}"
+        if self._truncated:
+            text += f" (первые {TX_LIST_LIMIT} — уточните фильтры)"
+        self.lbl_count.setText(text)
+
+    def _current_filters(self) -> dict:
         acc_id = self.f_account.currentData()
         cat_id = self.f_category.currentData()
-        needle = (self.f_search.text() or "").strip().lower()
+        return dict(
+            start=self.f_date_from.date().toPython(),
+            end=self.f_date_to.date().toPython(),
+            tx_type=self.f_type.currentData(),
+            account_id=int(acc_id) if acc_id is not None else None,
+            category_id=int(cat_id) if cat_id is not None else None,
+        )
 
-        with self.ctx.open_session() as session:
-            tx_repo = TransactionsRepo(session)
-            txs = tx_repo.list_filtered(
-                start=start,
-                end=end,
-                tx_type=tx_type,
-                account_id=int(acc_id) if acc_id is not None else None,
-                category_id=int(cat_id) if cat_id is not None else None,
-                limit=2000,
-            )
-
-            acc_repo = AccountsRepo(session)
-            cat_repo = CategoriesRepo(session)
-            accounts = {a.id: a.name for a in acc_repo.list_active()}
-            cats = {c.id: c.name for c in cat_repo.list_all()}
-
-        def acc_name(acc_id_: int | None) -> str:
-            if not acc_id_:
-                return ""
-            return accounts.get(acc_id_, f"#{acc_id_}")
-
-        def cat_name(cat_id_: int | None) -> str:
-            if not cat_id_ or cat_id_ < 0:
-                return ""
-            return cats.get(cat_id_, f"#{cat_id_}")
-
-        # ✅ быстрый поиск по отображаемым строкам (MVP)
-        if needle:
-            filtered = []
-            for t in txs:
-                t_type = t.type or ""
-                a1 = acc_name(t.account_id or t.from_account_id)
-                a2 = acc_name(t.to_account_id)
-                c1 = cat_name(t.category_id)
-                note = (t.note or "")
-                blob = f"{t_type} {a1} {a2} {c1} {note}".lower()
-                if needle in blob:
-                    filtered.append(t)
-            txs = filtered
-
-        self.table.setRowCount(0)
-        for r, t in enumerate(txs):
-            self.table.insertRow(r)
-
-            type_label = {
-                TransactionType.EXPENSE.value: "Расход",
-                TransactionType.INCOME.value: "Доход",
-                TransactionType.TRANSFER.value: "Перевод",
-            }.get(t.type, t.type)
-
-            self.table.setItem(r, 0, QTableWidgetItem(str(t.id)))
-            self.table.setItem(r, 1, QTableWidgetItem(str(t.occurred_at)))
-            self.table.setItem(r, 2, QTableWidgetItem(type_label))
-
-            if t.type == TransactionType.TRANSFER.value:
-                self.table.setItem(r, 3, QTableWidgetItem(acc_name(t.from_account_id)))
-                self.table.setItem(r, 4, QTableWidgetItem(acc_name(t.to_account_id)))
-            else:
-                self.table.setItem(r, 3, QTableWidgetItem(acc_name(t.account_id)))
-                self.table.setItem(r, 4, QTableWidgetItem(""))
+    def refresh(self):
+        """
+        Загружает операции в фоне. Ещё не завершившийся прежний запрос
+        прерывается: на экран попадает только результат последнего.
+        """
+        filters = self._current_filters()
+        needle = self._needle()
+        self._refresh_totals(filters, needle)
+
+        if self._query_token is not None:
+            self._query_token.cancel()
+        token = QueryToken(TX_QUERY_BUDGET_S)
+        self._query_token = token
+        self._query_seq += 1
+
+        ref = self.ctx.reference_data(allow_stale=True)
+        worker = Worker(
+            load_tx_rows,
+            self.ctx.open_session,
+            self._query_seq,
+            token,
+            dict(filters, limit=TX_LIST_LIMIT),
+            needle,
+            ref.account_names(),
+            ref.category_names(),
+        )
+        worker.signals.finished.connect(self._on_rows_loaded)
+        worker.signals.failed.connect(self._on_rows_failed)
+        self._workers[self._query_seq] = worker
+        self.lbl_count.setText("Загрузка…")
+        QThreadPool.globalInstance().start(worker)
+
+    def _on_rows_loaded(self, result: TxLoadResult):
+        self._workers.pop(result.seq, None)
+        if result.seq != self._query_seq:
+            return  # устаревший ответ
+        self._query_token = None
+        if result.rows is None:
+            if result.error:
+                self._show_query_error(f"{result.error} — уточните фильтры (период, счёт, категорию).")
+            return
 
-            self.table.setItem(r, 5, QTableWidgetItem(cat_name(t.category_id)))
-            self.table.setItem(r, 6, QTableWidgetItem(format_rub(t.amount_cents)))
+        # строки уже отфильтрованы базой по needle — прокси пропустит все
+        self.model.set_rows(result.rows)
+        self.proxy.set_needle(result.needle)
+        self._loaded_needle = result.needle
+        self._truncated = len(result.rows) >= TX_LIST_LIMIT
+        self._update_count()
+
+    def _on_rows_failed(self, msg: str):
+        signals = self.sender()
+        for seq, worker in list(self._workers.items()):
+            if worker.signals is signals:
+                del self._workers[seq]
+                if seq == self._query_seq:
+                    self._query_token = None
+                    self._show_query_error(f"Ошибка загрузки: {msg}")
+
+    def _refresh_totals(self, filters: dict, needle: str):
+        if self._totals_token is not None:
+            self._totals_token.cancel()
+        token = QueryToken(TX_QUERY_BUDGET_S)
+        self._totals_token = token
+        self._totals_seq += 1
+
+        worker = Worker(load_tx_totals, self.ctx.open_session, self._totals_seq, token, filters, needle)
+        worker.signals.finished.connect(self._on_totals_loaded)
+        worker.signals.failed.connect(self._on_totals_failed)
+        self._totals_workers[self._totals_seq] = worker
+        self.lbl_totals.setText("Итоги: считаем…")
+        QThreadPool.globalInstance().start(worker)
+
+    def _on_totals_loaded(self, result: TxTotalsResult):
+        self._totals_workers.pop(result.seq, None)
+        if result.seq != self._totals_seq:
+            return  # устаревший ответ
+        self._totals_token = None
+        t = result.totals
+        if t is None:
+            self.lbl_totals.setText("Итоги: не посчитаны (долгий запрос)" if result.error else "")
+            return
+        text = f"Операций: {t.count} · доходы {format_rub(t.income_cents)} · расходы {format_rub(t.expense_cents)}"
+        if t.transfer_cents:
+            text += f" · переводы {format_rub(t.transfer_cents)}"
+        self.lbl_totals.setText(text)
+
+    def _on_totals_failed(self, msg: str):
+        signals = self.sender()
+        for seq, worker in list(self._totals_workers.items()):
+            if worker.signals is signals:
+                del self._totals_workers[seq]
+                if seq == self._totals_seq:
+                    self._totals_token = None
+                    self.lbl_totals.setText(f"Итоги: ошибка ({msg})")
+
+    def _show_query_error(self, text: str):
+        # на экране строки прежних фильтров — уточнять поиск по ним в памяти нельзя
+        self._loaded_needle = None
+        self.lbl_count.setText(text)
 
     def keyPressEvent(self, event: QKeyEvent):
         if event.key() == Qt.Key.Key_Delete:
@@ -514,6 +751,9 @@ class TransactionsView(QWidget):
                 QMessageBox.warning(self, "Ошибка", "Операция не найдена.")
                 return
 
+            # то, с чем сверялась выписка: если изменилось — отметку сверки снимаем
+            reconciled_as = (tx.occurred_at, tx.amount_cents, tx.account_id, tx.from_account_id, tx.to_account_id)
+
             tx.occurred_at = payload["occurred_at"]
             tx.amount_cents = payload["amount_cents"]
             tx.note = payload["note"]
@@ -549,27 +789,153 @@ class TransactionsView(QWidget):
                 QMessageBox.warning(self, "Ошибка", f"Неизвестный режим: {mode}")
                 return
 
+            if (tx.occurred_at, tx.amount_cents, tx.account_id, tx.from_account_id, tx.to_account_id) != reconciled_as:
+                tx.reconciled_at = None
+
             tx_repo.commit()
 
         self.refresh()
         self.ctx.signals.ui_data_changed.emit()
 
     def delete_tx(self):
-        tx_id = self._selected_tx_id()
-        if not tx_id:
+        tx_ids = self._selected_tx_ids()
+        if not tx_ids:
             QMessageBox.information(self, "Выбор", "Выбери операцию в таблице.")
             return
 
-        if QMessageBox.question(self, "Подтверждение", "Удалить выбранную операцию?") != QMessageBox.StandardButton.Yes:
+        question = "Удалить выбранную операцию?" if len(tx_ids) == 1 else f"Удалить выбранные операции ({len(tx_ids)})?"
+        if QMessageBox.question(self, "Подтверждение", question) != QMessageBox.StandardButton.Yes:
             return
 
         with self.ctx.open_session() as session:
-            tx_repo = TransactionsRepo(session)
-            ok = tx_repo.delete(tx_id)
+            n = bulk_delete(TransactionsRepo(session), tx_ids)
 
-        if not ok:
+        if not n:
             QMessageBox.warning(self, "Ошибка", "Операция не найдена.")
             return
 
         self.refresh()
         self.ctx.signals.ui_data_changed.emit()
+
+    def _bulk_apply(self, title: str, action: Callable[[TransactionsRepo, list[int]], int], tx_ids: list[int]):
+        try:
+            with self.ctx.open_session() as session:
+                n = action(TransactionsRepo(session), tx_ids)
+        except ValueError as e:
+            QMessageBox.warning(self, "Ошибка", str(e))
+            return
+        skipped = len(tx_ids) - n
+        text = f"Изменено операций: {n}"
+        if skipped:
+            text += f"\nПропущено (не подходят по типу, архивные или уже удалены): {skipped}"
+        QMessageBox.information(self, title, text)
+        if n:
+            self.refresh()
+            self.ctx.signals.ui_data_changed.emit()
+
+    def _selected_or_warn(self) -> list[int]:
+        tx_ids = self._selected_tx_ids()
+        if not tx_ids:
+            QMessageBox.information(self, "Выбор", "Выбери операции в таблице (Ctrl+A — все).")
+        return tx_ids
+
+    def bulk_category(self):
+        tx_ids = self._selected_or_warn()
+        if not tx_ids:
+            return
+        prefixes = {
+            CategoryKind.EXPENSE.value: "Расход",
+            CategoryKind.INCOME.value: "Доход",
+            CategoryKind.SAVINGS.value: "Накопления",
+        }
+        choices = {
+            f"{prefixes.get(c.kind, c.kind)}: {c.name}": c.id
+            for c in sorted(self.ctx.reference_data().categories, key=lambda c: (c.kind, c.name.lower()))
+        }
+        if not choices:
+            QMessageBox.information(self, "Категории", "Категорий пока нет.")
+            return
+        label, ok = QInputDialog.getItem(
+            self, "Сменить категорию",
+            f"Категория для {len(tx_ids)} операций\n(ставится только операциям подходящего типа):",
+            list(choices), 0, False,
+        )
+        if ok:
+            self._bulk_apply("Сменить категорию", lambda repo, ids: bulk_set_category(repo, ids, choices[label]), tx_ids)
+
+    def bulk_move(self):
+        tx_ids = self._selected_or_warn()
+        if not tx_ids:
+            return
+        choices = {a.name: a.id for a in self.ctx.reference_data().active_accounts()}
+        if not choices:
+            QMessageBox.information(self, "Счета", "Нет активных счетов.")
+            return
+        name, ok = QInputDialog.getItem(
+            self, "Перенести на счёт",
+            f"Счёт для {len(tx_ids)} операций\n(у переводов меняется счёт списания):",
+            list(choices), 0, False,
+        )
+        if ok:
+            self._bulk_apply("Перенести на счёт", lambda repo, ids: bulk_move_to_account(repo, ids, choices[name]), tx_ids)
+
+    def bulk_shift(self):
+        tx_ids = self._selected_or_warn()
+        if not tx_ids:
+            return
+        days, ok = QInputDialog.getInt(
+            self, "Сдвинуть дату", f"На сколько дней сдвинуть {len(tx_ids)} операций (минус — назад):",
+            1, -3650, 3650,
+        )
+        if ok:
+            self._bulk_apply("Сдвинуть дату", lambda repo, ids: bulk_shift_dates(repo, ids, days), tx_ids)
+
+    def import_statement(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Импорт выписки", "", "Выписки (*.csv *.txt *.xlsx);;Все файлы (*)"
+        )
+        if not path:
+            return
+        try:
+            rows = read_statement(Path(path))
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Ошибка", f"Не удалось прочитать выписку: {e}")
+            return
+        if not rows:
+            QMessageBox.information(self, "Импорт", "В файле нет операций.")
+            return
+
+        dlg = ImportStatementDialog(self.ctx, Path(path), rows, self)
+        if dlg.exec() != QDialog.DialogCode.Accepted or dlg.result_ is None:
+            return
+        QMessageBox.information(
+            self,
+            "Импорт",
+            f"Добавлено операций: {dlg.result_.added}\nПропущено дубликатов: {dlg.result_.duplicates}",
+        )
+        self.refresh()
+        self.ctx.signals.ui_data_changed.emit()
+
+    def open_recurring(self):
+        # диалог сам берёт TYPE_LABELS/parse_rub_to_cents из этого модуля
+        from app.ui.views.recurring import RecurringRulesDialog
+
+        RecurringRulesDialog(self.ctx, self).exec()
+        self.refresh()
+
+    def categorize_selected(self):
+        tx_ids = self._selected_tx_ids()
+        if not tx_ids:
+            QMessageBox.information(self, "Выбор", "Выбери операции в таблице (Ctrl+A — все).")
+            return
+        with self.ctx.open_session() as session:
+            categorizer = load_categorizer(CategoryRulesRepo(session), self.ctx.report_cache)
+            if not categorizer.rules:
+                QMessageBox.information(self, "Правила", "Правил пока нет — добавь их в разделе Категории.")
+                return
+            changed = recategorize(TransactionsRepo(session), categorizer, tx_ids)
+
+        QMessageBox.information(self, "По правилам", f"Категория изменена у {changed} из {len(tx_ids)} операций.")
+        if changed:
+            self.refresh()
+            self.ctx.signals.ui_data_changed.emit()
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+from PySide6.QtCore import Qt, QRectF, QSize
+from PySide6.QtGui import QColor, QPainter
+from PySide6.QtWidgets import QWidget, QToolTip
+
+from app.application.money import format_rub
+
+# от «нет трат» до самых больших — как у календаря активности
+LEVEL_COLORS = ["#ebedf0", "#c6e48b", "#7bc96f", "#239a3b", "#196127"]
+MONTH_LABELS = ["янв", "фев", "мар", "апр", "май", "июн", "июл", "авг", "сен", "окт", "ноя", "дек"]
+WEEKDAY_LABELS = {0: "пн", 2: "ср", 4: "пт"}
+
+LEFT_PAD = 24
+TOP_PAD = 16
+GAP = 2
+
+
+class CalendarHeatmap(QWidget):
+    """
+    Календарь года: колонка — неделя, строка — день недели (пн..вс).
+    Данные приходят готовым массивом по дням (set_data); отрисовка
+    и подсказки при наведении считаются только из него, без запросов.
+    """
+
+    def __init__(self, parent: QWidget | None = None):
+        super().__init__(parent)
+        self.setMouseTracking(True)
+        self.setMinimumHeight(TOP_PAD + 7 * 12)
+
+        self._year = date.today().year
+        self._values: list[int] = []
+        self._levels: list[int] = []
+        self._offset = 0  # день недели 1 января (пн = 0)
+
+    def set_data(self, year: int, values: list[int]) -> None:
+        self._year = year
+        self._values = list(values)
+        self._offset = date(year, 1, 1).weekday()
+        self._levels = self._compute_levels(self._values)
+        self.update()
+
+    @staticmethod
+    def _compute_levels(values: list[int]) -> list[int]:
+        # пороги — квартили ненулевых дней, чтобы один крупный платёж не «выбелил» весь год
+        nonzero = sorted(v for v in values if v > 0)
+        if not nonzero:
+            return [0] * len(values)
+        n = len(nonzero)
+        bounds = [nonzero[min(n - 1, n * q // 4)] for q in (1, 2, 3)]
+        levels = []
+        for v in values:
+            if v <= 0:
+                levels.append(0)
+            else:
+                levels.append(1 + sum(1 for b in bounds if v > b))
+        return levels
+
+    def _weeks(self) -> int:
+        return (self._offset + len(self._values) + 6) // 7 or 53
+
+    def _cell_size(self) -> float:
+        w = (self.width() - LEFT_PAD) / self._weeks()
+        h = (self.height() - TOP_PAD) / 7
+        return max(4.0, min(w, h))
+
+    def _cell_rect(self, index: int, cell: float) -> QRectF:
+        slot = index + self._offset
+        col, row = divmod(slot, 7)
+        return QRectF(LEFT_PAD + col * cell, TOP_PAD + row * cell, cell - GAP, cell - GAP)
+
+    def _index_at(self, x: float, y: float) -> int | None:
+        cell = self._cell_size()
+        col = int((x - LEFT_PAD) // cell)
+        row = int((y - TOP_PAD) // cell)
+        if col < 0 or not 0 <= row < 7:
+            return None
+        index = col * 7 + row - self._offset
+        if 0 <= index < len(self._values):
+            return index
+        return None
+
+    def sizeHint(self) -> QSize:
+        return QSize(LEFT_PAD + 53 * 14, TOP_PAD + 7 * 14)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, False)
+        cell = self._cell_size()
+        colors = [QColor(c) for c in LEVEL_COLORS]
+
+        painter.setPen(self.palette().text().color())
+        for row, label in WEEKDAY_LABELS.items():
+            painter.drawText(QRectF(0, TOP_PAD + row * cell, LEFT_PAD - 4, cell), Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, label)
+
+        start = date(self._year, 1, 1)
+        for month in range(12):
+            index = (date(self._year, month + 1, 1) - start).days
+            x = LEFT_PAD + ((index + self._offset) // 7) * cell
+            painter.drawText(QRectF(x, 0, cell * 4, TOP_PAD), Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, MONTH_LABELS[month])
+
+        painter.setPen(Qt.PenStyle.NoPen)
+        for index, level in enumerate(self._levels):
+            painter.setBrush(colors[level])
+            painter.drawRect(self._cell_rect(index, cell))
+        painter.end()
+
+    def mouseMoveEvent(self, event):
+        pos = event.position()
+        index = self._index_at(pos.x(), pos.y())
+        if index is None:
+            QToolTip.hideText()
+            return
+        day = date(self._year, 1, 1) + timedelta(days=index)
+        QToolTip.showText(event.globalPosition().toPoint(), f"{day:%d.%m.%Y}: {format_rub(self._values[index])}", self)
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt
+
+from app.application.money import format_rub
+
+SORT_ROLE = Qt.ItemDataRole.UserRole
+
+
+@dataclass(frozen=True)
+class TxRow:
+    """Строка таблицы операций с уже подставленными названиями."""
+    id: int
+    occurred_at: date
+    type: str
+    type_label: str
+    account: str
+    to_account: str
+    category: str
+    amount_cents: int
+    # поля поиска в нижнем регистре через "\n" — подстрока не «склеивает» соседние поля,
+    # как и поиск в SQL (см. apply_tx_search)
+    search_blob: str
+
+
+class TransactionsTableModel(QAbstractTableModel):
+    HEADERS = ["ID", "Дата", "Тип", "Счёт/Откуда", "Куда", "Категория", "Сумма"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: list[TxRow] = []
+
+    def set_rows(self, rows: list[TxRow]) -> None:
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+
+    def row_at(self, row: int) -> TxRow:
+        return self._rows[row]
+
+    def blobs(self) -> list[str]:
+        return [r.search_blob for r in self._rows]
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        r = self._rows[index.row()]
+        col = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return (
+                str(r.id),
+                str(r.occurred_at),
+                r.type_label,
+                r.account,
+                r.to_account,
+                r.category,
+                format_rub(r.amount_cents),
+            )[col]
+        if role == SORT_ROLE:
+            # сортируем по значениям, а не по строкам («1 000 ₽» < «900 ₽» как текст)
+            return (
+                r.id,
+                r.occurred_at.toordinal(),
+                r.type_label,
+                r.account,
+                r.to_account,
+                r.category,
+                r.amount_cents,
+            )[col]
+        if role == Qt.ItemDataRole.TextAlignmentRole and col == 6:
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        return None
+
+
+class TransactionsFilterProxy(QSortFilterProxyModel):
+    """
+    Фильтр по подстроке поверх загруженных строк. Принятые строки
+    запоминаются: если новая строка поиска уточняет прежнюю (содержит её),
+    проверяются только они, а не весь набор.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setSortRole(SORT_ROLE)
+        self._needle = ""
+        self._accepted: set[int] | None = None  # None — принимаются все строки
+        self._dirty = False
+
+    def setSourceModel(self, model) -> None:
+        super().setSourceModel(model)
+        # новые строки — пересчёт по всему набору при первой проверке
+        model.modelAboutToBeReset.connect(self._mark_dirty)
+
+    def needle(self) -> str:
+        return self._needle
+
+    def set_needle(self, needle: str) -> None:
+        if needle == self._needle:
+            return
+        refines = not self._dirty and self._needle in needle
+        candidates = self._accepted if refines else None
+        self._needle = needle
+        self._recompute(candidates)
+        self.invalidateFilter()
+
+    def _mark_dirty(self) -> None:
+        self._dirty = True
+
+    def _recompute(self, candidates: set[int] | None) -> None:
+        self._dirty = False
+        if not self._needle:
+            self._accepted = None
+            return
+        blobs = self.sourceModel().blobs()
+        rows = range(len(blobs)) if candidates is None else candidates
+        needle = self._needle
+        self._accepted = {i for i in rows if needle in blobs[i]}
+
+    def filterAcceptsRow(self, source_row: int, source_parent) -> bool:
+        if self._dirty:
+            self._recompute(None)
+        return self._accepted is None or source_row in self._accepted
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from datetime import date
+
+import numpy as np
+from PySide6.QtCore import Qt, QPointF, QRectF, QSize
+from PySide6.QtGui import QColor, QPainter, QPainterPath, QPen, QPolygonF
+from PySide6.QtWidgets import QWidget
+
+from app.application.money import format_rub
+from app.infrastructure.analytics.columnar import day_number, day_to_date
+from app.infrastructure.analytics.downsample import lttb
+
+LEFT_PAD = 8
+RIGHT_PAD = 8
+TOP_PAD = 18
+BOTTOM_PAD = 18
+
+
+class TrendChart(QWidget):
+    """
+    Линейный график по дням. Полный ряд хранится в памяти, а рисуется
+    прореженный LTTB до ширины области графика в пикселях — время отрисовки
+    не зависит от длины истории. Прореженный ряд пересчитывается только
+    при смене данных или ширины.
+    """
+
+    def __init__(self, title: str, color: str = "#2b7bb9", parent: QWidget | None = None):
+        super().__init__(parent)
+        self.title = title
+        self.color = QColor(color)
+        self.setMinimumHeight(140)
+
+        self._x = np.empty(0)
+        self._y = np.empty(0)
+        self._cache_width = -1
+        self._sampled: tuple[np.ndarray, np.ndarray] = (self._x, self._y)
+
+    def set_series(self, days: list[date], values: list[int]) -> None:
+        self._x = np.fromiter((day_number(d) for d in days), dtype=np.float64, count=len(days))
+        self._y = np.asarray(values, dtype=np.float64)
+        self._cache_width = -1
+        self.update()
+
+    def sizeHint(self) -> QSize:
+        return QSize(600, 160)
+
+    def _plot_rect(self) -> QRectF:
+        return QRectF(
+            LEFT_PAD,
+            TOP_PAD,
+            max(1.0, self.width() - LEFT_PAD - RIGHT_PAD),
+            max(1.0, self.height() - TOP_PAD - BOTTOM_PAD),
+        )
+
+    def _sampled_series(self, width: int) -> tuple[np.ndarray, np.ndarray]:
+        if width != self._cache_width:
+            # по точке на пиксель (минимум 3 — иначе LTTB не прореживает)
+            self._sampled = lttb(self._x, self._y, max(3, width))
+            self._cache_width = width
+        return self._sampled
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+        text_color = self.palette().text().color()
+        painter.setPen(text_color)
+        painter.drawText(QRectF(LEFT_PAD, 0, self.width(), TOP_PAD), Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, self.title)
+
+        if len(self._x) < 2:
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "нет данных")
+            painter.end()
+            return
+
+        rect = self._plot_rect()
+        xs, ys = self._sampled_series(int(rect.width()))
+
+        x0, x1 = self._x[0], self._x[-1]
+        y0, y1 = float(self._y.min()), float(self._y.max())
+        sx = rect.width() / (x1 - x0)
+        sy = rect.height() / ((y1 - y0) or 1.0)
+        px = rect.left() + (xs - x0) * sx
+        py = rect.bottom() - (ys - y0) * sy
+
+        # нулевая линия, если ряд проходит через ноль
+        if y0 < 0 < y1:
+            zero_y = rect.bottom() + y0 * sy
+            painter.setPen(QPen(QColor("#bbbbbb"), 1, Qt.PenStyle.DashLine))
+            painter.drawLine(QPointF(rect.left(), zero_y), QPointF(rect.right(), zero_y))
+
+        path = QPainterPath()
+        path.addPolygon(QPolygonF([QPointF(a, b) for a, b in zip(px.tolist(), py.tolist())]))
+        painter.setPen(QPen(self.color, 1.5))
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        painter.drawPath(path)
+
+        painter.setPen(text_color)
+        painter.drawText(
+            QRectF(rect.left(), TOP_PAD, rect.width(), 14),
+            Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignTop,
+            f"макс. {format_rub(int(y1))}",
+        )
+        bottom = QRectF(rect.left(), rect.bottom() + 2, rect.width(), BOTTOM_PAD - 2)
+        painter.drawText(bottom, Qt.AlignmentFlag.AlignLeft, f"{day_to_date(int(x0)):%d.%m.%Y}")
+        painter.drawText(bottom, Qt.AlignmentFlag.AlignCenter, f"мин. {format_rub(int(y0))}")
+        painter.drawText(bottom, Qt.AlignmentFlag.AlignRight, f"{day_to_date(int(x1)):%d.%m.%Y}")
+        painter.end()
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from typing import Callable
+
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+
+class WorkerSignals(QObject):
+    """
+    progress(done, total) — промежуточный прогресс (если задача его сообщает)
+    finished(result) — результат задачи
+    failed(message) — текст исключения
+    """
+    progress = Signal(int, int)
+    finished = Signal(object)
+    failed = Signal(str)
+
+
+class Worker(QRunnable):
+    """
+    Выполняет fn(*args, **kwargs) в QThreadPool; результат приходит сигналами
+    в поток GUI. Если with_progress=True, в fn передаётся progress=callback.
+    Ссылку на worker.signals держит вызывающий код, пока задача не завершится.
+    """
+
+    def __init__(self, fn: Callable, *args, with_progress: bool = False, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        if with_progress:
+            self.kwargs["progress"] = self.signals.progress.emit
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(result)
@@ -0,0 +1,82 @@
+"""
+Общие фикстуры: база SQLite во временном каталоге со схемой из миграций
+(вместе с триггерами), по свежей копии на каждый тест. Соединения
+настраиваются как в приложении: SQL-функции и архивы закрытых лет.
+"""
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.application.services.categories import create_category
+from app.infrastructure.db import archive
+from app.infrastructure.db.functions import register_functions
+from app.infrastructure.db.models import Account, Category
+from app.infrastructure.repositories.categories import CategoriesRepo
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture(scope="session")
+def migrated_db(tmp_path_factory) -> Path:
+    path = tmp_path_factory.mktemp("schema") / "budget.sqlite3"
+    cfg = Config(str(ROOT / "alembic.ini"))
+    cfg.set_main_option("sqlalchemy.url", f"sqlite:///{path}")
+    command.upgrade(cfg, "head")
+    return path
+
+
+@pytest.fixture
+def db_path(migrated_db, tmp_path) -> Path:
+    path = tmp_path / "budget.sqlite3"
+    shutil.copyfile(migrated_db, path)
+    return path
+
+
+@pytest.fixture
+def engine(db_path, monkeypatch):
+    # архивы, найденные другими тестами, этой базе не принадлежат
+    monkeypatch.setattr(archive, "_known_years", [])
+    eng = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+
+    @event.listens_for(eng, "connect")
+    def _on_connect(dbapi_conn, _record):
+        register_functions(dbapi_conn)
+        archive.attach_archives(dbapi_conn, db_path)
+
+    yield eng
+    eng.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(bind=engine, autoflush=False, autocommit=False, expire_on_commit=False)
+
+
+@pytest.fixture
+def session(session_factory):
+    with session_factory() as s:
+        yield s
+
+
+@pytest.fixture
+def account(session) -> Account:
+    acc = Account(name="Карта")
+    session.add(acc)
+    session.commit()
+    return acc
+
+
+@pytest.fixture
+def make_category(session):
+    """Категории создаются сервисом — вместе со строками замыкания category_closure."""
+    def _make(name: str, kind: str = "expense", parent: Category | None = None) -> Category:
+        return create_category(CategoriesRepo(session), kind, name, parent_id=parent.id if parent else None)
+
+    return _make
@@ -0,0 +1,33 @@
+import pytest
+
+from app.infrastructure.db import archive
+
+
+def _touch_years(db_path, years) -> None:
+    archive.archive_dir(db_path).mkdir(exist_ok=True)
+    for year in years:
+        archive.archive_file(db_path, year).touch()
+
+
+def test_discover_years_sorted_and_ignores_foreign_files(db_path, monkeypatch):
+    monkeypatch.setattr(archive, "_known_years", [])
+    _touch_years(db_path, [2019, 2017, 2018])
+    (archive.archive_dir(db_path) / "other_2016.sqlite3").touch()
+    (archive.archive_dir(db_path) / f"{db_path.stem}_old.sqlite3").touch()
+
+    assert archive.discover_years(db_path) == [2017, 2018, 2019]
+    assert archive.archived_years() == [2017, 2018, 2019]
+
+
+def test_too_many_archives_is_an_error(db_path, monkeypatch):
+    monkeypatch.setattr(archive, "_known_years", [2020])
+    years = range(2010, 2010 + archive.MAX_ATTACHED)
+    _touch_years(db_path, years)
+
+    with pytest.raises(RuntimeError, match=archive.archive_file(db_path, 2010).name):
+        archive.discover_years(db_path)
+    # прежний список не подменяется обрезанным
+    assert archive.archived_years() == [2020]
+
+    archive.archive_file(db_path, 2010).unlink()
+    assert archive.discover_years(db_path) == list(years)[1:]
@@ -0,0 +1,128 @@
+import random
+from datetime import date
+
+import pytest
+
+from app.application.services.budgets import get_budget_envelopes, upsert_budget
+from app.infrastructure.db.models import Transaction
+from app.infrastructure.repositories.budgets import BudgetsRepo
+from app.infrastructure.repositories.reports import ReportsRepo
+
+
+def _m(month: int, year: int = 2025) -> date:
+    return date(year, month, 1)
+
+
+@pytest.fixture
+def food(make_category):
+    return make_category("Еда")
+
+
+def _budget(session, category, month: int, limit: int, rollover: bool = True) -> None:
+    upsert_budget(BudgetsRepo(session), _m(month), category.id, limit, rollover)
+
+
+def _spend(session, account, category, month: int, cents: int, day: int = 10, tx_type: str = "expense") -> None:
+    session.add(Transaction(
+        occurred_at=date(2025, month, day), type=tx_type, account_id=account.id, category_id=category.id,
+        amount_cents=cents,
+    ))
+    session.commit()
+
+
+def _available(session, category, since: int, through: int) -> dict[int, tuple[int, int]]:
+    """{месяц: (перенос, доступно)} по категории."""
+    rows = ReportsRepo(session).budget_envelopes(_m(since), _m(through))
+    return {r.month.month: (r.carried_cents, r.available_cents) for r in rows if r.category_id == category.id}
+
+
+def test_rollover_carries_surplus_and_overspend(session, account, food):
+    _budget(session, food, 1, 10_000)
+    _budget(session, food, 2, 10_000)
+    _budget(session, food, 3, 10_000)
+    _spend(session, account, food, 1, 3_000)    # остаток 70
+    _spend(session, account, food, 2, 25_000)   # перерасход 150, с переносом −80
+
+    assert _available(session, food, 1, 3) == {1: (0, 7_000), 2: (7_000, -8_000), 3: (-8_000, 2_000)}
+
+
+def test_month_without_rollover_ends_chain(session, account, food):
+    _budget(session, food, 1, 10_000)
+    _budget(session, food, 2, 10_000, rollover=False)
+    _budget(session, food, 3, 10_000)
+    _spend(session, account, food, 2, 1_000)
+
+    # февраль ещё получает перенос января, но дальше не передаёт
+    assert _available(session, food, 1, 3) == {1: (0, 10_000), 2: (10_000, 19_000), 3: (0, 10_000)}
+
+
+def test_month_without_budget_ends_chain(session, account, food):
+    _budget(session, food, 1, 10_000)
+    _budget(session, food, 3, 10_000)
+    _spend(session, account, food, 2, 4_000)
+
+    rows = {r.month.month: r for r in ReportsRepo(session).budget_envelopes(_m(1), _m(3))}
+    assert rows[2].budget_id is None
+    assert (rows[2].limit_cents, rows[2].actual_cents, rows[2].available_cents) == (0, 4_000, 6_000)
+    assert (rows[3].carried_cents, rows[3].available_cents) == (0, 10_000)
+
+
+def test_history_before_since_is_carried(session, account, food):
+    _budget(session, food, 1, 10_000)
+    _budget(session, food, 2, 10_000)
+    _budget(session, food, 3, 10_000)
+    _spend(session, account, food, 1, 1_000)
+    _spend(session, account, food, 2, 2_000)
+
+    assert _available(session, food, 3, 3) == {3: (17_000, 27_000)}
+    # сервис округляет границы до начала месяца
+    by_days = get_budget_envelopes(ReportsRepo(session), date(2025, 3, 15), date(2025, 3, 20))
+    assert by_days == ReportsRepo(session).budget_envelopes(_m(3), _m(3))
+
+
+def test_subcategories_roll_up_and_other_types_ignored(session, account, food, make_category):
+    cafe = make_category("Кафе", parent=food)
+    salary = make_category("Зарплата", kind="income")
+    _budget(session, food, 1, 10_000)
+    _spend(session, account, cafe, 1, 2_500)
+    _spend(session, account, food, 1, 500)
+    _spend(session, account, salary, 1, 90_000, tx_type="income")
+    _spend(session, account, food, 2, 700)  # вне периода
+
+    [row] = ReportsRepo(session).budget_envelopes(_m(1), _m(1))
+    assert (row.category_id, row.actual_cents, row.available_cents) == (food.id, 3_000, 7_000)
+
+
+def _reference(budgets, spent, first: int, through: int) -> dict[int, tuple[int, int]]:
+    """Перенос и доступно месяц за месяцем, как их понимает пользователь."""
+    result = {}
+    carry = 0
+    for m in range(first, through + 1):
+        limit, rollover = budgets.get(m, (0, False))
+        available = limit - spent.get(m, 0) + carry
+        result[m] = (carry, available)
+        carry = available if m in budgets and rollover else 0
+    return result
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_matches_month_by_month_reference(session, account, food, make_category, seed):
+    rnd = random.Random(seed)
+    cafe = make_category("Кафе", parent=food)
+    budgets = {
+        m: (rnd.randrange(1, 20) * 1_000, rnd.random() < 0.7) for m in range(1, 13) if rnd.random() < 0.75
+    }
+    spent: dict[int, int] = {}
+    for _ in range(40):
+        m, cents = rnd.randint(1, 12), rnd.randrange(1, 50) * 100
+        _spend(session, account, rnd.choice([food, cafe]), m, cents, day=rnd.randint(1, 28))
+        spent[m] = spent.get(m, 0) + cents
+    for m, (limit, rollover) in budgets.items():
+        _budget(session, food, m, limit, rollover)
+    if not budgets:
+        return
+
+    first = min(budgets)
+    expected = _reference(budgets, spent, first, 12)
+    since = rnd.randint(first, 12)
+    assert _available(session, food, since, 12) == {m: v for m, v in expected.items() if m >= since}
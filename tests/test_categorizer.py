@@ -0,0 +1,124 @@
+import re
+
+import pytest
+
+from app.application.categorizer import AhoCorasick, Categorizer, RuleSpec
+from app.application.services.categorization import validate_pattern
+from app.domain.enums import RuleKind
+
+REGEX = RuleKind.REGEX.value
+KEYWORD = RuleKind.KEYWORD.value
+
+# выражения, которые пользователь может ввести в правило
+PATTERNS = [
+    "taxi",
+    r"yandex\s*go",
+    "(?i)uber",
+    "(?s)a.b",
+    "(?is)самокат.*прокат",
+    "(?x) t a x i   # такси с пробелами",
+    "(?x)(?i) k f c  # комментарий",
+    "(?x) (?i)wolt",
+    "(?i:scoped)dodo",
+    "^пятёрочка",
+    r"\d{4}$",
+    "(кофе|чай)+ хаус",
+    "(?a)\\w+маркет",
+    "a(?i)b",             # флаги не в начале — ошибка уже отдельно
+    "(?P<shop>магнит)",   # именованные группы
+    r"(ozon)\s+\1",       # обратная ссылка
+    "(x)?(?(1)y|z)",      # условие по группе
+    "[",                  # синтаксическая ошибка
+    "(?L)a",              # L только для bytes
+]
+
+NOTES = [
+    "TAXI 1234",
+    "Yandex Go поездка",
+    "UBER TRIP",
+    "a\nb",
+    "Самокат\nпрокат",
+    "KFC Москва",
+    "WOLT доставка",
+    "SCOPEDdodo",
+    "Пятёрочка 5566",
+    "кофечай хаус",
+    "abc маркет",
+    "ничего общего",
+    "",
+]
+
+
+def _accepted(kind: str = REGEX) -> list[str]:
+    result = []
+    for pattern in PATTERNS:
+        try:
+            result.append(validate_pattern(kind, pattern))
+        except ValueError:
+            continue
+    return result
+
+
+def _rules(patterns: list[str]) -> list[RuleSpec]:
+    return [RuleSpec(id=i + 1, category_id=100 + i, category_kind="expense", kind=REGEX, pattern=p)
+            for i, p in enumerate(patterns)]
+
+
+def _expected(patterns: list[str], note: str) -> int | None:
+    """Без общего выражения: первое по порядку правило, чьё выражение нашлось в заметке."""
+    for i, p in enumerate(patterns):
+        if re.search(p, note, re.IGNORECASE):
+            return 100 + i
+    return None
+
+
+@pytest.mark.parametrize("pattern", _accepted())
+def test_every_accepted_pattern_builds_categorizer(pattern):
+    cat = Categorizer(_rules([pattern]))
+    for note in NOTES:
+        assert cat.categorize_one("expense", 1, 100, note) == _expected([pattern], note), note
+
+
+def test_all_accepted_patterns_combined():
+    patterns = _accepted()
+    cat = Categorizer(_rules(patterns))
+    for note in NOTES:
+        assert cat.categorize_one("expense", 1, 100, note) == _expected(patterns, note), note
+
+
+@pytest.mark.parametrize("pattern", ["a(?i)b", "(?P<shop>магнит)", r"(ozon)\s+\1", "(x)?(?(1)y|z)", "[", "(?L)a"])
+def test_rejected_patterns(pattern):
+    with pytest.raises(ValueError):
+        validate_pattern(REGEX, pattern)
+
+
+def test_global_flags_accepted():
+    assert validate_pattern(REGEX, "  (?i)taxi ") == "(?i)taxi"
+    assert validate_pattern(KEYWORD, "  (?i)taxi ") == "(?i)taxi"  # для слов это просто текст
+    assert validate_pattern(REGEX, "   ") is None
+
+
+def test_keywords_priority_and_conditions():
+    cat = Categorizer([
+        RuleSpec(id=1, category_id=10, category_kind="expense", kind=KEYWORD, pattern="Пятёрочка", priority=200),
+        RuleSpec(id=2, category_id=20, category_kind="expense", kind=KEYWORD, pattern="пят", priority=100,
+                 min_cents=10_000),
+        RuleSpec(id=3, category_id=30, category_kind="income", kind=KEYWORD, pattern="пятёрочка"),
+        RuleSpec(id=4, category_id=40, category_kind="expense", kind=KEYWORD, pattern=None, account_id=7),
+    ])
+
+    assert cat.categorize([
+        ("expense", 1, 50_000, "ПЯТЁРОЧКА 123"),  # оба слова, побеждает меньший priority
+        ("expense", 1, 500, "ПЯТЁРОЧКА 123"),     # у правила 2 не проходит сумма
+        ("income", 1, 500, "возврат Пятёрочка"),
+        ("expense", 7, 500, "что-то"),            # правило без заметки — по счёту
+        ("expense", 1, 500, "что-то"),
+        ("transfer", 1, 500, "Пятёрочка"),        # переводы не категоризуются
+    ]) == [20, 10, 30, 40, None, None]
+
+
+def test_aho_corasick_overlapping_words():
+    ac = AhoCorasick({"he": [1], "she": [2], "his": [3], "hers": [4]})
+    assert ac.find_all("ushers") == {1, 2, 4}
+    assert ac.find_all("this") == {3}
+    assert ac.find_all("") == set()
@@ -0,0 +1,82 @@
+from datetime import date
+
+from sqlalchemy import select
+
+from app.infrastructure.db.models import BalanceCheckpoint, Transaction
+from app.infrastructure.repositories.reports import ReportsRepo
+
+JUNE = date(2025, 6, 30)
+
+
+def _add(session, account, day: date, tx_type: str, cents: int) -> None:
+    session.add(Transaction(occurred_at=day, type=tx_type, account_id=account.id, amount_cents=cents))
+    session.commit()
+
+
+def _balance(session, account, as_of: date = JUNE) -> int:
+    [row] = ReportsRepo(session).balance_as_of([account.id], as_of)
+    return row.balance_cents
+
+
+def _checkpoints(session, account) -> dict[date, int]:
+    stmt = select(BalanceCheckpoint.month_end, BalanceCheckpoint.balance_cents)
+    return dict(session.execute(stmt.where(BalanceCheckpoint.account_id == account.id)).all())
+
+
+def test_checkpoints_saved_and_invalidated(session, account):
+    _add(session, account, date(2025, 1, 10), "income", 1000)
+    _add(session, account, date(2025, 7, 3), "expense", 50)
+
+    assert _balance(session, account, date(2025, 7, 15)) == 950
+    # цепочка от первого месяца с операциями до последнего закрытого месяца <= as_of
+    assert _checkpoints(session, account) == {
+        date(2025, 1, 31): 1000, date(2025, 2, 28): 1000, date(2025, 3, 31): 1000,
+        date(2025, 4, 30): 1000, date(2025, 5, 31): 1000, JUNE: 1000,
+    }
+
+    # запись задним числом удаляет хвост цепочки, следующий вызов его достраивает
+    _add(session, account, date(2025, 3, 20), "expense", 200)
+    assert set(_checkpoints(session, account)) == {date(2025, 1, 31), date(2025, 2, 28)}
+    assert _balance(session, account) == 800
+    assert _checkpoints(session, account)[JUNE] == 800
+
+
+def test_write_between_compute_and_save_is_not_cached(session_factory, session, account, monkeypatch):
+    _add(session, account, date(2025, 1, 10), "income", 1000)
+    save = ReportsRepo._save_checkpoints
+
+    def save_after_concurrent_write(repo, rows, generation):
+        # другой поток коммитит операцию задним числом, пока чекпоинты посчитаны, но не сохранены
+        with session_factory() as other:
+            _add(other, account, date(2025, 2, 5), "expense", 300)
+        save(repo, rows, generation)
+
+    monkeypatch.setattr(ReportsRepo, "_save_checkpoints", save_after_concurrent_write)
+    _balance(session, account)
+    monkeypatch.setattr(ReportsRepo, "_save_checkpoints", save)
+
+    assert _checkpoints(session, account) == {}
+    assert _balance(session, account) == 700
+    assert _balance(session, account) == 700
+    assert _checkpoints(session, account)[JUNE] == 700
+
+
+def test_uncommitted_write_in_session_is_not_cached(session, account):
+    _add(session, account, date(2025, 1, 10), "income", 1000)
+    session.add(Transaction(occurred_at=date(2025, 2, 5), type="expense", account_id=account.id, amount_cents=300))
+    session.flush()
+
+    assert _balance(session, account) == 700
+    session.rollback()
+
+    assert _checkpoints(session, account) == {}
+    assert _balance(session, account) == 1000
+
+
+def test_read_only_repo_does_not_save(session, account):
+    _add(session, account, date(2025, 1, 10), "income", 1000)
+
+    [row] = ReportsRepo(session, read_only=True).balance_as_of([account.id], JUNE)
+
+    assert row.balance_cents == 1000
+    assert _checkpoints(session, account) == {}
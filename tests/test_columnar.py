@@ -0,0 +1,73 @@
+import shutil
+from datetime import date
+
+import numpy as np
+
+from app.infrastructure.analytics import columnar
+from app.infrastructure.analytics.columnar import load_snapshot
+from app.infrastructure.db.models import Transaction
+
+
+def _add(session, account, cents: int) -> None:
+    session.add(Transaction(occurred_at=date(2025, 3, 1), type="expense", account_id=account.id, amount_cents=cents))
+    session.commit()
+
+
+def _entries(cache_dir) -> set[str]:
+    return {p.name for p in cache_dir.iterdir()}
+
+
+def test_rebuild_switches_generation_and_keeps_mapped_snapshot(session, account, tmp_path):
+    cache_dir = tmp_path / "cache"
+    _add(session, account, 100)
+    first = load_snapshot(session, cache_dir)
+    assert first.amount.tolist() == [100]
+    assert load_snapshot(session, cache_dir).generation == first.generation  # из кэша
+
+    _add(session, account, 250)
+    second = load_snapshot(session, cache_dir)
+
+    assert second.generation > first.generation
+    assert sorted(second.amount.tolist()) == [100, 250]
+    assert first.amount.tolist() == [100]  # старый снимок по-прежнему читается
+    assert len([n for n in _entries(cache_dir) if n != "meta.json"]) == 1
+
+
+def test_undeletable_old_generation_does_not_break_rebuild(session, account, tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    _add(session, account, 100)
+    load_snapshot(session, cache_dir)
+    rmtree = shutil.rmtree
+    # как в Windows: файлы, открытые через mmap, не удаляются
+    monkeypatch.setattr(columnar.shutil, "rmtree", lambda *a, **kw: None)
+
+    for cents in (200, 300):
+        _add(session, account, cents)
+        snap = load_snapshot(session, cache_dir)
+    assert sorted(snap.amount.tolist()) == [100, 200, 300]
+    assert len(_entries(cache_dir)) == 4
+
+    monkeypatch.setattr(columnar.shutil, "rmtree", rmtree)
+    _add(session, account, 400)
+    load_snapshot(session, cache_dir)
+    assert len(_entries(cache_dir)) == 2  # meta.json + текущее поколение
+
+
+def test_broken_or_old_cache_is_rebuilt(session, account, tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    _add(session, account, 100)
+    # раскладка прошлой версии: .npy прямо в каталоге
+    np.save(cache_dir / "day.npy", np.zeros(1))
+    (cache_dir / "meta.json").write_text('{"version": 1, "generation": 0}', encoding="utf-8")
+
+    snap = load_snapshot(session, cache_dir)
+    assert snap.amount.tolist() == [100]
+    assert "day.npy" not in _entries(cache_dir)
+
+    # meta.json указывает на пропавший каталог
+    for entry in cache_dir.iterdir():
+        if entry.is_dir():
+            shutil.rmtree(entry)
+    assert load_snapshot(session, cache_dir).amount.tolist() == [100]
+    assert columnar._read_cache(cache_dir, snap.generation) is not None
@@ -0,0 +1,183 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.application.services.imports import (
+    StatementRow,
+    _parse_amount,
+    find_duplicates,
+    import_statement,
+    read_statement,
+)
+from app.infrastructure.db import archive
+from app.infrastructure.db.models import Transaction
+from app.infrastructure.repositories.transactions import TransactionsRepo
+
+
+# ----- разбор файла -----
+
+@pytest.mark.parametrize(
+    "raw, cents",
+    [
+        ("−1\xa0234,50 ₽", -123450),
+        ("-1 234,50", -123450),
+        ("+15,00", 1500),
+        ("1234.5", 123450),
+        ("0,01", 1),
+        (12.34, 1234),
+        (-7, -700),
+    ],
+)
+def test_parse_amount(raw, cents):
+    assert _parse_amount(raw) == cents
+
+
+def test_parse_amount_rejects_garbage():
+    with pytest.raises(ValueError):
+        _parse_amount("двенадцать")
+
+
+def test_read_statement_cp1251_with_preamble(tmp_path):
+    text = (
+        "Выписка по счёту 40817810000000000001\r\n"
+        "Период;01.03.2025 - 31.03.2025\r\n"
+        "\r\n"
+        "Дата операции;Описание;Сумма, руб.\r\n"
+        "05.03.2025;Пятёрочка;-1\xa0234,50\r\n"
+        "06.03.2025;Зарплата;85 000,00\r\n"
+        "07.03.2025;Отменённая операция;0,00\r\n"
+        ";Итого;83 765,50\r\n"
+    )
+    path = tmp_path / "statement.csv"
+    path.write_bytes(text.encode("cp1251"))  # ни «₽», ни «−» в cp1251 нет
+
+    assert read_statement(path) == [
+        StatementRow(date(2025, 3, 5), -123450, "Пятёрочка"),
+        StatementRow(date(2025, 3, 6), 8500000, "Зарплата"),
+    ]
+
+
+def test_read_statement_utf8_comma_delimited(tmp_path):
+    path = tmp_path / "statement.csv"
+    path.write_text('date,amount,description\n2025-03-05,"−1 234,50 ₽",Taxi\n', encoding="utf-8-sig")
+
+    assert read_statement(path) == [StatementRow(date(2025, 3, 5), -123450, "Taxi")]
+
+
+def test_read_statement_xlsx(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["Выгрузка из банка"])
+    ws.append(["Дата", "Сумма", "Назначение"])
+    ws.append([datetime(2025, 3, 5, 14, 30), -1234.5, "Кафе"])
+    ws.append([None, None, None])
+    path = tmp_path / "statement.xlsx"
+    wb.save(path)
+
+    assert read_statement(path) == [StatementRow(date(2025, 3, 5), -123450, "Кафе")]
+
+
+def test_read_statement_without_header(tmp_path):
+    path = tmp_path / "statement.csv"
+    path.write_text("a;b;c\n1;2;3\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="Дата"):
+        read_statement(path)
+
+
+def test_read_statement_reports_bad_row(tmp_path):
+    path = tmp_path / "statement.csv"
+    path.write_text("Дата;Сумма\n05.03.2025;100\n31.02.2025;100\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="Строка 3"):
+        read_statement(path)
+
+
+# ----- дубликаты -----
+
+def _add_expense(session, account, day: date, cents: int, note: str | None) -> int:
+    tx = Transaction(occurred_at=day, type="expense", account_id=account.id, amount_cents=cents, note=note)
+    session.add(tx)
+    session.commit()
+    return tx.id
+
+
+def test_two_identical_rows_against_one_existing(session, account):
+    tx_id = _add_expense(session, account, date(2025, 3, 5), 35000, "Кофейня")
+    rows = [StatementRow(date(2025, 3, 5), -35000, "КОФЕЙНЯ  "), StatementRow(date(2025, 3, 5), -35000, "кофейня")]
+
+    assert find_duplicates(TransactionsRepo(session), account.id, rows) == [tx_id, None]
+
+
+def test_exact_date_matched_before_shifted(session, account):
+    # строка за 6-е стоит первой, но операцию за 5-е должна забрать строка с точной датой
+    tx_id = _add_expense(session, account, date(2025, 3, 5), 1000, "Такси")
+    rows = [StatementRow(date(2025, 3, 6), -1000, "Такси"), StatementRow(date(2025, 3, 5), -1000, "Такси")]
+
+    assert find_duplicates(TransactionsRepo(session), account.id, rows) == [None, tx_id]
+
+
+def test_nearer_shift_wins(session, account):
+    near = _add_expense(session, account, date(2025, 3, 4), 1000, "Такси")
+    far = _add_expense(session, account, date(2025, 3, 7), 1000, "Такси")
+    rows = [StatementRow(date(2025, 3, 9), -1000, "Такси"), StatementRow(date(2025, 3, 5), -1000, "Такси")]
+
+    assert find_duplicates(TransactionsRepo(session), account.id, rows) == [far, near]
+
+
+@pytest.mark.parametrize("window, found", [(2, False), (3, True)])
+def test_date_window(session, account, window, found):
+    tx_id = _add_expense(session, account, date(2025, 3, 5), 1000, "Такси")
+    rows = [StatementRow(date(2025, 3, 5) + timedelta(days=3), -1000, "Такси")]
+
+    assert find_duplicates(TransactionsRepo(session), account.id, rows, window) == [tx_id if found else None]
+
+
+def test_sign_and_account_are_part_of_fingerprint(session, account):
+    _add_expense(session, account, date(2025, 3, 5), 1000, "Возврат")
+    rows = [StatementRow(date(2025, 3, 5), 1000, "Возврат")]
+
+    repo = TransactionsRepo(session)
+    assert find_duplicates(repo, account.id, rows) == [None]
+    assert find_duplicates(repo, account.id + 1, [StatementRow(date(2025, 3, 5), -1000, "Возврат")]) == [None]
+
+
+def test_import_statement_skips_duplicates(session, account, make_category):
+    food = make_category("Еда")
+    salary = make_category("Зарплата", kind="income")
+    _add_expense(session, account, date(2025, 3, 5), 35000, "Кофейня")
+    rows = [
+        StatementRow(date(2025, 3, 6), -35000, "Кофейня"),
+        StatementRow(date(2025, 3, 6), -35000, "Кофейня"),
+        StatementRow(date(2025, 3, 7), 100000, "Зарплата"),
+    ]
+
+    result = import_statement(TransactionsRepo(session), account.id, rows, food.id, salary.id)
+
+    assert (result.added, result.duplicates) == (2, 1)
+    added = session.query(Transaction).filter(Transaction.occurred_at >= date(2025, 3, 6)).order_by(Transaction.id)
+    assert [(t.type, t.category_id, t.amount_cents) for t in added] == [
+        ("expense", food.id, 35000),
+        ("income", salary.id, 100000),
+    ]
+    # повторный импорт той же выписки ничего не добавляет
+    again = import_statement(TransactionsRepo(session), account.id, rows, food.id, salary.id)
+    assert (again.added, again.duplicates) == (0, 3)
+
+
+def test_duplicates_found_in_archived_year(session_factory, engine, db_path, account):
+    with session_factory() as s:
+        old = Transaction(
+            occurred_at=date(2022, 3, 5), type="expense", account_id=account.id, amount_cents=1000, note="Такси"
+        )
+        s.add(old)
+        # переносятся только строки с id меньше, чем у остающихся в основной базе
+        s.add(Transaction(occurred_at=date(2025, 1, 10), type="expense", account_id=account.id, amount_cents=1))
+        s.commit()
+    with engine.connect() as conn:
+        assert archive.move_closed_years(conn, db_path, 2024) == {2022: 1}
+    archive.discover_years(db_path)
+    engine.dispose()
+
+    rows = [StatementRow(date(2022, 3, 6), -1000, "такси"), StatementRow(date(2025, 3, 5), -1000, "Такси")]
+    with session_factory() as s:
+        assert find_duplicates(TransactionsRepo(s), account.id, rows) == [old.id, None]
@@ -0,0 +1,109 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from app.application.services.imports import StatementRow
+from app.application.services.reconciliation import LedgerItem, mark_reconciled, match_by_amount, reconcile
+from app.infrastructure.db.models import Transaction
+from app.infrastructure.repositories.transactions import TransactionsRepo
+
+D = date(2025, 3, 10)
+
+
+def _row(day_offset: int, cents: int) -> StatementRow:
+    return StatementRow(D + timedelta(days=day_offset), cents, None)
+
+
+def _item(tx_id: int, day_offset: int, cents: int) -> LedgerItem:
+    return LedgerItem(tx_id, D + timedelta(days=day_offset), cents, None)
+
+
+def _max_pairs(rows, items, window: int) -> int:
+    """Перебором: наибольшее число пар (та же сумма, даты в пределах окна)."""
+    if not rows:
+        return 0
+    first, rest = rows[0], rows[1:]
+    best = _max_pairs(rest, items, window)
+    for k, it in enumerate(items):
+        if it.amount_cents == first.amount_cents and abs((it.occurred_at - first.occurred_at).days) <= window:
+            best = max(best, 1 + _max_pairs(rest, items[:k] + items[k + 1:], window))
+    return best
+
+
+def test_amount_sign_and_window_boundary():
+    rows = [_row(0, -500), _row(0, 700), _row(10, -900)]
+    items = [_item(1, 3, -500), _item(2, 0, -700), _item(3, 14, -900)]
+
+    pairs, lone_rows, lone_items = match_by_amount(rows, items, window_days=3)
+
+    assert [(r.amount_cents, it.id) for r, it in pairs] == [(-500, 1)]  # ровно на границе окна — пара
+    assert sorted(r.amount_cents for r in lone_rows) == [-900, 700]  # +700 и -700 — разные суммы
+    assert sorted(it.id for it in lone_items) == [2, 3]
+
+
+def test_identical_amounts_pair_by_date_order():
+    rows = [_row(5, -100), _row(0, -100), _row(1, -100)]
+    items = [_item(10, 6, -100), _item(11, 0, -100)]
+
+    pairs, lone_rows, lone_items = match_by_amount(rows, items, window_days=1)
+
+    assert sorted((r.occurred_at, it.id) for r, it in pairs) == [(D, 11), (D + timedelta(days=5), 10)]
+    assert lone_rows == [_row(1, -100)]
+    assert lone_items == []
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_greedy_gives_maximum_matching(seed):
+    rnd = random.Random(seed)
+    window = rnd.randint(0, 3)
+    rows = [_row(rnd.randint(0, 8), rnd.choice([-100, -250, 300])) for _ in range(rnd.randint(0, 6))]
+    items = [_item(i, rnd.randint(0, 8), rnd.choice([-100, -250, 300])) for i in range(rnd.randint(0, 6))]
+
+    pairs, lone_rows, lone_items = match_by_amount(rows, items, window)
+
+    assert len(pairs) == _max_pairs(rows, items, window)
+    for r, it in pairs:
+        assert r.amount_cents == it.amount_cents
+        assert abs((r.occurred_at - it.occurred_at).days) <= window
+    # каждая строка и каждая операция — ровно в одном из списков
+    assert sorted([r for r, _ in pairs] + lone_rows, key=repr) == sorted(rows, key=repr)
+    assert sorted([it for _, it in pairs] + lone_items, key=lambda it: it.id) == sorted(items, key=lambda it: it.id)
+
+
+def test_reconcile_and_mark(session, account):
+    def add(day: date, tx_type: str, cents: int) -> Transaction:
+        tx = Transaction(occurred_at=day, type=tx_type, account_id=account.id, amount_cents=cents)
+        session.add(tx)
+        return tx
+
+    coffee = add(date(2025, 3, 5), "expense", 35000)
+    salary = add(date(2025, 3, 7), "income", 100000)
+    extra = add(date(2025, 3, 20), "expense", 1000)
+    add(date(2025, 4, 30), "expense", 5000)  # вне периода и окна
+    session.commit()
+
+    rows = [
+        StatementRow(date(2025, 3, 6), -35000, "кофе"),
+        StatementRow(date(2025, 3, 7), 100000, "зарплата"),
+        StatementRow(date(2025, 3, 25), -4200, "нет в учёте"),
+    ]
+    repo = TransactionsRepo(session)
+    report = reconcile(repo, account.id, rows, start=date(2025, 3, 1), end=date(2025, 3, 31))
+
+    assert [it.id for _r, it in report.matched] == [coffee.id, salary.id]
+    assert [r.amount_cents for r in report.missing] == [-4200]
+    assert [it.id for it in report.extra] == [extra.id]
+    assert report.difference_cents == -4200 - (-1000)
+    assert report.already_reconciled == 0
+
+    assert mark_reconciled(repo, report) == 2
+    again = reconcile(TransactionsRepo(session), account.id, rows, start=date(2025, 3, 1), end=date(2025, 3, 31))
+    assert again.already_reconciled == 2
+    assert again.matched == ()
+    assert [r.amount_cents for r in again.missing] == [-4200]
+
+
+def test_reconcile_empty_statement(session, account):
+    with pytest.raises(ValueError):
+        reconcile(TransactionsRepo(session), account.id, [])
@@ -0,0 +1,98 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import select
+
+from app.application.services.recurring import add_recurring_rule, materialize_due, occurrences
+from app.infrastructure.db.models import Account, RecurringRule, Transaction
+from app.infrastructure.repositories.recurring import RecurringRulesRepo
+from app.infrastructure.repositories.transactions import TransactionsRepo
+
+
+def _materialize(session, today: date) -> int:
+    return materialize_due(RecurringRulesRepo(session), TransactionsRepo(session), today)
+
+
+def _dates(session, rule_id: int) -> list[date]:
+    stmt = select(Transaction.occurred_at).where(Transaction.recurring_rule_id == rule_id)
+    return list(session.execute(stmt.order_by(Transaction.occurred_at)).scalars())
+
+
+@pytest.fixture
+def rent(session, account, make_category) -> RecurringRule:
+    housing = make_category("Жильё")
+    return add_recurring_rule(
+        RecurringRulesRepo(session), "Аренда", "expense", account.id, 4_000_000, "FREQ=MONTHLY", date(2025, 1, 15),
+        category_id=housing.id,
+    )
+
+
+def test_materialize_is_idempotent(session, rent):
+    assert _materialize(session, date(2025, 4, 20)) == 4
+    assert _dates(session, rent.id) == [date(2025, m, 15) for m in (1, 2, 3, 4)]
+    assert rent.materialized_through == date(2025, 4, 20)
+
+    # повторный запуск в тот же день и на следующий — ничего нового
+    assert _materialize(session, date(2025, 4, 20)) == 0
+    assert _materialize(session, date(2025, 4, 21)) == 0
+    assert _materialize(session, date(2025, 5, 15)) == 1
+    assert _dates(session, rent.id)[-1] == date(2025, 5, 15)
+
+
+def test_lost_mark_does_not_duplicate(session, rent):
+    assert _materialize(session, date(2025, 3, 31)) == 3
+    # отметка «проведено по» не сохранилась — уникальный индекс (правило, дата) не даст дублей
+    rent.materialized_through = None
+    session.commit()
+
+    assert _materialize(session, date(2025, 4, 30)) == 1
+    assert _dates(session, rent.id) == [date(2025, m, 15) for m in (1, 2, 3, 4)]
+
+
+def test_transfer_and_inactive_rules(session, account, rent):
+    savings = Account(name="Вклад")
+    session.add(savings)
+    session.commit()
+    transfer = add_recurring_rule(
+        RecurringRulesRepo(session), "Копилка", "transfer", account.id, 500_000, "FREQ=WEEKLY", date(2025, 3, 3),
+        to_account_id=savings.id,
+    )
+    rent.is_active = False
+    session.commit()
+
+    assert _materialize(session, date(2025, 3, 17)) == 3
+    txs = session.execute(select(Transaction).order_by(Transaction.occurred_at)).scalars().all()
+    assert {(t.recurring_rule_id, t.from_account_id, t.to_account_id, t.account_id, t.note) for t in txs} == {
+        (transfer.id, account.id, savings.id, None, "Копилка"),
+    }
+    assert _dates(session, rent.id) == []
+
+
+def test_occurrences_bounds_and_exdate():
+    rule = RecurringRule(rrule="RRULE:FREQ=MONTHLY;BYMONTHDAY=5\nEXDATE:20250305T000000", dtstart=date(2025, 1, 5))
+
+    assert occurrences(rule, None, date(2025, 4, 5)) == [date(2025, 1, 5), date(2025, 2, 5), date(2025, 4, 5)]
+    # after — не включительно, through — включительно
+    assert occurrences(rule, date(2025, 2, 5), date(2025, 5, 4)) == [date(2025, 4, 5)]
+    assert occurrences(rule, date(2025, 6, 1), date(2025, 5, 1)) == []
+
+
+@pytest.mark.parametrize(
+    "kwargs, message",
+    [
+        ({"name": " "}, "Название"),
+        ({"amount_cents": 0}, "Сумма"),
+        ({"rrule": "FREQ=SOMETIMES"}, "RRULE"),
+        ({"category_id": None}, "категорию"),
+        ({"tx_type": "transfer", "to_account_id": None}, "перевода"),
+    ],
+)
+def test_add_rule_validation(session, account, make_category, kwargs, message):
+    food = make_category("Еда")
+    args = {
+        "name": "Подписка", "tx_type": "expense", "account_id": account.id, "amount_cents": 29900,
+        "rrule": "FREQ=MONTHLY", "dtstart": date(2025, 1, 1), "category_id": food.id,
+    }
+    args.update(kwargs)
+    with pytest.raises(ValueError, match=message):
+        add_recurring_rule(RecurringRulesRepo(session), **args)